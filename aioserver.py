@@ -0,0 +1,277 @@
+'''
+    asyncio server for the /rcube query API
+
+    Usage:
+        python -m RCube.aioserver [--host HOST] [--port PORT] [--workers N]
+
+    An alternative to the Flask development server in microservice.py,
+    built on asyncio streams alone.  It answers the same queries
+
+        GET /rcube?op=...              dispatch, through the response cache
+        GET /rcube/cache               response cache counters
+        GET /rcube/cache/solutions     solution cache counters
+        GET /metrics                   Prometheus metrics
+
+    over HTTP/1.1 keep-alive connections, so one event loop holds many
+    idle or slow clients at once.  Cheap ops run inline on the loop;
+    solving, random-state scrambles and solution cache stats (which may
+    open the cache file) go to an executor, by default a pool of one
+    worker process per CPU, so a long solve never stalls the others.
+
+    An idle connection is closed after RCUBE_KEEPALIVE_SECONDS (default
+    5).  Request heads are limited to RCUBE_HEAD_BYTES (default 16384).
+    drain stops a server gracefully: no new connections, idle ones
+    closed, busy ones closed after their current response.
+'''
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import RCube.dispatch as RCube
+import RCube.encoder as encoder
+import RCube.fastpath as fastpath
+import RCube.metrics as metrics
+import RCube.responsecache as responsecache
+import RCube.solutioncache as solutioncache
+import RCube.solver as solver
+
+
+KEEPALIVE_SECONDS = float(os.getenv('RCUBE_KEEPALIVE_SECONDS', '5'))
+HEAD_BYTES = int(os.getenv('RCUBE_HEAD_BYTES', '16384'))
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            408: 'Request Timeout', 413: 'Payload Too Large', 501: 'Not Implemented'}
+
+
+#  open connections of this process: writer -> True while waiting for
+#  the next request
+_connections = {}
+_draining = False
+
+
+def isHeavy(parm):
+    '''True for queries that may take long enough to belong in the executor.'''
+    op = parm.get('op')
+    if (op == 'solve'):
+        return True
+    if (op != 'scramble' or parm.get('method') != 'random'):
+        return False
+    #  like dispatch.scramble: no n, or a valid n of 0, is no scramble
+    n = parm.get('n', '0')
+    return RCube.isScrambleLength(n) and int(n) != 0
+
+
+def _solutionCacheStats():
+    cache = solutioncache.getCache()
+    return {} if cache is None else cache.stats()
+
+
+async def _dispatchInExecutor(parm, executor):
+    #  timed here, since counts recorded in a worker process would never
+    #  reach this process's /metrics
+    started = time.perf_counter()
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(executor, RCube.dispatchUntimed, parm)
+    except Exception:
+        metrics.observe(parm.get('op'), 'error: exception', time.perf_counter() - started)
+        raise
+    metrics.observe(parm.get('op'), result['status'], time.perf_counter() - started)
+    return result
+
+
+async def respond(parm, executor):
+    '''Encoded response for a /rcube query.'''
+    body = fastpath.quickResponse(parm)
+    if (body is not None):
+        return body
+    key = responsecache.cacheKey(parm)
+    cache = responsecache.cache
+    if (key is not None and cache.maxBytes > 0):
+        body = responsecache.cached(parm, key)
+        if (body is not None):
+            return body
+    try:
+        if (isHeavy(parm)):
+            result = await _dispatchInExecutor(parm, executor)
+        else:
+            result = RCube.dispatch(parm)
+    except Exception as e:
+        return encoder.encode({'status': 'error: ' + str(e)})
+    body = encoder.encode(result)
+    if (key is not None and cache.maxBytes > 0 and responsecache.storable(result)):
+        cache.put(key, body)
+    return body
+
+
+async def route(path, query, executor):
+    '''(status code, content type, body) for a GET of path?query.'''
+    json = encoder.CONTENT_TYPE
+    if (path == '/rcube'):
+        return 200, json, await respond(fastpath.parse(query), executor)
+    if (path == '/rcube/cache'):
+        return 200, json, encoder.encode(responsecache.cache.stats())
+    if (path == '/rcube/cache/solutions'):
+        #  read in the executor: the counters are kept in the cache file,
+        #  and this process must not open it before a process pool forks
+        stats = await asyncio.get_running_loop().run_in_executor(executor, _solutionCacheStats)
+        return 200, json, encoder.encode(stats)
+    if (path == '/metrics'):
+        return 200, metrics.CONTENT_TYPE, metrics.render(responsecache.cache.stats())
+    return 404, json, encoder.encode({'status': 'error: not found'})
+
+
+class _BadRequest(Exception):
+
+    def __init__(self, code):
+        super(_BadRequest, self).__init__(code)
+        self.code = code
+
+
+async def _readHead(reader):
+    #  (method, target, version, headers) of the next request, or None
+    #  when the client closed the connection between requests
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_SECONDS)
+    except asyncio.IncompleteReadError as e:
+        if (e.partial.strip()):
+            raise _BadRequest(400)
+        return None
+    except asyncio.LimitOverrunError:
+        raise _BadRequest(413)
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, version = lines[0].split(' ')
+    except ValueError:
+        raise _BadRequest(400)
+    if (not version.startswith('HTTP/1.')):
+        raise _BadRequest(400)
+    headers = {}
+    for line in lines[1:]:
+        if (line):
+            name, colon, value = line.partition(':')
+            if (not colon):
+                raise _BadRequest(400)
+            headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+def _keepAlive(version, headers):
+    connection = headers.get('connection', '').lower()
+    if (version == 'HTTP/1.0'):
+        return connection == 'keep-alive'
+    return connection != 'close'
+
+
+def _write(writer, code, body, keepAlive, head=False, contentType=encoder.CONTENT_TYPE):
+    data = body.encode('utf-8')
+    writer.write(('HTTP/1.1 %d %s\r\n'
+                  'Content-Type: %s\r\n'
+                  'Content-Length: %d\r\n'
+                  'Connection: %s\r\n\r\n' % (code, _REASONS[code], contentType, len(data),
+                                              'keep-alive' if keepAlive else 'close')).encode('latin-1') +
+                 (b'' if head else data))
+
+
+async def handle(reader, writer, executor):
+    '''Serve requests on one connection until either side closes it.'''
+    try:
+        while (not _draining):
+            _connections[writer] = True
+            try:
+                request = await _readHead(reader)
+            except asyncio.TimeoutError:
+                break
+            except _BadRequest as e:
+                _write(writer, e.code, encoder.encode({'status': 'error: bad request'}), False)
+                break
+            if (request is None):
+                break
+            _connections[writer] = False
+            method, target, version, headers = request
+            if ('chunked' in headers.get('transfer-encoding', '').lower()):
+                _write(writer, 501, encoder.encode({'status': 'error: chunked body'}), False)
+                break
+            length = headers.get('content-length', '0')
+            if (not length.isdigit() or int(length) > HEAD_BYTES):
+                _write(writer, 413, encoder.encode({'status': 'error: body too large'}), False)
+                break
+            if (int(length)):
+                await reader.readexactly(int(length))
+            path, _, query = target.partition('?')
+            if (method not in ('GET', 'HEAD')):
+                code, contentType, body = (405, encoder.CONTENT_TYPE,
+                                           encoder.encode({'status': 'error: method not allowed'}))
+            else:
+                code, contentType, body = await route(path, query, executor)
+            keepAlive = _keepAlive(version, headers) and not _draining
+            _write(writer, code, body, keepAlive, method == 'HEAD', contentType)
+            await writer.drain()
+            if (not keepAlive):
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        _connections.pop(writer, None)
+        writer.close()
+
+
+async def startServer(host='0.0.0.0', port=5000, executor=None, sock=None):
+    '''Start serving on host:port, or on an already bound socket.
+    Returns the asyncio Server.'''
+    def connected(reader, writer):
+        return handle(reader, writer, executor)
+    if (sock is not None):
+        return await asyncio.start_server(connected, sock=sock, limit=HEAD_BYTES)
+    return await asyncio.start_server(connected, host, port, limit=HEAD_BYTES)
+
+
+async def drain(server, seconds):
+    '''Stop server accepting, close its idle connections and wait up to
+    seconds for the busy ones to finish.  Returns the number of
+    connections still open.'''
+    global _draining
+    _draining = True
+    server.close()
+    for writer, idle in list(_connections.items()):
+        if (idle):
+            writer.close()
+    deadline = time.time() + seconds
+    while (_connections and time.time() < deadline):
+        await asyncio.sleep(0.05)
+    return len(_connections)
+
+
+async def serve(host='0.0.0.0', port=5000, executor=None, sock=None):
+    '''Serve until cancelled.'''
+    server = await startServer(host, port, executor, sock)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m RCube.aioserver',
+                                     description='Serve the rcube API with asyncio.')
+    parser.add_argument('--host', default='0.0.0.0', help='address to listen on (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', '5000')),
+                        help='port to listen on (default: $PORT or 5000)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='executor processes for heavy ops (default: one per CPU)')
+    args = parser.parse_args(argv)
+
+    #  map the solver tables before the executor forks, so its workers
+    #  share the pages; the optimal solver's are mapped on first use
+    solver.getTables()
+    with ProcessPoolExecutor(args.workers) as executor:
+        try:
+            asyncio.run(serve(args.host, args.port, executor))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+import asyncio
+import http.client
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import RCube.aioserver as aioserver
+import RCube.metrics as metrics
+import RCube.responsecache as responsecache
+import RCube.solutioncache as solutioncache
+import RCube.symmetry as symmetry
+from RCube.cubestate import DEFAULT_COLORS, SOLVED_FACES, getPalette, rotateState
+
+
+def stopServer(loop, server):
+    #  close the server and its connections before stopping the loop, so
+    #  no connection task is left pending
+    async def stop():
+        server.close()
+        for writer in list(aioserver._connections):
+            writer.close()
+        while aioserver._connections:
+            await asyncio.sleep(0.01)
+    asyncio.run_coroutine_threadsafe(stop(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+class AioServerTest(unittest.TestCase):
+# Acceptance Tests
+#
+# 2100 aioserver -- /rcube over asyncio streams
+# Desired level of confidence: boundary value analysis
+# Analysis
+#    inputs:  HTTP/1.0 and HTTP/1.1 GET requests
+#    outputs: JSON bodies as from microservice, keep-alive connections
+#
+# Happy path
+#    several queries are answered on one keep-alive connection
+#    blank and repeated query values reach dispatch as with Flask
+#    heavy ops are answered through the executor
+#    cache counters and Prometheus metrics are served
+#
+# Sad path
+#    HTTP/1.0 without keep-alive closes after one response
+#    an unknown path is 404, a POST 405, a malformed request line 400
+#
+# Note:  These tests run the server on an event loop in a thread
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ThreadPoolExecutor(2)
+        cls.loop = asyncio.new_event_loop()
+        threading.Thread(target=cls.loop.run_forever, daemon=True).start()
+        cls.server = asyncio.run_coroutine_threadsafe(
+            aioserver.startServer('127.0.0.1', 0, cls.executor), cls.loop).result()
+        cls.port = cls.server.sockets[0].getsockname()[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        stopServer(cls.loop, cls.server)
+        cls.executor.shutdown()
+
+    def get(self, connection, target):
+        connection.request('GET', target)
+        response = connection.getresponse()
+        return response, json.loads(response.read())
+
+    def test2100_010_ShouldKeepConnectionAlive(self):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        response, result = self.get(connection, '/rcube?op=create')
+        self.assertEqual(200, response.status)
+        self.assertEqual('application/json', response.getheader('Content-Type'))
+        self.assertEqual('created', result['status'])
+        sock = connection.sock
+        _, result = self.get(connection, '/rcube?op=scramble&n=10&method=transition')
+        self.assertEqual(10, len(result['rotations']))
+        self.assertIs(sock, connection.sock)
+        connection.close()
+
+    def test2100_020_ShouldParseQueryLikeFlask(self):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        _, result = self.get(connection, '/rcube?op=scramble&n=')
+        self.assertEqual('error:', result['status'])
+        connection.close()
+
+    def test2100_030_ShouldSolveInExecutor(self):
+        self.assertTrue(aioserver.isHeavy({'op': 'solve'}))
+        self.assertFalse(aioserver.isHeavy({'op': 'scramble', 'n': '5', 'method': 'transition'}))
+        self.assertTrue(aioserver.isHeavy({'op': 'scramble', 'n': '25', 'method': 'random'}))
+        self.assertFalse(aioserver.isHeavy({'op': 'scramble', 'n': '25'}))
+        for n in ('0', '00', '²', 'two'):
+            self.assertFalse(aioserver.isHeavy({'op': 'scramble', 'n': n, 'method': 'random'}))
+        self.assertFalse(aioserver.isHeavy({'op': 'scramble', 'method': 'random'}))
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        cube = ','.join(['green'] * 9 + ['yellow'] * 9 + ['blue'] * 9 + ['white'] * 9 +
+                        ['red'] * 9 + ['orange'] * 9)
+        _, result = self.get(connection, '/rcube?op=solve&cube=' + cube)
+        self.assertEqual('solved', result['status'])
+        self.assertEqual([], result['rotations'])
+        connection.close()
+
+    def test2100_040_ShouldServeCacheCounters(self):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        _, result = self.get(connection, '/rcube/cache')
+        self.assertIn('hits', result)
+        connection.close()
+
+    def test2100_050_ShouldServeMetrics(self):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        self.get(connection, '/rcube?op=rotate&cube=x')
+        connection.request('GET', '/metrics')
+        response = connection.getresponse()
+        self.assertTrue(response.getheader('Content-Type').startswith('text/plain; version=0.0.4'))
+        self.assertIn('rcube_dispatch_seconds_count{op="rotate",', response.read().decode('utf-8'))
+        connection.close()
+
+    def test2100_900_ShouldCloseHttp10(self):
+        with socket.create_connection(('127.0.0.1', self.port)) as sock:
+            sock.sendall(b'GET /rcube?op=create HTTP/1.0\r\n\r\n')
+            data = b''
+            chunk = sock.recv(65536)
+            while chunk:
+                data += chunk
+                chunk = sock.recv(65536)
+        self.assertIn(b'Connection: close', data)
+        self.assertIn(b'"created"', data)
+
+    def test2100_910_ShouldRejectBadRequests(self):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        response, _ = self.get(connection, '/nowhere')
+        self.assertEqual(404, response.status)
+        connection.request('POST', '/rcube?op=create', body='x')
+        response = connection.getresponse()
+        response.read()
+        self.assertEqual(405, response.status)
+        connection.close()
+        with socket.create_connection(('127.0.0.1', self.port)) as sock:
+            sock.sendall(b'nonsense\r\n\r\n')
+            self.assertTrue(sock.recv(65536).startswith(b'HTTP/1.1 400'))
+
+
+class AioServerProcessPoolTest(unittest.TestCase):
+# Acceptance Tests
+#
+# 2150 aioserver -- heavy ops in a process pool, as in production
+# Desired level of confidence: equivalence with the thread pool
+# Analysis
+#    inputs:  op=solve requests
+#    outputs: solutions, and their counts in this process's /metrics
+#
+# Happy path
+#    a solve is answered by a worker process
+#    the solve is counted in /metrics although a worker ran it
+#    a repeated solve is answered from the response cache, counted as
+#    cached
+#    the workers' solution cache counters are served, and this process
+#    never opens the cache file
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.saved = (solutioncache.CACHE_FILE, solutioncache._cache)
+        solutioncache.CACHE_FILE = os.path.join(cls.directory, 'solutions.db')
+        solutioncache._cache = None
+        cls.executor = ProcessPoolExecutor(1)
+        cls.loop = asyncio.new_event_loop()
+        threading.Thread(target=cls.loop.run_forever, daemon=True).start()
+        cls.server = asyncio.run_coroutine_threadsafe(
+            aioserver.startServer('127.0.0.1', 0, cls.executor), cls.loop).result()
+        cls.port = cls.server.sockets[0].getsockname()[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        stopServer(cls.loop, cls.server)
+        cls.executor.shutdown()
+        solutioncache.CACHE_FILE, solutioncache._cache = cls.saved
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        #  a cached response never reaches the workers
+        responsecache.cache.clear()
+
+    def test2150_010_ShouldCountSolvesInWorkers(self):
+        metrics.reset()
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        cube = ','.join(color for color in DEFAULT_COLORS for _ in range(9))
+        for _ in range(2):
+            connection.request('GET', '/rcube?op=solve&cube=' + cube)
+            self.assertEqual('solved', json.loads(connection.getresponse().read())['status'])
+        connection.request('GET', '/metrics')
+        text = connection.getresponse().read().decode('utf-8')
+        self.assertIn('rcube_dispatch_seconds_count{op="solve",status="solved"} 1', text)
+        self.assertIn('rcube_dispatch_seconds_count{op="solve",status="cached"} 1', text)
+        connection.close()
+
+    def test2150_020_ShouldServeWorkerCacheCounters(self):
+        palette = getPalette(DEFAULT_COLORS)
+        state = rotateState(SOLVED_FACES, 'fRbbLtUrF')
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        connection.request('GET', '/rcube/cache/solutions')
+        before = json.loads(connection.getresponse().read())
+        for cube in (state, symmetry.transform(state, 5)):
+            connection.request('GET', '/rcube?op=solve&cube=' + ','.join(palette.decode(cube)))
+            self.assertEqual('solved', json.loads(connection.getresponse().read())['status'])
+        connection.request('GET', '/rcube/cache/solutions')
+        stats = json.loads(connection.getresponse().read())
+        self.assertEqual((1, 1, 1), tuple(stats[name] - before[name] for name in ('hits', 'misses', 'entries')))
+        self.assertIsNone(solutioncache._cache)
+        connection.close()
@@ -0,0 +1,83 @@
+'''
+    Run dispatch over JSON Lines without a web server
+
+    Usage:
+        python -m RCube.bulk [file ...]
+
+    Reads one parameter dict per line from each file, or from stdin
+    when no file (or '-') is given, and writes one JSON result per line
+    to stdout.  Every stage is a generator, so memory use stays flat no
+    matter how long the input is.  The same pipeline backs the
+    /rcube/batch endpoint of the microservice.
+'''
+
+import argparse
+import json
+import sys
+
+import RCube.dispatch as RCube
+import RCube.encoder as encoder
+
+
+def parseLines(lines):
+    '''Lazily parse JSON Lines; a malformed line becomes None.'''
+    for line in lines:
+        if (not line.strip()):
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def dispatchAll(parms, limit=None):
+    '''Run dispatch over parameter dicts, yielding one result per entry.
+
+    Parameter values are passed to dispatch as strings, the way they
+    arrive in a URL query.  Entries that are not dicts give an error
+    result.  After limit entries a final error result ends the run.
+    '''
+    count = 0
+    for parm in parms:
+        if (count == limit):
+            yield {'status': 'error: batch limit exceeded'}
+            return
+        count += 1
+        if (not isinstance(parm, dict)):
+            yield {'status': 'error: invalid parm'}
+            continue
+        try:
+            yield RCube.dispatch(dict((key, str(parm[key])) for key in parm))
+        except Exception as e:
+            yield {'status': 'error: ' + str(e)}
+
+
+def readFiles(names):
+    '''Yield the lines of each named file in turn; '-' is stdin.'''
+    for name in names:
+        if (name == '-'):
+            for line in sys.stdin:
+                yield line
+        else:
+            with open(name) as lines:
+                for line in lines:
+                    yield line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m RCube.bulk',
+                                     description='Run rcube dispatch over JSON Lines.')
+    parser.add_argument('files', nargs='*', default=['-'],
+                        help='JSON Lines files of parameter dicts (default: stdin)')
+    args = parser.parse_args(argv)
+
+    out = sys.stdout
+    for result in dispatchAll(parseLines(readFiles(args.files))):
+        out.write(encoder.encode(result))
+        out.write('\n')
+    out.flush()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import io
+import json
+import sys
+import unittest
+import RCube.bulk as bulk
+
+
+class BulkTest(unittest.TestCase):
+# Unit Tests
+#
+# 1100 bulk -- JSON Lines driver for dispatch
+# Analysis
+#    inputs:  lines of JSON, one parameter dict per line
+#    outputs: one JSON dispatch result per line
+#
+# Happy path
+#    every parameter dict gives one result, in order
+#    blank lines are skipped
+#    parameter values reach dispatch as strings
+#
+# Sad path
+#    malformed line or non-dict entry gives an error result
+#    entries past the limit are replaced by one error result
+
+    def test1100_010_ShouldDispatchEveryLine(self):
+        lines = ['{"op": "create"}\n', '\n', '{"op": "create", "f": 1}\n']
+        results = list(bulk.dispatchAll(bulk.parseLines(lines)))
+        self.assertEqual(2, len(results))
+        self.assertEqual('created', results[0]['status'])
+        self.assertEqual('1', results[1]['cube'][0])
+
+    def test1100_020_ShouldWriteOneResultPerLine(self):
+        stdin, stdout = sys.stdin, sys.stdout
+        try:
+            sys.stdin = io.StringIO('{"op": "create"}\n{"op": "check"}\n')
+            sys.stdout = io.StringIO()
+            bulk.main([])
+            output = sys.stdout.getvalue()
+        finally:
+            sys.stdin, sys.stdout = stdin, stdout
+        results = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(['created', 'error:'], [result['status'] for result in results])
+
+    def test1100_900_ShouldReturnErrorForBadLines(self):
+        results = list(bulk.dispatchAll(bulk.parseLines(['not json\n', '[1, 2]\n'])))
+        self.assertEqual(['error: invalid parm'] * 2, [result['status'] for result in results])
+
+    def test1100_910_ShouldStopAtLimit(self):
+        results = list(bulk.dispatchAll([{'op': 'create'}] * 5, 3))
+        self.assertEqual(4, len(results))
+        self.assertEqual('error: batch limit exceeded', results[3]['status'])
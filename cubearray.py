@@ -0,0 +1,197 @@
+'''
+    NumPy batch engine for offline processing of many cubes
+
+    A batch is an (N, 54) uint8 array whose rows are byte states as
+    produced by cubestate.Palette.encode.  Moves are applied to every
+    row with one fancy-indexing gather and the check classifier runs
+    as a handful of whole-array comparisons.  Results match dispatch
+    row for row.
+
+    scrambleBatch and randomnessBatch generate and score many
+    scrambles at once; scrambleStats summarises the scores for the
+    /rcube/scramble/stats endpoint.
+
+    Requires numpy, which the web service itself does not need.
+'''
+
+import random
+from functools import lru_cache
+
+import numpy
+
+import RCube.scrambler as scrambler
+from RCube.cubestate import SOLVED_FACES, getPalette
+from RCube.cubies import CENTERS, CORNERS, CORNER_LOOKUP, EDGES, EDGE_LOOKUP, fromCubies
+from RCube.patterns import lookupTable
+from RCube.rotation import MOVES, sequencePermutation
+
+
+@lru_cache(maxsize=1024)
+def _sequenceIndex(moves):
+    index = numpy.array(sequencePermutation(moves), dtype=numpy.intp)
+    index.setflags(write=False)
+    return index
+
+
+def _cubieTables(lookup, size, width):
+    #  (cubie, twist) arrays indexed by the colors at a position read as
+    #  a base-6 number; cubie -1 for color combinations no cubie has
+    cubie = numpy.full(size, -1, dtype=numpy.intp)
+    twist = numpy.zeros(size, dtype=numpy.intp)
+    for colors, (number, turn) in lookup.items():
+        index = sum(color * 6 ** (width - 1 - k) for k, color in enumerate(colors))
+        cubie[index] = number
+        twist[index] = turn
+    return cubie, twist
+
+
+_CORNER_COLUMNS = numpy.array(CORNERS, dtype=numpy.intp)
+_EDGE_COLUMNS = numpy.array(EDGES, dtype=numpy.intp)
+_CORNER_CUBIE, _CORNER_TWIST = _cubieTables(CORNER_LOOKUP, 216, 3)
+_EDGE_CUBIE, _EDGE_FLIP = _cubieTables(EDGE_LOOKUP, 36, 2)
+
+
+def _parity(perms):
+    #  parity of each row's permutation: its inversion count mod 2
+    first, second = numpy.triu_indices(perms.shape[1], 1)
+    return (perms[:, first] > perms[:, second]).sum(axis=1) & 1
+
+
+def unreachableBatch(states):
+    '''cubies.unreachable of every row of face-index states with the
+    centers in place: an object array of reasons, None where the row
+    can be reached.'''
+    states = numpy.asarray(states, dtype=numpy.uint8).reshape(-1, 54).astype(numpy.intp)
+    reasons = numpy.full(len(states), None, dtype=object)
+    #  counts[row, color], by counting row * 6 + color over all rows
+    counts = numpy.bincount((states + numpy.arange(0, 6 * len(states), 6)[:, None]).ravel(),
+                            minlength=6 * len(states)).reshape(-1, 6)
+    pending = numpy.ones(len(states), dtype=bool)
+
+    def reject(failed, reason):
+        failed = pending & failed
+        reasons[failed] = reason
+        pending[failed] = False
+
+    reject((counts != 9).any(axis=1), 'wrong color count')
+    colors = states[:, _CORNER_COLUMNS]
+    corners = colors[:, :, 0] * 36 + colors[:, :, 1] * 6 + colors[:, :, 2]
+    colors = states[:, _EDGE_COLUMNS]
+    edges = colors[:, :, 0] * 6 + colors[:, :, 1]
+    cornerPerm = _CORNER_CUBIE[corners]
+    edgePerm = _EDGE_CUBIE[edges]
+    reject((cornerPerm < 0).any(axis=1) | (edgePerm < 0).any(axis=1), 'invalid cubie')
+    reject((numpy.sort(cornerPerm, axis=1) != numpy.arange(8)).any(axis=1) |
+           (numpy.sort(edgePerm, axis=1) != numpy.arange(12)).any(axis=1), 'duplicate cubie')
+    reject(_CORNER_TWIST[corners].sum(axis=1) % 3 != 0, 'twisted corner')
+    reject(_EDGE_FLIP[edges].sum(axis=1) % 2 != 0, 'flipped edge')
+    reject(_parity(cornerPerm) != _parity(edgePerm), 'permutation parity')
+    return reasons
+
+
+def stackStates(states):
+    '''Pack an iterable of 54-byte states into an (N, 54) uint8 array.'''
+    return numpy.frombuffer(b''.join(states), dtype=numpy.uint8).reshape(-1, 54)
+
+
+def unstackStates(states):
+    '''Split an (N, 54) uint8 array back into a list of 54-byte states.'''
+    data = numpy.ascontiguousarray(states, dtype=numpy.uint8).tobytes()
+    return [data[i:i + 54] for i in range(0, len(data), 54)]
+
+
+def rotateBatch(states, moves):
+    '''Apply a move or move sequence such as 'fRbUUl' to every row.
+
+    Returns a new (N, 54) array.  Raises KeyError for unknown moves.
+    '''
+    states = numpy.asarray(states, dtype=numpy.uint8)
+    return states[:, _sequenceIndex(moves)]
+
+
+def checkBatch(states, palette=None):
+    '''Classify every row the way op=check does.
+
+    Returns an array of registered pattern names ('full', 'crosses',
+    'spots', ...), 'unknown', 'error:' for rows with a code outside
+    the palette or a misplaced center, or 'error: <reason>' for rows
+    that cannot be reached by turning faces (checked only when the six
+    colors differ).  palette defaults to the standard six colors.
+    '''
+    if palette is None:
+        palette = getPalette()
+    states = numpy.asarray(states, dtype=numpy.uint8).reshape(-1, 54)
+    codes = numpy.frombuffer(palette.codes, dtype=numpy.uint8)
+
+    valid = numpy.isin(states, codes).all(axis=1)
+    valid &= (states[:, 4::9] == codes).all(axis=1)
+
+    labels = numpy.full(len(states), 'unknown', dtype=object)
+    labels[~valid] = 'error:'
+    if (palette.codes == CENTERS):
+        rows = numpy.flatnonzero(valid)
+        reasons = unreachableBatch(states[rows])
+        rejected = numpy.not_equal(reasons, None)
+        labels[rows[rejected]] = ['error: ' + reason for reason in reasons[rejected]]
+        valid[rows[rejected]] = False
+    unlabelled = valid
+    for signature, name in lookupTable(palette).items():
+        match = unlabelled & (states == numpy.frombuffer(signature, dtype=numpy.uint8)).all(axis=1)
+        labels[match] = name
+        unlabelled &= ~match
+    return labels
+
+
+#  gather permutation of each of scrambler.QUARTER_TURNS
+_TURN_INDEX = numpy.array([MOVES[name] for name in scrambler.QUARTER_TURNS], dtype=numpy.intp)
+
+
+def scrambleBatch(n, count, method='transition', rng=random):
+    '''count scrambled face-index states as an (count, 54) array.
+
+    transition rows are n-turn transition scrambles applied to a solved
+    cube, one turn across every row at a time; random rows are drawn
+    directly (the generating moves are not needed to score them).
+    '''
+    if (method == 'random'):
+        return stackStates(fromCubies(*scrambler.randomCubies(rng)) for _ in range(count))
+    if (method != 'transition'):
+        raise ValueError('unknown scramble method: ' + str(method))
+    states = numpy.tile(numpy.frombuffer(SOLVED_FACES, dtype=numpy.uint8), (count, 1))
+    if (n == 0 or count == 0):
+        return states
+    turns = numpy.array([scrambler.transitionTurns(n, rng) for _ in range(count)], dtype=numpy.intp)
+    for step in range(n):
+        states = numpy.take_along_axis(states, _TURN_INDEX[turns[:, step]], axis=1)
+    return states
+
+
+def randomnessBatch(states):
+    '''scrambler.randomness of every row, as an int array.'''
+    states = numpy.asarray(states, dtype=numpy.uint8).reshape(-1, 6, 9)
+    centers = states[:, :, 4]
+    #  counts[row, face, color]: facelets of face showing color
+    counts = (states[:, :, :, None] == centers[:, None, None, :]).sum(axis=2)
+    pairs = (counts * (counts - 1) // 2).sum(axis=(1, 2))
+    return numpy.rint(pairs * 100 / scrambler.PAIRS).astype(int)
+
+
+#  scrambles generated and scored at a time by scrambleStats, so its
+#  memory does not grow with count
+STATS_CHUNK = 4096
+
+
+def scrambleStats(n, count, method='transition', rng=random, chunk=STATS_CHUNK):
+    '''Score count scrambles and summarise: mean, (population) variance
+    and histogram, where histogram[s] is the number scoring s.'''
+    histogram = numpy.zeros(101, dtype=numpy.int64)
+    for start in range(0, count, chunk):
+        scores = randomnessBatch(scrambleBatch(n, min(chunk, count - start), method, rng))
+        histogram += numpy.bincount(scores, minlength=101)
+    mean = variance = 0.0
+    if (count):
+        scores = numpy.arange(101)
+        mean = float((scores * histogram).sum() / count)
+        variance = float((histogram * (scores - mean) ** 2).sum() / count)
+    return {'n': n, 'count': count, 'method': method,
+            'mean': mean, 'variance': variance, 'histogram': histogram.tolist()}
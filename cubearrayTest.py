@@ -0,0 +1,123 @@
+import random
+import unittest
+import numpy
+import RCube.cubearray as cubearray
+import RCube.dispatch as RCube
+import RCube.scrambler as scrambler
+from RCube.cubies import fromCubies, toCubies, unreachable
+from RCube.cubestate import getPalette, rotateState, CROSSES_FACES, SOLVED_FACES
+from RCube.patterns import PATTERNS
+
+
+class CubeArrayTest(unittest.TestCase):
+# Unit Tests
+#
+# 800 cubearray -- rotateBatch, checkBatch, scrambleBatch, randomnessBatch
+# Desired level of confidence: equivalence with dispatch
+# Analysis
+#    inputs:  states   (N, 54) uint8 array of face codes
+#             moves    move or move sequence, e.g. fRbUUl
+#    outputs: rotated (N, 54) array, or array of check labels
+#
+# Happy path
+#    every row rotates exactly as op=rotate does
+#    every row is labelled exactly as op=check labels it, including
+#    the reason an unreachable row is rejected, found for all rows at once
+#    states survive a stack / unstack round trip
+#    every row scores as scrambler.randomness scores it
+#    a transition batch matches the same scrambles turned one by one
+#    scramble stats summarised chunk by chunk match the whole batch
+#
+# Sad path
+#    unknown move raises KeyError
+
+    def setUp(self):
+        self.palette = getPalette()
+        self.random = random.Random(7)
+        rows = [self.palette.solved, self.palette.relabel(CROSSES_FACES), PATTERNS['spots'][1],
+                PATTERNS['superflip'][0]]
+        for _ in range(40):
+            moves = ''.join(self.random.choice('fFrRbBlLtTuU') for _ in range(6))
+            rows.append(rotateState(self.palette.solved, moves))
+        for _ in range(20):
+            rows.append(bytes(self.random.randrange(6) if i % 9 != 4 else i // 9 for i in range(54)))
+        rows.append(bytes([9]) + self.palette.solved[1:])
+        self.rows = rows
+        self.states = cubearray.stackStates(rows)
+
+    def dispatchRow(self, parm, row):
+        parm['cube'] = ','.join(self.palette.decode(row))
+        return RCube.dispatch(parm)
+
+    def test800_100_ShouldRotateLikeDispatch(self):
+        rotated = cubearray.rotateBatch(self.states, 'fRbUUl')
+        for row, result in zip(self.rows[:44], cubearray.unstackStates(rotated)):
+            expected = self.dispatchRow({'op': 'rotate', 'face': 'fRbUUl'}, row)
+            self.assertEqual(expected['cube'], self.palette.decode(result))
+
+    def test800_110_ShouldCheckLikeDispatch(self):
+        labels = cubearray.checkBatch(self.states)
+        self.assertEqual(len(self.rows), len(labels))
+        for row, label in zip(self.rows, labels):
+            if max(row) > 5:
+                self.assertEqual('error:', label)
+            else:
+                self.assertEqual(self.dispatchRow({'op': 'check'}, row)['status'], label)
+
+    def test800_115_ShouldCheckRepeatedColorsLikeDispatch(self):
+        self.palette = getPalette(('red', 'yellow', 'blue', 'white', 'red', 'orange'))
+        states = cubearray.rotateBatch(cubearray.stackStates([self.palette.solved] * 3), 'fR')
+        states[2, 0] = 9
+        labels = cubearray.checkBatch(states, self.palette)
+        self.assertEqual(['unknown', 'unknown', 'error:'], list(labels))
+        self.assertEqual('full', cubearray.checkBatch(cubearray.stackStates([self.palette.solved]),
+                                                      self.palette)[0])
+        self.assertEqual(labels[0], self.dispatchRow({'op': 'check', 'f': 'red'},
+                                                      cubearray.unstackStates(states)[0])['status'])
+
+    def test800_118_ShouldGiveEachUnreachableReason(self):
+        rows = [row for row in self.rows if max(row) <= 5]
+        cornerPerm, cornerTwist, edgePerm, edgeFlip = toCubies(self.rows[10])
+        rows.append(fromCubies(cornerPerm, [(cornerTwist[0] + 1) % 3] + cornerTwist[1:], edgePerm, edgeFlip))
+        rows.append(fromCubies(cornerPerm, cornerTwist, edgePerm, [1 - edgeFlip[0]] + edgeFlip[1:]))
+        rows.append(fromCubies(cornerPerm, cornerTwist, [edgePerm[1], edgePerm[0]] + edgePerm[2:], edgeFlip))
+        rows.append(fromCubies(cornerPerm, cornerTwist, [edgePerm[0]] * 2 + edgePerm[2:], edgeFlip))
+        reasons = cubearray.unreachableBatch(cubearray.stackStates(rows))
+        self.assertEqual([unreachable(row) for row in rows], list(reasons))
+        self.assertEqual(['twisted corner', 'flipped edge', 'permutation parity', 'wrong color count'],
+                         list(reasons[-4:]))
+
+    def test800_120_ShouldFindEachPattern(self):
+        labels = list(cubearray.checkBatch(self.states[:4]))
+        self.assertEqual(['full', 'crosses', 'spots', 'superflip'], labels)
+        self.assertEqual(CROSSES_FACES, self.rows[1])
+
+    def test800_130_ShouldRoundTripStates(self):
+        self.assertEqual(self.rows, cubearray.unstackStates(self.states))
+        self.assertEqual((len(self.rows), 54), self.states.shape)
+        self.assertEqual(numpy.uint8, self.states.dtype)
+
+    def test800_140_ShouldScoreLikeScrambler(self):
+        scores = cubearray.randomnessBatch(self.states)
+        self.assertEqual([scrambler.randomness(row) for row in self.rows], scores.tolist())
+        self.assertEqual(100, scores[0])
+
+    def test800_150_ShouldScrambleLikeScrambler(self):
+        states = cubearray.scrambleBatch(12, 30, 'transition', random.Random(3))
+        rng = random.Random(3)
+        expected = [rotateState(SOLVED_FACES, ''.join(scrambler.transitionScramble(12, rng)))
+                    for _ in range(30)]
+        self.assertEqual(expected, cubearray.unstackStates(states))
+
+    def test800_160_ShouldSummariseInChunks(self):
+        for method in scrambler.METHODS:
+            whole = cubearray.scrambleStats(9, 50, method, random.Random(4), chunk=50)
+            chunked = cubearray.scrambleStats(9, 50, method, random.Random(4), chunk=7)
+            scores = cubearray.randomnessBatch(cubearray.scrambleBatch(9, 50, method, random.Random(4)))
+            self.assertEqual(whole, chunked)
+            self.assertEqual(50, sum(chunked['histogram']))
+            self.assertAlmostEqual(float(scores.mean()), chunked['mean'])
+            self.assertAlmostEqual(float(scores.var()), chunked['variance'])
+
+    def test800_900_ShouldRaiseOnUnknownMove(self):
+        self.assertRaises(KeyError, cubearray.rotateBatch, self.states, 'fx')
@@ -0,0 +1,88 @@
+'''
+    Compact cube representation for the rcube service
+
+    Internally a cube is 54 bytes, one per facelet, in the same
+    f r b l t u order as the HTTP cube list.  Each byte is the face
+    code of the facelet's color.  A Palette translates between the
+    caller's color names and those codes, so color strings only exist
+    at the HTTP boundary.
+'''
+
+from functools import lru_cache
+from operator import itemgetter
+
+from RCube.rotation import sequenceGather
+
+
+DEFAULT_COLORS = ('green', 'yellow', 'blue', 'white', 'red', 'orange')
+
+FACE_KEYS = ('f', 'r', 'b', 'l', 't', 'u')
+
+CENTERS = slice(4, 54, 9)
+
+#  face index of every facelet on a solved cube
+SOLVED_FACES = bytes(face for face in range(6) for _ in range(9))
+
+#  face index of every facelet on the 'crosses' pattern: each face keeps
+#  its center cross and takes its corners from a neighbouring face
+CROSSES_FACES = bytes([4, 0, 4, 0, 0, 0, 4, 0, 4,
+                       0, 1, 0, 1, 1, 1, 0, 1, 0,
+                       5, 2, 5, 2, 2, 2, 5, 2, 5,
+                       2, 3, 2, 3, 3, 3, 2, 3, 2,
+                       1, 4, 1, 4, 4, 4, 1, 4, 1,
+                       3, 5, 3, 5, 5, 5, 3, 5, 3])
+
+
+class Palette(object):
+    '''Maps the six face colors of a request to face codes 0-5.
+
+    A color's code is the index of the first face that uses it, so a
+    palette that repeats a color still compares facelets exactly the
+    way the color names themselves would.
+    '''
+
+    __slots__ = ('colors', 'codes', '_index', 'solved')
+
+    def __init__(self, colors=DEFAULT_COLORS):
+        self.colors = tuple(colors)
+        self._index = {}
+        for face, color in enumerate(self.colors):
+            self._index.setdefault(color, face)
+        self.codes = bytes(self._index[color] for color in self.colors)
+        self.solved = self.relabel(SOLVED_FACES)
+
+    @classmethod
+    def fromParm(cls, parm):
+        '''Palette from the optional f/r/b/l/t/u request parameters.'''
+        return getPalette(tuple(parm.get(key, default) for key, default in zip(FACE_KEYS, DEFAULT_COLORS)))
+
+    def relabel(self, faces):
+        '''Translate a state written in face indices into this palette's codes.'''
+        return faces.translate(self.codes + bytes(250))
+
+    def encode(self, cubelist):
+        '''Color names -> 54-byte state, or None if a color is not in the palette.'''
+        try:
+            return bytes(itemgetter(*cubelist)(self._index))
+        except KeyError:
+            return None
+
+    def decode(self, state):
+        '''54-byte state -> list of color names.'''
+        return list(itemgetter(*state)(self.colors))
+
+    def hasCenters(self, state):
+        '''True if every center facelet shows its own face's color.'''
+        return state[CENTERS] == self.codes
+
+
+@lru_cache(maxsize=256)
+def getPalette(colors=DEFAULT_COLORS):
+    '''Shared Palette for a tuple of six colors; palettes are immutable.'''
+    return Palette(colors)
+
+
+def rotateState(state, moves):
+    '''Return a new byte state with a move sequence such as 'fRb' applied.'''
+    return bytes(sequenceGather(moves)(state))
+
@@ -0,0 +1,61 @@
+import unittest
+import RCube.cubestate as cubestate
+
+
+class CubeStateTest(unittest.TestCase):
+# Unit Tests
+#
+# 500 cubestate -- Palette
+# Desired level of confidence: boundary value analysis
+# Analysis
+#    inputs:  colors   six color names in f r b l t u order
+#             cubelist list of 54 color names
+#    outputs: 54-byte state of face codes, and back again
+#
+# Happy path
+#    default palette encodes the default cube as codes 0-5, nine of each
+#    encode followed by decode returns the original list
+#    custom colors are taken from the f/r/b/l/t/u parameters
+#    a palette that repeats a color gives both faces the same code
+#
+# Sad path
+#    a color outside the palette encodes to None
+#    a misplaced center is reported
+
+    def setUp(self):
+        self.palette = cubestate.Palette()
+        self.cubelist = []
+        for color in cubestate.DEFAULT_COLORS:
+            self.cubelist += [color] * 9
+
+    def test500_100_ShouldEncodeDefaultCube(self):
+        state = self.palette.encode(self.cubelist)
+        self.assertEqual(54, len(state))
+        self.assertEqual(self.palette.solved, state)
+        self.assertEqual(cubestate.SOLVED_FACES, state)
+
+    def test500_110_ShouldDecodeToOriginalList(self):
+        state = self.palette.encode(self.cubelist)
+        self.assertEqual(self.cubelist, self.palette.decode(state))
+
+    def test500_120_ShouldTakeColorsFromParm(self):
+        palette = cubestate.Palette.fromParm({'op': 'create', 'f': 'f', 'u': 'u'})
+        self.assertEqual(('f', 'yellow', 'blue', 'white', 'red', 'u'), palette.colors)
+
+    def test500_130_ShouldShareCodeForRepeatedColor(self):
+        palette = cubestate.Palette(('1', '1', '3', '4', '5', '6'))
+        self.assertEqual(bytes([0, 0, 2, 3, 4, 5]), palette.codes)
+        self.assertTrue(palette.hasCenters(palette.solved))
+
+    def test500_140_ShouldRotateState(self):
+        state = self.palette.encode(self.cubelist)
+        self.assertEqual(state, cubestate.rotateState(cubestate.rotateState(state, 'fRb'), 'BrF'))
+
+    def test500_900_ShouldRejectUnknownColor(self):
+        self.cubelist[7] = 'purple'
+        self.assertEqual(None, self.palette.encode(self.cubelist))
+
+    def test500_910_ShouldDetectMisplacedCenter(self):
+        self.cubelist[4], self.cubelist[13] = self.cubelist[13], self.cubelist[4]
+        state = self.palette.encode(self.cubelist)
+        self.assertFalse(self.palette.hasCenters(state))
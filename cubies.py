@@ -0,0 +1,132 @@
+'''
+    Cubie-level view of a cube and the reachability check
+
+    A face-index state (54 bytes, face k's center showing k) is read as
+    8 corner and 12 edge cubies.  A state can be reached from a solved
+    cube by turning faces exactly when every cubie is present once,
+    the corner twists sum to 0 mod 3, the edge flips sum to 0 mod 2 and
+    the corner and edge permutations have the same parity.
+'''
+
+from operator import itemgetter
+
+
+#  corner positions as facelet triples: the top or under facelet first,
+#  then the other two clockwise seen from outside the cube
+CORNERS = ((36, 20, 27), (38, 11, 18), (42, 29, 0), (44, 2, 9),
+           (45, 6, 35), (47, 15, 8), (51, 33, 26), (53, 24, 17))
+
+#  edge positions as facelet pairs: the top or under facelet first, or
+#  for the middle layer the front or back facelet first
+EDGES = ((37, 19), (39, 28), (41, 10), (43, 1),
+         (3, 32), (5, 12), (21, 14), (23, 30),
+         (46, 7), (48, 34), (50, 16), (52, 25))
+
+CENTERS = bytes(range(6))
+
+
+def _cornerLookup():
+    #  colors read at a position -> (cubie, twist); twist is how far the
+    #  cubie's top/under color sits from the position's first facelet
+    lookup = {}
+    for cubie, facelets in enumerate(CORNERS):
+        colors = [facelet // 9 for facelet in facelets]
+        for twist in range(3):
+            lookup[tuple(colors[(k - twist) % 3] for k in range(3))] = (cubie, twist)
+    return lookup
+
+
+def _edgeLookup():
+    lookup = {}
+    for cubie, facelets in enumerate(EDGES):
+        first, second = [facelet // 9 for facelet in facelets]
+        lookup[(first, second)] = (cubie, 0)
+        lookup[(second, first)] = (cubie, 1)
+    return lookup
+
+
+CORNER_LOOKUP = _cornerLookup()
+EDGE_LOOKUP = _edgeLookup()
+
+
+def parity(perm):
+    '''0 for an even permutation, 1 for an odd one.'''
+    seen = [False] * len(perm)
+    transpositions = 0
+    for start in range(len(perm)):
+        length = 0
+        position = start
+        while (not seen[position]):
+            seen[position] = True
+            position = perm[position]
+            length += 1
+        if (length):
+            transpositions += length - 1
+    return transpositions & 1
+
+
+_CORNER_FACELETS = itemgetter(*[facelet for facelets in CORNERS for facelet in facelets])
+_EDGE_FACELETS = itemgetter(*[facelet for facelets in EDGES for facelet in facelets])
+
+
+def toCubies(state):
+    '''Read a face-index state as cubies.
+
+    Returns (cornerPerm, cornerTwist, edgePerm, edgeFlip) where
+    cornerPerm[i] is the cubie sitting at corner position i, or None
+    if some position shows a color combination no cubie has.
+    '''
+    colors = iter(_CORNER_FACELETS(state))
+    corners = list(map(CORNER_LOOKUP.get, zip(colors, colors, colors)))
+    colors = iter(_EDGE_FACELETS(state))
+    edges = list(map(EDGE_LOOKUP.get, zip(colors, colors)))
+    if (None in corners or None in edges):
+        return None
+    cornerPerm, cornerTwist = zip(*corners)
+    edgePerm, edgeFlip = zip(*edges)
+    return list(cornerPerm), list(cornerTwist), list(edgePerm), list(edgeFlip)
+
+
+def fromCubies(cornerPerm, cornerTwist, edgePerm, edgeFlip):
+    '''Build the face-index state for a cubie description.'''
+    state = bytearray(54)
+    for face in range(6):
+        state[face * 9 + 4] = face
+    for position, facelets in enumerate(CORNERS):
+        colors = [facelet // 9 for facelet in CORNERS[cornerPerm[position]]]
+        twist = cornerTwist[position]
+        for k in range(3):
+            state[facelets[k]] = colors[(k - twist) % 3]
+    for position, facelets in enumerate(EDGES):
+        colors = [facelet // 9 for facelet in EDGES[edgePerm[position]]]
+        flip = edgeFlip[position]
+        for k in range(2):
+            state[facelets[k]] = colors[(k + flip) % 2]
+    return bytes(state)
+
+
+def unreachable(state):
+    '''Why a face-index state cannot be reached, or None if it can.'''
+    if (len(state) != 54 or state[4::9] != CENTERS):
+        return 'misplaced center'
+    for face in range(6):
+        if (state.count(face) != 9):
+            return 'wrong color count'
+    cubies = toCubies(state)
+    if (cubies is None):
+        return 'invalid cubie'
+    cornerPerm, cornerTwist, edgePerm, edgeFlip = cubies
+    if (len(set(cornerPerm)) != 8 or len(set(edgePerm)) != 12):
+        return 'duplicate cubie'
+    if (sum(cornerTwist) % 3):
+        return 'twisted corner'
+    if (sum(edgeFlip) % 2):
+        return 'flipped edge'
+    if (parity(cornerPerm) != parity(edgePerm)):
+        return 'permutation parity'
+    return None
+
+
+def isReachable(state):
+    '''True if a face-index state can be reached by turning faces.'''
+    return unreachable(state) is None
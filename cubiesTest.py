@@ -0,0 +1,92 @@
+import random
+import unittest
+import RCube.cubies as cubies
+import RCube.dispatch as RCube
+from RCube.cubestate import SOLVED_FACES, rotateState
+
+
+class CubiesTest(unittest.TestCase):
+# Unit Tests
+#
+# 1400 cubies -- toCubies, fromCubies, unreachable
+# Desired level of confidence: boundary value analysis
+# Analysis
+#    inputs:  state   54-byte face-index state
+#    outputs: corner/edge permutation, twist and flip; reason the state
+#             cannot be reached, or None
+#
+# Happy path
+#    every scrambled cube is reachable
+#    toCubies and fromCubies round trip
+#    the solved cube is the identity with no twist or flip
+#    a cube in a palette that repeats a color is not judged unreachable
+#
+# Sad path
+#    a single twisted corner is rejected
+#    a single flipped edge is rejected
+#    two swapped edges are rejected for parity
+#    two swapped facelets give an invalid cubie
+#    a wrong color count is rejected
+#    a misplaced center is rejected
+
+    def setUp(self):
+        self.random = random.Random(11)
+
+    def scramble(self):
+        return rotateState(SOLVED_FACES, ''.join(self.random.choice('fFrRbBlLtTuU') for _ in range(25)))
+
+    def test1400_010_ShouldReadSolvedCubeAsIdentity(self):
+        self.assertEqual((list(range(8)), [0] * 8, list(range(12)), [0] * 12),
+                         cubies.toCubies(SOLVED_FACES))
+
+    def test1400_020_ShouldReachScrambledCubes(self):
+        for _ in range(200):
+            state = self.scramble()
+            self.assertEqual(None, cubies.unreachable(state))
+            self.assertEqual(state, cubies.fromCubies(*cubies.toCubies(state)))
+
+    def test1400_030_ShouldAcceptRepeatedColorCubes(self):
+        created = RCube.dispatch({'op': 'create', 'f': 'red'})
+        cube = ','.join(created['cube'])
+        self.assertEqual('full', RCube.dispatch({'op': 'check', 'f': 'red', 'cube': cube})['status'])
+        rotated = RCube.dispatch({'op': 'rotate', 'f': 'red', 'face': 'Fr', 'cube': cube})
+        self.assertEqual('rotated', rotated['status'])
+        self.assertEqual('unknown', RCube.dispatch({'op': 'check', 'f': 'red',
+                                                    'cube': ','.join(rotated['cube'])})['status'])
+        self.assertEqual('error: repeated color',
+                         RCube.dispatch({'op': 'solve', 'f': 'red', 'cube': cube})['status'])
+
+    def test1400_900_ShouldRejectTwistedCorner(self):
+        cornerPerm, cornerTwist, edgePerm, edgeFlip = cubies.toCubies(self.scramble())
+        cornerTwist[3] = (cornerTwist[3] + 1) % 3
+        state = cubies.fromCubies(cornerPerm, cornerTwist, edgePerm, edgeFlip)
+        self.assertEqual('twisted corner', cubies.unreachable(state))
+        self.assertFalse(cubies.isReachable(state))
+
+    def test1400_910_ShouldRejectFlippedEdge(self):
+        cornerPerm, cornerTwist, edgePerm, edgeFlip = cubies.toCubies(self.scramble())
+        edgeFlip[5] ^= 1
+        state = cubies.fromCubies(cornerPerm, cornerTwist, edgePerm, edgeFlip)
+        self.assertEqual('flipped edge', cubies.unreachable(state))
+
+    def test1400_920_ShouldRejectSwappedEdges(self):
+        cornerPerm, cornerTwist, edgePerm, edgeFlip = cubies.toCubies(self.scramble())
+        edgePerm[0], edgePerm[1] = edgePerm[1], edgePerm[0]
+        edgeFlip[0], edgeFlip[1] = edgeFlip[1], edgeFlip[0]
+        state = cubies.fromCubies(cornerPerm, cornerTwist, edgePerm, edgeFlip)
+        self.assertEqual('permutation parity', cubies.unreachable(state))
+
+    def test1400_930_ShouldRejectSwappedFacelets(self):
+        state = bytearray(SOLVED_FACES)
+        state[0], state[9] = state[9], state[0]
+        self.assertEqual('invalid cubie', cubies.unreachable(bytes(state)))
+
+    def test1400_940_ShouldRejectWrongColorCount(self):
+        state = bytearray(SOLVED_FACES)
+        state[0] = 1
+        self.assertEqual('wrong color count', cubies.unreachable(bytes(state)))
+
+    def test1400_950_ShouldRejectMisplacedCenter(self):
+        state = bytearray(SOLVED_FACES)
+        state[4], state[13] = state[13], state[4]
+        self.assertEqual('misplaced center', cubies.unreachable(bytes(state)))
@@ -35,8 +35,7 @@ class DispatchTest(unittest.TestCase):
         '''Convert JSON string to dictionary'''
         result = {}
         try:
-            jsonString = httpResponse.replace("'", "\"")
-            unicodeDictionary = json.loads(jsonString)
+            unicodeDictionary = json.loads(httpResponse)
             for element in unicodeDictionary:
                 if(isinstance(unicodeDictionary[element],unicode)):
                     result[str(element)] = str(unicodeDictionary[element])
@@ -1013,6 +1012,13 @@ class DispatchTest(unittest.TestCase):
         self.assertEquals(resultDict['status'],'scrambled 100')
         self.assertEquals(0, len(resultDict['rotations']))
         
+    def test700_110_ShouldScrambleNothingForNZero(self):
+        queryString =  "op=scramble&n=0"
+        resultString = self.httpGetAndResponse(queryString)
+        resultDict = self.string2dict(resultString)
+        self.assertEquals(resultDict['status'],'scrambled 100')
+        self.assertEquals(0, len(resultDict['rotations']))
+        
     def test700_930_ShouldReturnErrorOnNValueMissing(self):
         queryString = "op=scramble&n="
         resultString = self.httpGetAndResponse(queryString)
@@ -0,0 +1,62 @@
+'''
+    JSON encoding of dispatch results
+
+    dispatch results are small dicts whose bulk is a 54-element cube of
+    a handful of repeated color names.  Each distinct string is
+    serialized once and its JSON fragment reused, and the default
+    solved cube from createCube is kept fully pre-serialized, so
+    encoding a cube is one join over cached fragments.
+'''
+
+import json
+
+import RCube.dispatch as RCube
+
+
+CONTENT_TYPE = 'application/json'
+
+#  upper bound on cached string fragments; colors arrive from callers
+FRAGMENT_LIMIT = 4096
+
+_fragments = {}
+
+
+def _fragment(value):
+    fragment = _fragments.get(value)
+    if (fragment is None):
+        fragment = json.dumps(value)
+        if (len(_fragments) < FRAGMENT_LIMIT):
+            _fragments[value] = fragment
+    return fragment
+
+
+DEFAULT_CUBE = RCube.createCube({})
+DEFAULT_CUBE_JSON = json.dumps(DEFAULT_CUBE)
+
+
+def _encodeList(values):
+    if (values == DEFAULT_CUBE):
+        return DEFAULT_CUBE_JSON
+    try:
+        return '[' + ', '.join(map(_fragments.__getitem__, values)) + ']'
+    except (KeyError, TypeError):
+        pass
+    for value in values:
+        if (type(value) is not str):
+            return json.dumps(values)
+    return '[' + ', '.join(map(_fragment, values)) + ']'
+
+
+def encode(result):
+    '''Serialize a dispatch result dict to a JSON string.'''
+    parts = []
+    for key in result:
+        value = result[key]
+        if (type(value) is str):
+            fragment = _fragment(value)
+        elif (type(value) is list):
+            fragment = _encodeList(value)
+        else:
+            fragment = json.dumps(value)
+        parts.append(_fragment(key) + ': ' + fragment)
+    return '{' + ', '.join(parts) + '}'
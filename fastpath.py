@@ -0,0 +1,181 @@
+'''
+    Raw query-string path into dispatch
+
+    The web front ends hand the undecoded query string to respond,
+    which parses it once into a Parameters mapping: immutable, keys and
+    short values interned, percent-decoding done only for the pieces
+    that need it, and the cube split at its commas only when a handler
+    asks for cubeList.  A plain op=create, the most common and cheapest
+    query, is answered from a response encoded once; everything else
+    goes through the response cache to dispatch.
+
+    "python -m RCube.fastpath" times this path against the Flask
+    request.args path it replaces.
+'''
+
+import argparse
+import sys
+import timeit
+from collections.abc import Mapping
+from time import perf_counter
+from urllib.parse import unquote_plus
+
+import RCube.dispatch as RCube
+import RCube.encoder as encoder
+import RCube.metrics as metrics
+import RCube.responsecache as responsecache
+
+
+#  values up to this long are interned; they are op names, colors,
+#  faces and numbers that recur from query to query
+INTERN_LIMIT = 16
+
+
+class Parameters(Mapping):
+    '''Read-only parameter mapping parsed from a query string.'''
+
+    __slots__ = ('_values', '_cubeList')
+
+    def __init__(self, values):
+        self._values = values
+        self._cubeList = None
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def keys(self):
+        return self._values.keys()
+
+    def items(self):
+        return self._values.items()
+
+    def cubeList(self):
+        '''The cube parameter split at commas, computed once.'''
+        if (self._cubeList is None):
+            self._cubeList = self._values['cube'].split(',')
+        return self._cubeList
+
+    def __repr__(self):
+        return 'Parameters(%r)' % (self._values,)
+
+
+def _decode(text):
+    if ('%' in text or '+' in text):
+        return unquote_plus(text, errors='replace')
+    return text
+
+
+def parse(query):
+    '''Query string (str, or bytes as sent) -> Parameters.  Blank values
+    are kept and the first of repeated keys wins, as with Flask.'''
+    if (isinstance(query, bytes)):
+        query = query.decode('utf-8', 'replace')
+    values = {}
+    intern = sys.intern
+    for piece in query.split('&'):
+        if (not piece):
+            continue
+        key, _, value = piece.partition('=')
+        key = intern(_decode(key))
+        if (key not in values):
+            value = _decode(value)
+            values[key] = intern(value) if len(value) <= INTERN_LIMIT else value
+    return Parameters(values)
+
+
+_createBody = None
+
+
+def _create():
+    global _createBody
+    if (_createBody is None):
+        _createBody = encoder.encode(RCube.dispatch({'op': 'create'}))
+    return _createBody
+
+
+def quickResponse(parm):
+    '''Encoded response for queries answered without dispatch, else None.
+    Answers after the first are counted for /metrics as status cached.'''
+    if (len(parm) == 1 and parm.get('op') == 'create'):
+        if (_createBody is None):
+            return _create()
+        started = perf_counter()
+        body = _createBody
+        metrics.observe('create', 'cached', perf_counter() - started)
+        return body
+    return None
+
+
+def respond(query):
+    '''Encoded response for a raw /rcube query string.'''
+    try:
+        parm = parse(query)
+        body = quickResponse(parm)
+        if (body is None):
+            body = responsecache.respond(parm)
+        return body
+    except Exception as e:
+        return encoder.encode({'status': 'error: ' + str(e)})
+
+
+#  ----------------------------------------------------------------------
+#  benchmark
+
+BENCH_QUERIES = {
+    'create': 'op=create',
+    'create colors': 'op=create&f=1&r=2&b=3&l=4&t=5&u=6',
+    'check': 'op=check&cube=' + ','.join(c for c in ('green', 'yellow', 'blue', 'white', 'red', 'orange')
+                                         for _ in range(9)),
+    'scramble': 'op=scramble&n=20&method=transition&seed=1',
+}
+
+
+def benchmark(number=20000, queries=BENCH_QUERIES):
+    '''Microseconds per query for the Flask request.args path and for
+    respond, both with the response cache as it is.'''
+    from werkzeug.datastructures import ImmutableMultiDict
+    from urllib.parse import parse_qsl
+
+    def flaskPath(query):
+        #  what microservice.server did: werkzeug parses request.args,
+        #  then every value is copied into a new dict
+        args = ImmutableMultiDict(parse_qsl(query, keep_blank_values=True))
+        parm = {}
+        for key in args:
+            parm[key] = str(args[key])
+        return responsecache.respond(parm)
+
+    results = {}
+    for name, query in queries.items():
+        raw = query.encode('ascii')
+        before = min(timeit.repeat(lambda: flaskPath(query), number=number, repeat=3))
+        after = min(timeit.repeat(lambda: respond(raw), number=number, repeat=3))
+        results[name] = (before * 1e6 / number, after * 1e6 / number)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m RCube.fastpath',
+                                     description='Time the raw query path against the request.args path.')
+    parser.add_argument('--number', type=int, default=20000, help='calls per query (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    for name, (before, after) in benchmark(args.number).items():
+        print('%-14s request.args %7.2f us   raw %7.2f us   %.1fx' % (name, before, after, before / after))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import json
+import unittest
+import RCube.dispatch as RCube
+import RCube.fastpath as fastpath
+import RCube.responsecache as responsecache
+import RCube.schema as schema
+
+
+class FastPathTest(unittest.TestCase):
+# Unit Tests
+#
+# 2300 fastpath -- parse, Parameters, respond
+# Desired level of confidence: equivalence with the request.args path
+# Analysis
+#    inputs:  query  raw query string, str or bytes
+#    outputs: Parameters mapping; encoded dispatch response
+#
+# Happy path
+#    pieces are percent- and plus-decoded, blank values kept, first of
+#    repeated keys wins
+#    keys are interned
+#    the cube is split once, on demand
+#    responses match dispatch for create, check and scramble
+#
+# Sad path
+#    the mapping cannot be changed
+#    pieces without a key or with bad escapes do not fail the parse
+
+    def setUp(self):
+        self.saved = responsecache.cache
+        responsecache.cache = responsecache.ResponseCache(1 << 20)
+
+    def tearDown(self):
+        responsecache.cache = self.saved
+
+    def test2300_010_ShouldParseLikeFlask(self):
+        parm = fastpath.parse(b'op=create&f=light+green&r=%C3%A9&n=&op=check&flag')
+        self.assertEqual({'op': 'create', 'f': 'light green', 'r': 'é', 'n': '', 'flag': ''},
+                         dict(parm))
+
+    def test2300_020_ShouldInternKeys(self):
+        first = fastpath.parse('operation=create')
+        second = fastpath.parse('operation=create')
+        self.assertIs(list(first)[0], list(second)[0])
+        self.assertIs(first['operation'], second['operation'])
+
+    def test2300_030_ShouldSplitCubeOnce(self):
+        parm = fastpath.parse('op=check&cube=a,b,c')
+        self.assertEqual(['a', 'b', 'c'], parm.cubeList())
+        self.assertIs(parm.cubeList(), parm.cubeList())
+        self.assertIs(parm.cubeList(), schema.cubeList(parm))
+
+    def test2300_100_ShouldRespondLikeDispatch(self):
+        cube = ','.join(['green'] * 9 + ['yellow'] * 9 + ['blue'] * 9 + ['white'] * 9 +
+                        ['red'] * 9 + ['orange'] * 9)
+        for query in ('op=create', 'op=create&f=x', 'op=check&cube=' + cube,
+                      'op=scramble&n=7&method=transition&seed=2', 'op=nonsense', ''):
+            expected = RCube.dispatch(dict(fastpath.parse(query)))
+            self.assertEqual(expected, json.loads(fastpath.respond(query.encode('ascii'))))
+
+    def test2300_900_ShouldBeReadOnly(self):
+        parm = fastpath.parse('op=create')
+        with self.assertRaises(TypeError):
+            parm['op'] = 'check'
+        self.assertRaises(AttributeError, setattr, parm, 'extra', 1)
+
+    def test2300_910_ShouldTolerateOddPieces(self):
+        self.assertEqual({'': 'x', 'a': '%zz'}, dict(fastpath.parse('=x&&a=%zz')))
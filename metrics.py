@@ -0,0 +1,180 @@
+'''
+    Per-op request metrics in Prometheus text format
+
+    dispatch reports every call here: the op, the status it answered
+    and how long it took.  Answers served without dispatch, from the
+    response cache or the op=create fast path, are reported with status
+    cached.  Each thread counts into its own shard, so
+    recording takes no lock; a shard is folded into a shared total when
+    its thread ends.  render merges the totals and the live shards into
+    the Prometheus text exposition format for /metrics:
+
+        rcube_dispatch_seconds    histogram of dispatch latency by op
+                                  and status
+        rcube_dispatch_errors     errors by op and reason (the text
+                                  after "error:")
+        rcube_response_cache_*    response cache counters, when given
+
+    status is the first word of the answer ('created', 'scrambled',
+    'full', ...), 'error' or 'cached'.  To keep the number of series bounded,
+    unknown ops are counted as 'unknown', a missing op as 'none', and
+    at most REASON_LIMIT distinct reasons are kept per op, the rest
+    counting as 'other'.  Counts are per process.
+'''
+
+import bisect
+import threading
+import weakref
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+#  upper bounds, in seconds, of the latency histogram buckets
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REASON_LIMIT = 32
+
+#  ops counted under their own name; dispatch adds its ops
+OPS = set()
+
+
+class _Shard(object):
+    #  one thread's counts:
+    #    latency[(op, status)] = [count, sum of seconds, bucket counts...]
+    #    errors[(op, reason)] = count
+    __slots__ = ('latency', 'errors', '__weakref__')
+
+    def __init__(self):
+        self.latency = {}
+        self.errors = {}
+
+
+_local = threading.local()
+_lock = threading.Lock()
+_shards = weakref.WeakSet()
+_retired = _Shard()
+_reasons = {}                       # op -> set of reasons kept
+
+
+def _merge(into, latency, errors):
+    for key, counts in latency.items():
+        total = into.latency.get(key)
+        if (total is None):
+            into.latency[key] = list(counts)
+        else:
+            for index, count in enumerate(counts):
+                total[index] += count
+    for key, count in errors.items():
+        into.errors[key] = into.errors.get(key, 0) + count
+
+
+def _retire(latency, errors):
+    with _lock:
+        _merge(_retired, latency, errors)
+
+
+def _newShard():
+    shard = _Shard()
+    #  when the thread ends its shard is freed and the counts survive
+    weakref.finalize(shard, _retire, shard.latency, shard.errors)
+    with _lock:
+        _shards.add(shard)
+    _local.shard = shard
+    return shard
+
+
+def _reason(op, status):
+    reason = status[6:].strip() or 'invalid request'
+    kept = _reasons.get(op)
+    if (kept is None):
+        with _lock:
+            kept = _reasons.setdefault(op, set())
+    if (reason in kept):
+        return reason
+    if (len(kept) < REASON_LIMIT):
+        with _lock:
+            if (len(kept) < REASON_LIMIT):
+                kept.add(reason)
+                return reason
+    return 'other'
+
+
+def observe(op, status, seconds):
+    '''Count one dispatch of op answering status after seconds.'''
+    if (op not in OPS):
+        op = 'none' if op is None else 'unknown'
+    try:
+        shard = _local.shard
+    except AttributeError:
+        shard = _newShard()
+    if (status[:5] == 'error'):
+        label = 'error'
+        key = (op, _reason(op, status))
+        shard.errors[key] = shard.errors.get(key, 0) + 1
+    else:
+        label = status.split(' ', 1)[0]
+    counts = shard.latency.get((op, label))
+    if (counts is None):
+        counts = shard.latency[(op, label)] = [0, 0.0] + [0] * (len(BUCKETS) + 1)
+    counts[0] += 1
+    counts[1] += seconds
+    counts[2 + bisect.bisect_left(BUCKETS, seconds)] += 1
+
+
+def snapshot():
+    '''Counts of every thread merged: (latency, errors) as in _Shard.'''
+    total = _Shard()
+    with _lock:
+        _merge(total, _retired.latency, _retired.errors)
+        for shard in list(_shards):
+            _merge(total, dict(shard.latency), dict(shard.errors))
+    return total.latency, total.errors
+
+
+def reset():
+    '''Forget every count (for tests).'''
+    with _lock:
+        _retired.latency.clear()
+        _retired.errors.clear()
+        for shard in list(_shards):
+            shard.latency.clear()
+            shard.errors.clear()
+        _reasons.clear()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join('%s="%s"' % (name, _escape(value)) for name, value in sorted(labels.items())) + '}'
+
+
+def render(cacheStats=None):
+    '''Every metric in Prometheus text format, with the response cache
+    counters if cacheStats (ResponseCache.stats()) is given.'''
+    latency, errors = snapshot()
+    lines = ['# HELP rcube_dispatch_seconds Time spent in dispatch, by op and result status.',
+             '# TYPE rcube_dispatch_seconds histogram']
+    for (op, status), counts in sorted(latency.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), counts[2:]):
+            cumulative += count
+            lines.append('rcube_dispatch_seconds_bucket%s %d'
+                         % (_labels(op=op, status=status, le=bound if bound == '+Inf' else repr(bound)),
+                            cumulative))
+        lines.append('rcube_dispatch_seconds_sum%s %r' % (_labels(op=op, status=status), counts[1]))
+        lines.append('rcube_dispatch_seconds_count%s %d' % (_labels(op=op, status=status), counts[0]))
+    lines.append('# HELP rcube_dispatch_errors_total Dispatch errors, by op and reason.')
+    lines.append('# TYPE rcube_dispatch_errors_total counter')
+    for (op, reason), count in sorted(errors.items()):
+        lines.append('rcube_dispatch_errors_total%s %d' % (_labels(op=op, reason=reason), count))
+    if (cacheStats is not None):
+        for name in ('hits', 'misses', 'evictions'):
+            lines.append('# TYPE rcube_response_cache_%s_total counter' % name)
+            lines.append('rcube_response_cache_%s_total %d' % (name, cacheStats[name]))
+        for name in ('entries', 'bytes'):
+            lines.append('# TYPE rcube_response_cache_%s gauge' % name)
+            lines.append('rcube_response_cache_%s %d' % (name, cacheStats[name]))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,127 @@
+import threading
+import timeit
+import unittest
+import RCube.dispatch as RCube
+import RCube.fastpath as fastpath
+import RCube.metrics as metrics
+import RCube.microservice as microservice
+import RCube.responsecache as responsecache
+from RCube.cubestate import DEFAULT_COLORS
+
+
+class MetricsTest(unittest.TestCase):
+# Unit Tests
+#
+# 2400 metrics -- observe, snapshot, render
+# Desired level of confidence: boundary value analysis
+# Analysis
+#    inputs:  op, status, seconds per dispatch
+#    outputs: Prometheus text with latency histograms and error counts
+#
+# Happy path
+#    each dispatch is counted once under its op and status word
+#    buckets are cumulative and end in +Inf equal to the count
+#    counts of threads that have ended are kept
+#    /metrics serves the text with the Prometheus content type
+#    observe costs about a microsecond
+#    answers from the response cache or the op=create fast path are
+#    counted as cached
+#
+# Sad path
+#    unknown and missing ops are counted as 'unknown' and 'none'
+#    error reasons beyond REASON_LIMIT per op count as 'other'
+
+    def setUp(self):
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.reset()
+
+    def test2400_010_ShouldCountDispatchByOpAndStatus(self):
+        RCube.dispatch({'op': 'create'})
+        RCube.dispatch({'op': 'create'})
+        RCube.dispatch({'op': 'create', 'f': ''})
+        latency, errors = metrics.snapshot()
+        self.assertEqual(2, latency[('create', 'created')][0])
+        self.assertEqual(1, latency[('create', 'error')][0])
+        self.assertEqual(1, sum(errors.values()))
+        self.assertEqual('create', list(errors)[0][0])
+
+    def test2400_020_ShouldRenderCumulativeBuckets(self):
+        metrics.observe('rotate', 'rotated', 0.0003)
+        metrics.observe('rotate', 'rotated', 0.002)
+        metrics.observe('rotate', 'rotated', 20.0)
+        text = metrics.render()
+        self.assertIn('# TYPE rcube_dispatch_seconds histogram', text)
+        self.assertIn('rcube_dispatch_seconds_bucket{le="0.0001",op="rotate",status="rotated"} 0', text)
+        self.assertIn('rcube_dispatch_seconds_bucket{le="0.0005",op="rotate",status="rotated"} 1', text)
+        self.assertIn('rcube_dispatch_seconds_bucket{le="0.0025",op="rotate",status="rotated"} 2', text)
+        self.assertIn('rcube_dispatch_seconds_bucket{le="10.0",op="rotate",status="rotated"} 2', text)
+        self.assertIn('rcube_dispatch_seconds_bucket{le="+Inf",op="rotate",status="rotated"} 3', text)
+        self.assertIn('rcube_dispatch_seconds_count{op="rotate",status="rotated"} 3', text)
+        self.assertIn('rcube_dispatch_seconds_sum{op="rotate",status="rotated"} 20.0023', text)
+
+    def test2400_030_ShouldKeepCountsOfEndedThreads(self):
+        def work():
+            for _ in range(5):
+                metrics.observe('check', 'full', 0.001)
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        metrics.observe('check', 'full', 0.001)
+        latency, _ = metrics.snapshot()
+        self.assertEqual(21, latency[('check', 'full')][0])
+
+    def test2400_040_ShouldRenderCacheCounters(self):
+        text = metrics.render({'hits': 3, 'misses': 4, 'evictions': 0, 'entries': 2,
+                               'bytes': 100, 'maxBytes': 1000})
+        self.assertIn('rcube_response_cache_hits_total 3', text)
+        self.assertIn('rcube_response_cache_bytes 100', text)
+
+    def test2400_050_ShouldServeMetrics(self):
+        RCube.dispatch({'op': 'create'})
+        response = microservice.app.test_client().get('/metrics')
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        self.assertIn('rcube_dispatch_seconds_count{op="create",status="created"}', response.get_data(True))
+        self.assertIn('rcube_response_cache_hits_total', response.get_data(True))
+
+    def test2400_060_ShouldObserveQuickly(self):
+        metrics.observe('create', 'created', 0.0001)
+        seconds = min(timeit.repeat(lambda: metrics.observe('create', 'created', 0.0001),
+                                    number=10000, repeat=3)) / 10000
+        #  far above the microsecond it usually takes, so a slow or busy
+        #  machine still passes
+        self.assertLess(seconds, 1e-4)
+
+    def test2400_070_ShouldCountAnswersWithoutDispatch(self):
+        responsecache.cache.clear()
+        query = 'op=check&cube=' + ','.join(color for color in DEFAULT_COLORS for _ in range(9))
+        for _ in range(3):
+            fastpath.respond(query)
+            fastpath.respond('op=create')
+        latency, _ = metrics.snapshot()
+        self.assertEqual(1, latency[('check', 'full')][0])
+        self.assertEqual(2, latency[('check', 'cached')][0])
+        #  the first op=create of the process is dispatched to build the
+        #  fast path's response
+        self.assertEqual(3, sum(latency.get(('create', status), [0])[0] for status in ('created', 'cached')))
+
+    def test2400_910_ShouldLabelUnknownOps(self):
+        metrics.observe('nonsense', 'error: op is unknown', 0.0)
+        metrics.observe(None, 'error: op is missing', 0.0)
+        _, errors = metrics.snapshot()
+        self.assertEqual({('unknown', 'op is unknown'): 1, ('none', 'op is missing'): 1}, errors)
+
+    def test2400_920_ShouldBoundErrorReasons(self):
+        for number in range(metrics.REASON_LIMIT + 5):
+            metrics.observe('check', 'error: bad %d' % number, 0.0)
+        _, errors = metrics.snapshot()
+        self.assertEqual(metrics.REASON_LIMIT + 1, len(errors))
+        self.assertEqual(5, errors[('check', 'other')])
+
+    def test2400_930_ShouldEscapeLabelValues(self):
+        metrics.observe('check', 'error: "quoted"\\ and\nsplit', 0.0)
+        self.assertIn('reason="\\"quoted\\"\\\\ and\\nsplit"', metrics.render())
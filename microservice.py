@@ -1,6 +1,15 @@
 import os
-from flask import Flask, request
-import RCube.dispatch as RCube
+import json
+from flask import Flask, request, Response, stream_with_context
+import RCube.bulk as bulk
+import RCube.encoder as encoder
+import RCube.fastpath as fastpath
+import RCube.metrics as metrics
+import RCube.profiling as profiling
+import RCube.responsecache as responsecache
+import RCube.solutioncache as solutioncache
+import RCube.solver as solver
+import RCube.scrambler as scrambler
 
 app = Flask(__name__)
 
@@ -11,20 +20,168 @@ app = Flask(__name__)
 #  Parameters are passed as a URL query:
 #        /rcube?parm1=value1&parm2=value2
 #
+#  The raw query string goes straight to fastpath, which parses it once
+#  instead of copying request.args.
+#
+#  op=scramble&n=N&method=M returns N rotations (N 0 .. 99; no n, or
+#  0, returns none).  method=transition, the default, builds them turn
+#  by turn, many thousands a second.  method=random ignores N and
+#  solves a uniformly drawn cube, about ten a second per core in pure
+#  Python.
+#
+#  A request carrying the admin X-RCube-Profile header, or sampled at
+#  RCUBE_PROFILE_RATE, is profiled; the response names the profile
+#  written in the same header.
+#
 @app.route('/rcube')
 def server():
-    try:
-        parm = {}
-        for key in request.args:
-            parm[key] = str(request.args[key])
-        result = RCube.dispatch(parm)
-        return str(result)
-    except Exception as e:
-        return e
+    header = request.headers.get(profiling.HEADER)
+    if (profiling.RATE or header is not None):
+        response, name = profiling.call('server', _respond, force=profiling.authorized(header))
+        if (name is not None):
+            response.headers[profiling.HEADER] = name
+        return response
+    return _respond()
+
+
+def _respond():
+    return Response(fastpath.respond(request.query_string), mimetype=encoder.CONTENT_TYPE)
+    
+    
+#-----------------------------------
+#  The following code is invoked when the path portion of the URL matches 
+#         /rcube/cache
+#
+#  Returns the response cache counters: hits, misses, evictions,
+#  entries and bytes in use against maxBytes.
+#
+@app.route('/rcube/cache')
+def cacheServer():
+    return Response(encoder.encode(responsecache.cache.stats()), mimetype=encoder.CONTENT_TYPE)
+    
+    
+#-----------------------------------
+#  The following code is invoked when the path portion of the URL matches 
+#         /rcube/cache/solutions
+#
+#  Returns the solution cache counters: hits, misses, evictions and
+#  entries against maxEntries, or {} when the cache is disabled.
+#
+@app.route('/rcube/cache/solutions')
+def solutionCacheServer():
+    cache = solutioncache.getCache()
+    stats = {} if cache is None else cache.stats()
+    return Response(encoder.encode(stats), mimetype=encoder.CONTENT_TYPE)
+    
+    
+#-----------------------------------
+#  The following code is invoked when the path portion of the URL matches 
+#         /metrics
+#
+#  Returns dispatch latency histograms and error counts by op, and the
+#  response cache counters, in Prometheus text format.
+#
+@app.route('/metrics')
+def metricsServer():
+    return Response(metrics.render(responsecache.cache.stats()), content_type=metrics.CONTENT_TYPE)
+    
+    
+#-----------------------------------
+#  The following code is invoked when the path portion of the URL matches 
+#         /rcube/scramble/stats
+#
+#  Parameters are passed as a URL query:
+#        /rcube/scramble/stats?n=25&count=10000&method=transition
+#
+#  Scores count scrambles of n turns (n 0 .. 99, count 1 .. STATS_LIMIT,
+#  default 1000; method transition, the default, or random) and returns
+#  the mean and variance of the randomness scores and their histogram,
+#  histogram[s] being the number of scrambles scoring s.  The scrambles
+#  are scored a chunk at a time, so memory stays flat; STATS_LIMIT keeps
+#  the time of the largest request near a second.  Needs numpy, which
+#  the service does not install: without it the answer is an error.
+#
+STATS_LIMIT = int(os.getenv('RCUBE_STATS_LIMIT', '10000'))
+
+@app.route('/rcube/scramble/stats')
+def scrambleStatsServer():
+    n = request.args.get('n', '25')
+    count = request.args.get('count', '1000')
+    method = request.args.get('method', 'transition')
+    if (not n.isdecimal() or int(n) > 99 or not count.isdecimal() or
+            not 0 < int(count) <= STATS_LIMIT or method not in scrambler.METHODS):
+        stats = {'status': 'error:'}
+    else:
+        try:
+            import RCube.cubearray as cubearray
+            stats = cubearray.scrambleStats(int(n), int(count), method)
+            stats['status'] = 'scored'
+        except ImportError:
+            stats = {'status': 'error: numpy is not installed'}
+    return Response(encoder.encode(stats), mimetype=encoder.CONTENT_TYPE)
+    
+    
+#-----------------------------------
+#  The following code is invoked when the path portion of the URL matches 
+#         /rcube/batch
+#
+#  Parameters are POSTed as either a JSON array of parameter dicts
+#        [{"op": "create"}, {"op": "check", "cube": "..."}]
+#  or as JSON Lines, one parameter dict per line.
+#
+#  Results come back in the same order and the same format, streamed
+#  one entry at a time.  At most BATCH_LIMIT entries are processed; a
+#  longer batch ends with an error entry.  Bodies larger than
+#  MAX_CONTENT_LENGTH are refused with 413.
+#
+BATCH_LIMIT = int(os.getenv('RCUBE_BATCH_LIMIT', '1000'))
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('RCUBE_BATCH_BYTES', str(4 * 1024 * 1024)))
+
+@app.route('/rcube/batch', methods=['POST'])
+def batchServer():
+    stream = request.stream
+    first = stream.read(1)
+    while first.isspace():
+        first = stream.read(1)
+    if (first == b'['):
+        try:
+            parms = json.loads(first + stream.read())
+        except ValueError:
+            parms = [None]
+        lines = batchResults(parms)
+        body = jsonArray(lines)
+        mimetype = encoder.CONTENT_TYPE
+    else:
+        parms = bulk.parseLines(_prepend(first, stream))
+        lines = batchResults(parms)
+        body = (line + '\n' for line in lines)
+        mimetype = 'application/x-ndjson'
+    return Response(stream_with_context(body), mimetype=mimetype)
+
+def batchResults(parms):
+    '''Run dispatch over parameter dicts, yielding one JSON string per result'''
+    for result in bulk.dispatchAll(parms, BATCH_LIMIT):
+        yield encoder.encode(result)
+
+def jsonArray(lines):
+    '''Stream JSON strings as the elements of one JSON array'''
+    separator = '['
+    for line in lines:
+        yield separator + line
+        separator = ',\n'
+    yield '[]' if separator == '[' else ']'
+
+def _prepend(first, stream):
+    line = first + stream.readline()
+    while line:
+        yield line
+        line = stream.readline()
     
     
 #-----------------------------------
 port = os.getenv('PORT', '5000')
 if __name__ == "__main__":
+    #  map the solver tables before serving, building them if missing;
+    #  the optimal solver's are mapped on the first mode=optimal solve
+    solver.getTables()
     app.run(host='0.0.0.0', port=int(port))
-
@@ -0,0 +1,103 @@
+import json
+import sys
+import unittest
+import RCube.microservice as microservice
+
+
+class MicroserviceTest(unittest.TestCase):
+# Acceptance Tests
+#
+# 1000 microservice -- GET /rcube, POST /rcube/batch, GET /rcube/scramble/stats
+# Desired level of confidence: boundary value analysis
+# Analysis
+#    inputs:  body  JSON array of parameter dicts, or JSON Lines with one
+#                   parameter dict per line
+#    outputs: dispatch result for every entry, in order, in the same format
+#
+# Happy path
+#    GET returns a JSON object with content type application/json
+#    JSON array in, JSON array out
+#    JSON Lines in, JSON Lines out
+#    empty array gives empty array
+#    scramble stats count every scramble in the histogram
+#
+# Sad path
+#    entry that is not a dict, or a line that is not JSON, gives an error entry
+#    batch longer than BATCH_LIMIT ends with an error entry
+#    scramble stats reject n over 99 and an unknown method
+#    scramble stats without numpy answer an error, not HTTP 500
+#
+# Note:  These tests run the Flask application in-process
+
+    def setUp(self):
+        self.client = microservice.app.test_client()
+        self.batchLimit = microservice.BATCH_LIMIT
+
+    def tearDown(self):
+        microservice.BATCH_LIMIT = self.batchLimit
+
+    def post(self, body):
+        return self.client.post('/rcube/batch', data=body)
+
+    def test1000_005_ShouldReturnJson(self):
+        response = self.client.get('/rcube?op=create&f=it\'s')
+        self.assertEqual('application/json', response.mimetype)
+        result = json.loads(response.data)
+        self.assertEqual('created', result['status'])
+        self.assertEqual("it's", result['cube'][0])
+        self.assertEqual('orange', result['cube'][53])
+
+    def test1000_010_ShouldReturnArrayForArray(self):
+        response = self.post('[{"op": "create"}, {"op": "create", "f": "f"}]')
+        self.assertEqual('application/json', response.mimetype)
+        results = json.loads(response.data)
+        self.assertEqual(2, len(results))
+        self.assertEqual('created', results[0]['status'])
+        self.assertEqual('f', results[1]['cube'][0])
+
+    def test1000_020_ShouldReturnLinesForLines(self):
+        response = self.post('{"op": "create"}\n{"op": "check", "cube": "x"}\n')
+        self.assertEqual('application/x-ndjson', response.mimetype)
+        results = [json.loads(line) for line in response.data.splitlines()]
+        self.assertEqual(['created', 'error:'], [result['status'] for result in results])
+
+    def test1000_030_ShouldReturnEmptyArrayForEmptyArray(self):
+        self.assertEqual([], json.loads(self.post('[]').data))
+
+    def test1000_040_ShouldReturnScrambleStats(self):
+        result = json.loads(self.client.get('/rcube/scramble/stats?n=20&count=300').data)
+        self.assertEqual('scored', result['status'])
+        self.assertEqual(300, sum(result['histogram']))
+        self.assertTrue(0 < result['mean'] < 100)
+
+    def test1000_900_ShouldReturnErrorEntryForBadEntries(self):
+        results = json.loads(self.post('[{"op": "create"}, 5]').data)
+        self.assertEqual('error:', results[1]['status'][0:6])
+        response = self.post('not json\n{"op": "create"}\n')
+        results = [json.loads(line) for line in response.data.splitlines()]
+        self.assertEqual('error:', results[0]['status'][0:6])
+        self.assertEqual('created', results[1]['status'])
+
+    def test1000_910_ShouldStopAtBatchLimit(self):
+        microservice.BATCH_LIMIT = 2
+        results = json.loads(self.post('[{"op": "create"}, {"op": "create"}, {"op": "create"}]').data)
+        self.assertEqual(3, len(results))
+        self.assertEqual('error: batch limit exceeded', results[2]['status'])
+
+    def test1000_920_ShouldRejectBadScrambleStats(self):
+        for query in ('n=100', 'n=x', 'count=0', 'method=init', 'n=%C2%B2', 'count=%C2%B2'):
+            result = json.loads(self.client.get('/rcube/scramble/stats?' + query).data)
+            self.assertEqual('error:', result['status'])
+
+    def test1000_930_ShouldReportMissingNumpy(self):
+        saved = dict((name, sys.modules.pop(name, None)) for name in ('numpy', 'RCube.cubearray'))
+        sys.modules['numpy'] = None
+        try:
+            result = json.loads(self.client.get('/rcube/scramble/stats?n=5&count=10').data)
+        finally:
+            for name, module in saved.items():
+                if (module is None):
+                    sys.modules.pop(name, None)
+                else:
+                    sys.modules[name] = module
+        self.assertEqual('error: numpy is not installed', result['status'])
@@ -0,0 +1,341 @@
+'''
+    Optimal solver: IDA* over pattern databases
+
+    Each pattern database holds, for one group of four corners or four
+    edges, the exact number of moves needed to bring those pieces home
+    from every placement and orientation, whatever the other pieces do.
+    The largest of the group distances, and of the two-phase solver's
+    phase 1 distances, never overestimates the length of a solution, so
+    an iterative-deepening search that prunes with it finds a shortest
+    solution (counting a half turn as one move).
+
+    Databases are packed two 4-bit distances to a byte.  Together with
+    their move tables they are kept in their own table file
+    (RCUBE_OPTIMAL_TABLES, by default rcube-optimal.tables next to this
+    module), mapped on the first optimal solve and built then if it is
+    missing; "python -m RCube.optimal --if-missing" builds it ahead of
+    time, as the Procfile does, so no request waits for the build.
+
+    Searches are bounded by a time and a node budget
+    (RCUBE_OPTIMAL_SECONDS, RCUBE_OPTIMAL_NODES).  The two-phase solver's answer bounds the
+    search from above; if the budget runs out first, that answer is
+    returned and labelled as not known to be optimal.
+'''
+
+import argparse
+import os
+import sys
+import threading
+import time
+from array import array
+from itertools import permutations
+
+import RCube.solver as solver
+import RCube.tablefile as tablefile
+from RCube.cubies import toCubies
+
+
+#  groups of four pieces: name -> (corner or edge, cubie numbers)
+GROUPS = {
+    'topCorners': ('corner', (0, 1, 2, 3)),
+    'underCorners': ('corner', (4, 5, 6, 7)),
+    'topEdges': ('edge', (0, 1, 2, 3)),
+    'sliceEdges': ('edge', (4, 5, 6, 7)),
+    'underEdges': ('edge', (8, 9, 10, 11)),
+}
+
+#  bump whenever GROUPS or the table layout changes meaning
+TABLE_VERSION = 1
+
+TABLE_FILE = os.environ.get('RCUBE_OPTIMAL_TABLES',
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                         'rcube-optimal.tables'))
+
+TIME_BUDGET = float(os.environ.get('RCUBE_OPTIMAL_SECONDS', '2'))
+NODE_BUDGET = int(os.environ.get('RCUBE_OPTIMAL_NODES', '500000'))
+
+#  the search looks at the clock once per this many nodes
+_CLOCK_INTERVAL = 1024
+
+
+def _moveForms():
+    #  cubie form (cornerPerm, cornerTwist, edgePerm, edgeFlip) of each
+    #  of the 18 moves
+    forms = []
+    for face in range(6):
+        cornerPerm, cornerTwist = list(range(8)), [0] * 8
+        edgePerm, edgeFlip = list(range(12)), [0] * 12
+        turnCorners, turnTwist, turnEdges, turnFlip = solver.BASE_MOVES[face]
+        for _ in range(3):
+            cornerTwist = [(cornerTwist[turnCorners[i]] + turnTwist[i]) % 3 for i in range(8)]
+            cornerPerm = [cornerPerm[turnCorners[i]] for i in range(8)]
+            edgeFlip = [(edgeFlip[turnEdges[i]] + turnFlip[i]) % 2 for i in range(12)]
+            edgePerm = [edgePerm[turnEdges[i]] for i in range(12)]
+            forms.append((cornerPerm, cornerTwist, edgePerm, edgeFlip))
+    return forms
+
+
+_FORMS = _moveForms()
+
+
+def _layout(kind):
+    #  (orientations per piece, for each move the position a piece moves
+    #  to and the orientation it gains there)
+    if (kind == 'corner'):
+        count, turns, permIndex = 8, 3, 0
+    else:
+        count, turns, permIndex = 12, 2, 2
+    moves = []
+    for form in _FORMS:
+        perm, gain = form[permIndex], form[permIndex + 1]
+        destination = [0] * count
+        for position in range(count):
+            destination[perm[position]] = position
+        moves.append((destination, gain))
+    return turns, moves
+
+
+#  ----------------------------------------------------------------------
+#  group coordinate: the positions of the four pieces, in order, times
+#  their four orientations
+
+def _places(kind):
+    return list(permutations(range(8 if kind == 'corner' else 12), 4))
+
+
+def groupCoord(name, cubies):
+    '''Coordinate of one group in a cube given in cubie form.'''
+    kind, pieces = GROUPS[name]
+    perm, orientation = (cubies[0], cubies[1]) if kind == 'corner' else (cubies[2], cubies[3])
+    turns = 3 if kind == 'corner' else 2
+    where = dict((piece, position) for position, piece in enumerate(perm))
+    positions = tuple(where[piece] for piece in pieces)
+    spin = 0
+    for position in positions:
+        spin = spin * turns + orientation[position]
+    return _PLACE_INDEX[kind][positions] * turns ** 4 + spin
+
+
+_PLACE_INDEX = dict((kind, dict((places, index) for index, places in enumerate(_places(kind))))
+                    for kind in ('corner', 'edge'))
+
+
+def _buildMoveTable(name):
+    #  table[coord * 18 + move] is the coordinate after move
+    kind = GROUPS[name][0]
+    turns, moves = _layout(kind)
+    places = _places(kind)
+    placeIndex = _PLACE_INDEX[kind]
+    spins = turns ** 4
+    table = array('I', bytes(4 * len(places) * spins * 18))
+    for place, positions in enumerate(places):
+        for spin in range(spins):
+            digits = []
+            rest = spin
+            for _ in range(4):
+                rest, digit = divmod(rest, turns)
+                digits.append(digit)
+            digits.reverse()
+            base = (place * spins + spin) * 18
+            for move, (destination, gain) in enumerate(moves):
+                newSpin = 0
+                newPositions = []
+                for position, digit in zip(positions, digits):
+                    position = destination[position]
+                    newPositions.append(position)
+                    newSpin = newSpin * turns + (digit + gain[position]) % turns
+                table[base + move] = placeIndex[tuple(newPositions)] * spins + newSpin
+    return table
+
+
+def _buildDatabase(name, moveTable):
+    #  breadth-first distances from the solved coordinate, packed two to
+    #  a byte (low nibble first)
+    size = len(moveTable) // 18
+    solved = groupCoord(name, (list(range(8)), [0] * 8, list(range(12)), [0] * 12))
+    distance = bytearray(b'\xff') * size
+    distance[solved] = 0
+    frontier = [solved]
+    depth = 0
+    while frontier:
+        depth += 1
+        reached = []
+        for coord in frontier:
+            for other in moveTable[coord * 18:coord * 18 + 18]:
+                if (distance[other] == 255):
+                    distance[other] = depth
+                    reached.append(other)
+        frontier = reached
+    packed = bytearray((size + 1) // 2)
+    for index in range(0, size - 1, 2):
+        packed[index >> 1] = distance[index] | distance[index + 1] << 4
+    if (size % 2):
+        packed[-1] = distance[-1]
+    return packed
+
+
+def buildTables(processes=None):
+    '''Compute every move table and pattern database across a process
+    pool.  Returns a dict of name -> array.'''
+    moveTables = tablefile.buildAll([(name, _buildMoveTable, (name,)) for name in GROUPS],
+                                    processes)
+    databases = tablefile.buildAll([(name + 'Distance', _buildDatabase, (name, moveTables[name]))
+                                    for name in GROUPS], processes)
+    tables = dict((name + 'Move', table) for name, table in moveTables.items())
+    tables.update(databases)
+    return tables
+
+
+def loadTables(path=TABLE_FILE, processes=None):
+    '''Map the table file at path, first building and writing it if it
+    is missing or was written by another TABLE_VERSION.'''
+    return tablefile.loadOrBuild(path, TABLE_VERSION, lambda: buildTables(processes))
+
+
+_tables = None
+_tablesLock = threading.Lock()
+
+
+def getTables():
+    '''The optimal solver tables, loaded (or built) on first use.'''
+    global _tables
+    if (_tables is None):
+        with _tablesLock:
+            if (_tables is None):
+                _tables = loadTables()
+    return _tables
+
+
+#  ----------------------------------------------------------------------
+#  search
+
+class _OutOfBudget(Exception):
+    pass
+
+
+def distance(database, coord):
+    '''Distance stored for coord in a packed pattern database.'''
+    return (database[coord >> 1] >> ((coord & 1) << 2)) & 15
+
+
+def _search(tables, cubies, bound, seconds, nodes):
+    #  a shortest solution as move numbers if there is one shorter than
+    #  bound moves, otherwise None; raises _OutOfBudget when the budget
+    #  runs out.  The two-phase solver's phase 1 tables are distances to
+    #  a goal every solved cube meets, so they prune here as well.
+    phase1 = solver.getTables()
+    twistMove, flipMove, sliceMove = phase1.twist, phase1.flip, phase1.slice
+    twistSlice, flipSlice = phase1.twistSlice, phase1.flipSlice
+    names = list(GROUPS)
+    (moveA, moveB, moveC, moveD, moveE) = [tables[name + 'Move'] for name in names]
+    databases = [tables[name + 'Distance'] for name in names]
+    (distA, distB, distC, distD, distE) = databases
+    nSlice = solver.N_SLICE
+    deadline = time.time() + seconds
+    budget = [nodes]
+    path = []
+
+    def search(twist, flip, slice_, a, b, c, d, e, depth, last):
+        budget[0] -= 1
+        if (budget[0] < 0):
+            raise _OutOfBudget()
+        if (not budget[0] % _CLOCK_INTERVAL and time.time() > deadline):
+            raise _OutOfBudget()
+        depth -= 1
+        twist *= 18
+        flip *= 18
+        slice_ *= 18
+        a *= 18
+        b *= 18
+        c *= 18
+        d *= 18
+        e *= 18
+        for move, face in solver.NEXT_MOVES[last]:
+            newSlice = sliceMove[slice_ + move]
+            newTwist = twistMove[twist + move]
+            if (twistSlice[newTwist * nSlice + newSlice] > depth):
+                continue
+            newFlip = flipMove[flip + move]
+            if (flipSlice[newFlip * nSlice + newSlice] > depth):
+                continue
+            newA = moveA[a + move]
+            if ((distA[newA >> 1] >> ((newA & 1) << 2)) & 15 > depth):
+                continue
+            newB = moveB[b + move]
+            if ((distB[newB >> 1] >> ((newB & 1) << 2)) & 15 > depth):
+                continue
+            newC = moveC[c + move]
+            if ((distC[newC >> 1] >> ((newC & 1) << 2)) & 15 > depth):
+                continue
+            newD = moveD[d + move]
+            if ((distD[newD >> 1] >> ((newD & 1) << 2)) & 15 > depth):
+                continue
+            newE = moveE[e + move]
+            if ((distE[newE >> 1] >> ((newE & 1) << 2)) & 15 > depth):
+                continue
+            if (depth == 0 or search(newTwist, newFlip, newSlice, newA, newB, newC, newD, newE,
+                                     depth, face)):
+                path.append(move)
+                return True
+        return False
+
+    twist = solver.twistCoord(cubies[1])
+    flip = solver.flipCoord(cubies[3])
+    slice_ = solver.sliceCoord(cubies[2])
+    coords = [groupCoord(name, cubies) for name in names]
+    start = max([twistSlice[twist * nSlice + slice_], flipSlice[flip * nSlice + slice_]] +
+                [distance(database, coord) for database, coord in zip(databases, coords)])
+    if (start == 0):
+        return []
+    for depth in range(start, bound):
+        if (search(twist, flip, slice_, *coords, depth=depth, last=solver.NO_FACE)):
+            path.reverse()
+            return path
+    return None
+
+
+def solve(state, seconds=None, nodes=None):
+    '''Shortest solution of a reachable face-index state.
+
+    Returns (moves, optimal): moves in quarter-turn notation as a list,
+    and whether they are known to be a shortest solution.  When the
+    time or node budget runs out the two-phase solver's moves are
+    returned with optimal False.  Returns (None, False) for a state
+    that cannot be read as cubies.
+    '''
+    cubies = toCubies(state)
+    if (cubies is None):
+        return None, False
+    fallback = solver.solveMoves(cubies)
+    try:
+        moves = _search(getTables(), cubies, len(fallback),
+                        TIME_BUDGET if seconds is None else seconds,
+                        NODE_BUDGET if nodes is None else nodes)
+    except _OutOfBudget:
+        return solver.notation(fallback), False
+    if (moves is None):
+        #  nothing shorter than the two-phase answer exists
+        moves = fallback
+    return solver.notation(moves), True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m RCube.optimal',
+                                     description='Build the rcube optimal solver table file.')
+    parser.add_argument('path', nargs='?', default=TABLE_FILE,
+                        help='table file to write (default: %(default)s)')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--if-missing', action='store_true',
+                        help='keep the file if it is already there and up to date')
+    args = parser.parse_args(argv)
+
+    if (args.if_missing):
+        loadTables(args.path, args.processes)
+    else:
+        tablefile.write(args.path, TABLE_VERSION, buildTables(args.processes))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
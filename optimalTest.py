@@ -0,0 +1,76 @@
+import unittest
+import RCube.dispatch as RCube
+import RCube.optimal as optimal
+from RCube.cubestate import SOLVED_FACES, getPalette, rotateState
+from RCube.cubies import toCubies
+
+
+class OptimalTest(unittest.TestCase):
+# Unit Tests
+#
+# 1700 optimal -- pattern databases, solve, op=solve&mode=optimal
+# Desired level of confidence: boundary value analysis
+# Analysis
+#    inputs:  state    54-byte face-index state of a reachable cube
+#             seconds  time budget
+#             nodes    node budget
+#    outputs: (moves, optimal)
+#
+# Happy path
+#    the solved cube is at distance 0 in every pattern database
+#    a single move is at distance 1 in some database and at most 1 in all
+#    a short scramble is solved in the fewest moves (half turn = 1 move)
+#    a solved cube needs no moves
+#    op=solve&mode=optimal answers the moves and optimal true
+#
+# Sad path
+#    an exhausted node budget falls back to the two-phase answer, with
+#    optimal false
+#    an unknown mode is an error
+
+    def setUp(self):
+        self.tables = optimal.getTables()
+
+    def distances(self, state):
+        cubies = toCubies(state)
+        return [optimal.distance(self.tables[name + 'Distance'], optimal.groupCoord(name, cubies))
+                for name in optimal.GROUPS]
+
+    def test1700_010_ShouldPlaceSolvedCubeAtZero(self):
+        self.assertEqual([0] * len(optimal.GROUPS), self.distances(SOLVED_FACES))
+
+    def test1700_020_ShouldPlaceOneMoveAtOne(self):
+        for move in 'fRbbLtU':
+            distances = self.distances(rotateState(SOLVED_FACES, move))
+            self.assertEqual(1, max(distances))
+
+    def test1700_100_ShouldFindShortestSolution(self):
+        #  f rr T l: four moves in half-turn metric, five quarter turns
+        state = rotateState(SOLVED_FACES, 'frrTl')
+        moves, isOptimal = optimal.solve(state)
+        self.assertTrue(isOptimal)
+        self.assertEqual(SOLVED_FACES, rotateState(state, ''.join(moves)))
+        self.assertEqual(5, len(moves))
+
+    def test1700_110_ShouldNeedNoMovesWhenSolved(self):
+        self.assertEqual(([], True), optimal.solve(SOLVED_FACES))
+
+    def test1700_120_ShouldSolveThroughDispatch(self):
+        state = rotateState(SOLVED_FACES, 'tRbF')
+        cube = ','.join(getPalette().decode(state))
+        result = RCube.dispatch({'op': 'solve', 'mode': 'optimal', 'cube': cube})
+        self.assertEqual('solved', result['status'])
+        self.assertTrue(result['optimal'])
+        self.assertEqual(4, len(result['rotations']))
+        self.assertEqual(SOLVED_FACES, rotateState(state, ''.join(result['rotations'])))
+
+    def test1700_900_ShouldFallBackWhenOutOfBudget(self):
+        state = rotateState(SOLVED_FACES, 'fRbUltFrrBuL')
+        moves, isOptimal = optimal.solve(state, nodes=10)
+        self.assertFalse(isOptimal)
+        self.assertEqual(SOLVED_FACES, rotateState(state, ''.join(moves)))
+
+    def test1700_910_ShouldRejectUnknownMode(self):
+        cube = ','.join(getPalette().decode(SOLVED_FACES))
+        result = RCube.dispatch({'op': 'solve', 'mode': 'fastest', 'cube': cube})
+        self.assertEqual('error:', result['status'])
@@ -0,0 +1,108 @@
+'''
+    Pattern registry for op=check
+
+    Every named pattern is stored as one or more facelet signatures:
+    54 bytes giving, for each facelet, the index of the face whose
+    color it shows, reduced to canonical form over the 24 whole-cube
+    orientations and color relabelings.  For each palette the
+    signatures are expanded once into every orientation and relabeled
+    into its color codes, after which classifying a cube is a single
+    dictionary lookup on its byte state, however many patterns exist.
+
+    New patterns are added as data with register(), usually from the
+    move sequence that produces them on a solved cube; register before
+    the first classify() call, as lookup tables are built once.
+'''
+
+from collections import OrderedDict
+
+from RCube.cubestate import SOLVED_FACES, CROSSES_FACES, rotateState
+from RCube.symmetry import canonical, faceMap, variants
+
+
+#  pattern name -> list of face-index signatures, in registration order;
+#  when two signatures coincide the earlier pattern wins
+PATTERNS = OrderedDict()
+
+_STANDARD_NOTATION = {'F': 'f', 'R': 'r', 'B': 'b', 'L': 'l', 'U': 't', 'D': 'u'}
+
+
+def fromStandard(sequence):
+    '''Translate standard notation such as "R2 U' F" into fRbUUl moves.'''
+    moves = ''
+    for token in sequence.split():
+        move = _STANDARD_NOTATION[token[0]]
+        if (token[1:] == "'"):
+            moves += move.upper()
+        elif (token[1:] == '2'):
+            moves += move * 2
+        elif (token[1:] == ''):
+            moves += move
+        else:
+            raise ValueError('bad move ' + token)
+    return moves
+
+
+def register(name, *signatures):
+    '''Add face-index signatures under a pattern name.
+
+    Signatures are kept in canonical form, so registering a pattern in
+    one orientation and coloring covers all of them.
+    '''
+    known = PATTERNS.setdefault(name, [])
+    for signature in signatures:
+        signature = canonical(bytes(signature))
+        if (signature not in known):
+            known.append(signature)
+
+
+def registerMoves(name, moves):
+    '''Add the pattern a move sequence produces on a solved cube.'''
+    register(name, rotateState(SOLVED_FACES, moves))
+
+
+def lookupTable(palette):
+    '''Map of palette-coded signature -> pattern name for one palette.
+
+    Every signature is entered in all 24 whole-cube orientations,
+    recolored so the centers stay where the palette puts them, so a
+    pattern is found however the cube was held when it was made.
+    '''
+    table = {}
+    for name in PATTERNS:
+        for signature in PATTERNS[name]:
+            for variant in sorted(variants(signature)):
+                table.setdefault(palette.relabel(variant), name)
+    return table
+
+
+#  palette codes -> lookup table; codes are first-face indices, so there
+#  are at most 203 distinct keys however many palettes are seen
+_tables = {}
+
+
+def classify(palette, state):
+    '''Name of the registered pattern state shows, or 'unknown'.'''
+    table = _tables.get(palette.codes)
+    if (table is None):
+        table = _tables[palette.codes] = lookupTable(palette)
+    return table.get(state, 'unknown')
+
+
+def _spots():
+    #  every face keeps its center and shows the color of the face a
+    #  whole-cube rotation brings to it on the other eight facelets
+    signatures = []
+    for orientation in range(1, 24):
+        perm = faceMap(orientation)
+        signatures.append(bytes(face if i % 9 == 4 else perm[face]
+                                for i, face in enumerate(SOLVED_FACES)))
+    return signatures
+
+
+register('full', SOLVED_FACES)
+register('crosses', CROSSES_FACES)
+register('spots', *_spots())
+registerMoves('checkerboard', fromStandard('R2 L2 U2 D2 F2 B2'))
+registerMoves('cubeincube', fromStandard("F L F U' R U F2 L2 U' L' B D' B' L2 U"))
+registerMoves('superflip', fromStandard("U R2 F B R B2 R U2 L B2 R U' D' R2 F R' L B2 U2 F2"))
@@ -0,0 +1,72 @@
+import unittest
+import RCube.patterns as patterns
+import RCube.symmetry as symmetry
+from RCube.cubestate import Palette, getPalette, rotateState
+
+
+class PatternsTest(unittest.TestCase):
+# Unit Tests
+#
+# 500 patterns -- register, classify
+# Desired level of confidence: boundary value analysis
+# Analysis
+#    inputs:  palette  Palette of the request
+#             state    54-byte cube state with correct centers
+#    outputs: registered pattern name, or 'unknown'
+#
+# Happy path
+#    each registered pattern is recognized in any palette
+#    spots is recognized for every whole-cube rotation of the outer facelets
+#    a pattern is recognized in each of the 24 whole-cube orientations,
+#    recolored to the palette's centers
+#    patterns given as move sequences are produced from a solved cube
+#    standard notation translates to fFrRbBlLtTuU moves
+#
+# Sad path
+#    scrambled cube is unknown
+#    bad standard notation raises ValueError
+
+    def setUp(self):
+        self.palette = getPalette()
+
+    def test500_200_ShouldClassifyRegisteredPatterns(self):
+        for name in patterns.PATTERNS:
+            for signature in patterns.PATTERNS[name]:
+                self.assertEqual(name, patterns.classify(self.palette, self.palette.relabel(signature)))
+
+    def test500_210_ShouldClassifyInCustomPalette(self):
+        palette = Palette(('1', '2', '3', '4', '5', '6'))
+        crosses = palette.relabel(patterns.PATTERNS['crosses'][0])
+        self.assertEqual('crosses', patterns.classify(palette, crosses))
+
+    def test500_220_ShouldHaveSpotsForEveryRotation(self):
+        spots = patterns._spots()
+        self.assertEqual(23, len(set(spots)))
+        for signature in spots:
+            self.assertEqual('spots', patterns.classify(self.palette, self.palette.relabel(signature)))
+
+    def test500_225_ShouldRecognizeEveryOrientation(self):
+        crosses = patterns.PATTERNS['crosses'][0]
+        for orientation in range(24):
+            state = symmetry.alignCenters(symmetry.orient(crosses, orientation))
+            self.assertEqual('crosses', patterns.classify(self.palette, self.palette.relabel(state)))
+
+    def test500_226_ShouldStoreOneCanonicalSignaturePerOrientation(self):
+        before = len(patterns.PATTERNS['superflip'])
+        superflip = patterns.PATTERNS['superflip'][0]
+        patterns.register('superflip', symmetry.alignCenters(symmetry.orient(superflip, 5)))
+        self.assertEqual(before, len(patterns.PATTERNS['superflip']))
+
+    def test500_230_ShouldBuildCheckerboardFromMoves(self):
+        state = rotateState(self.palette.solved, 'rrllttuuffbb')
+        self.assertEqual('checkerboard', patterns.classify(self.palette, state))
+
+    def test500_240_ShouldTranslateStandardNotation(self):
+        self.assertEqual('rTuuF', patterns.fromStandard("R U' D2 F'"))
+
+    def test500_900_ShouldReturnUnknownForScrambledCube(self):
+        state = rotateState(self.palette.solved, 'fRbUl')
+        self.assertEqual('unknown', patterns.classify(self.palette, state))
+
+    def test500_910_ShouldRejectBadNotation(self):
+        self.assertRaises(ValueError, patterns.fromStandard, 'R3')
@@ -0,0 +1,194 @@
+'''
+    Pre-fork launcher: several server processes on one port
+
+    Usage:
+        python -m RCube.prefork [--host HOST] [--port PORT] [--workers N]
+
+    The master maps the solver tables and imports the service, then
+    forks N workers (by default one per CPU), so every worker shares
+    the tables and the loaded code with the master instead of holding
+    its own copy.  Each worker runs the asyncio server (aioserver) on
+    its own listening socket bound with SO_REUSEPORT, and the kernel
+    spreads incoming connections across them; where SO_REUSEPORT is
+    missing the workers share one socket opened by the master.  The
+    solution cache is not opened before the fork: every worker opens
+    its own connection to the file on first use.
+
+    A worker that dies is replaced, and a worker whose master dies
+    drains and exits.  On SIGTERM (or SIGINT) the master passes SIGTERM
+    on; each worker stops accepting, closes its idle connections and
+    finishes the requests in flight, for at most RCUBE_DRAIN_SECONDS
+    (default 10), after which the master kills whatever is left.
+'''
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import RCube.aioserver as aioserver
+import RCube.solver as solver
+
+
+DRAIN_SECONDS = float(os.getenv('RCUBE_DRAIN_SECONDS', '10'))
+
+#  a worker that dies sooner than this after starting is restarted only
+#  after the same delay, so a worker that cannot start does not spin
+RESTART_DELAY = 1.0
+
+#  how often a worker checks that its master is still alive
+ORPHAN_CHECK_SECONDS = 1.0
+
+#  threads per worker for ops aioserver hands to its executor
+WORKER_THREADS = 4
+
+REUSE_PORT = hasattr(socket, 'SO_REUSEPORT')
+
+
+def bindSocket(host, port, listen):
+    '''A TCP socket bound to host:port with SO_REUSEPORT where available.'''
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if (REUSE_PORT):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    if (listen):
+        sock.listen(1024)
+    sock.setblocking(False)
+    return sock
+
+
+async def _watchMaster(master, stop):
+    #  a worker whose master has died drains as if terminated
+    while (os.getppid() == master):
+        await asyncio.sleep(ORPHAN_CHECK_SECONDS)
+    stop.set()
+
+
+async def _serveUntilTerminated(sock, master):
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+    watch = loop.create_task(_watchMaster(master, stop))
+    with ThreadPoolExecutor(WORKER_THREADS) as executor:
+        server = await aioserver.startServer(executor=executor, sock=sock)
+        await stop.wait()
+        watch.cancel()
+        await aioserver.drain(server, DRAIN_SECONDS)
+
+
+def _work(host, port, shared, master):
+    #  body of a worker process; never returns
+    status = 0
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        sock = shared if shared is not None else bindSocket(host, port, True)
+        asyncio.run(_serveUntilTerminated(sock, master))
+    except BaseException as e:
+        sys.stderr.write('rcube worker %d failed: %r\n' % (os.getpid(), e))
+        status = 1
+    finally:
+        sys.stderr.flush()
+        os._exit(status)
+
+
+class Master(object):
+    '''Forks and supervises the workers.'''
+
+    def __init__(self, host, port, workers):
+        self.host = host
+        self.workers = workers
+        #  holds the port (resolving port 0) for the workers to bind
+        #  next to, or is the shared socket when SO_REUSEPORT is missing
+        self.socket = bindSocket(host, port, not REUSE_PORT)
+        self.port = self.socket.getsockname()[1]
+        self.children = {}                 # pid -> start time
+        self.stopping = False
+        self.restarts = 0
+
+    def spawn(self):
+        master = os.getpid()
+        pid = os.fork()
+        if (pid == 0):
+            _work(self.host, self.port, None if REUSE_PORT else self.socket, master)
+        self.children[pid] = time.time()
+
+    def terminate(self, signum=None, frame=None):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def reap(self):
+        #  collect exited workers; returns [(pid, start time)]
+        exited = []
+        while self.children:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if (pid == 0):
+                break
+            exited.append((pid, self.children.pop(pid, None)))
+        return exited
+
+    def run(self, poll=0.1):
+        '''Supervise until terminated and every worker has exited.'''
+        signal.signal(signal.SIGTERM, self.terminate)
+        signal.signal(signal.SIGINT, self.terminate)
+        for _ in range(self.workers):
+            self.spawn()
+        pending = []                       # times at which to restart a worker
+        deadline = None
+        while self.children or (pending and not self.stopping):
+            for pid, started in self.reap():
+                if (not self.stopping):
+                    sys.stderr.write('rcube worker %d exited; restarting\n' % pid)
+                    quick = started is not None and time.time() - started < RESTART_DELAY
+                    pending.append(time.time() + (RESTART_DELAY if quick else 0))
+            if (not self.stopping):
+                now = time.time()
+                for due in [due for due in pending if due <= now]:
+                    pending.remove(due)
+                    self.restarts += 1
+                    self.spawn()
+            elif (deadline is None):
+                deadline = time.time() + DRAIN_SECONDS + 1
+            elif (time.time() > deadline):
+                for pid in list(self.children):
+                    try:
+                        os.kill(pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+            time.sleep(poll)
+        self.socket.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m RCube.prefork',
+                                     description='Serve the rcube API from pre-forked worker processes.')
+    parser.add_argument('--host', default='0.0.0.0', help='address to listen on (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', '5000')),
+                        help='port to listen on (default: $PORT or 5000)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='worker processes (default: one per CPU)')
+    args = parser.parse_args(argv)
+
+    #  map the solver tables before forking so every worker shares
+    #  them; the optimal solver's are mapped on first use
+    solver.getTables()
+    master = Master(args.host, args.port, args.workers)
+    sys.stderr.write('rcube serving on %s:%d with %d workers\n' % (args.host, master.port, args.workers))
+    master.run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
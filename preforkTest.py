@@ -0,0 +1,88 @@
+import http.client
+import json
+import os
+import signal
+import time
+import unittest
+import RCube.prefork as prefork
+
+
+def children(pid):
+    with open('/proc/%d/task/%d/children' % (pid, pid)) as stream:
+        return sorted(map(int, stream.read().split()))
+
+
+class PreforkTest(unittest.TestCase):
+# Acceptance Tests
+#
+# 2200 prefork -- Master
+# Desired level of confidence: boundary value analysis
+# Analysis
+#    inputs:  workers  number of worker processes
+#             signals  SIGKILL to a worker, SIGTERM to the master
+#    outputs: /rcube answered on one port by every worker
+#
+# Happy path
+#    the master runs the requested number of workers on one port
+#    a killed worker is replaced and the port keeps answering
+#    SIGTERM closes idle connections and stops master and workers
+#
+# Note:  These tests fork a master from the test process (Linux only)
+
+    def setUp(self):
+        self.master = prefork.Master('127.0.0.1', 0, 2)
+        self.pid = os.fork()
+        if (self.pid == 0):
+            try:
+                self.master.run(poll=0.02)
+            finally:
+                os._exit(0)
+        self.master.socket.close()
+        self.waitFor(lambda: len(children(self.pid)) == 2 and self.get()['status'] == 'created')
+
+    def tearDown(self):
+        try:
+            os.kill(self.pid, signal.SIGTERM)
+            os.waitpid(self.pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+
+    def get(self, query='op=create'):
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', self.master.port, timeout=5)
+            connection.request('GET', '/rcube?' + query)
+            result = json.loads(connection.getresponse().read())
+            connection.close()
+            return result
+        except OSError:
+            return {'status': None}
+
+    def waitFor(self, condition, seconds=10):
+        deadline = time.time() + seconds
+        while (not condition()):
+            self.assertTrue(time.time() < deadline, 'timed out')
+            time.sleep(0.05)
+
+    def test2200_010_ShouldServeFromWorkers(self):
+        self.assertEqual(2, len(children(self.pid)))
+        for _ in range(10):
+            self.assertEqual('created', self.get()['status'])
+
+    def test2200_020_ShouldRestartKilledWorker(self):
+        workers = children(self.pid)
+        os.kill(workers[0], signal.SIGKILL)
+        self.waitFor(lambda: len(children(self.pid)) == 2 and workers[0] not in children(self.pid))
+        self.waitFor(lambda: self.get()['status'] == 'created')
+
+    def test2200_030_ShouldDrainOnTerm(self):
+        idle = http.client.HTTPConnection('127.0.0.1', self.master.port, timeout=5)
+        idle.request('GET', '/rcube?op=create')
+        response = idle.getresponse()
+        response.read()
+        self.assertEqual('keep-alive', response.getheader('Connection'))
+        os.kill(self.pid, signal.SIGTERM)
+        _, status = os.waitpid(self.pid, 0)
+        self.assertEqual(0, status)
+        self.assertEqual(b'', idle.sock.recv(65536))
+        idle.close()
+        self.assertEqual(None, self.get()['status'])
@@ -0,0 +1,176 @@
+'''
+    On-demand cProfile capture of single requests
+
+    A request is profiled when it carries the admin header
+
+        X-RCube-Profile: <RCUBE_PROFILE_TOKEN>
+
+    (only when RCUBE_PROFILE_TOKEN is set), or when it is drawn at
+    RCUBE_PROFILE_RATE, the fraction of requests sampled (default 0).
+    microservice.server profiles the whole Flask handler; dispatch
+    samples the calls that reach it any other way (aioserver, bulk).  A
+    request is sampled once, at the outermost of the two.
+
+    Each profile is written to RCUBE_PROFILE_DIR (default
+    rcube-profiles in the temporary directory) twice: NAME.prof, the
+    pstats file that snakeviz, flameprof or pstats read, and
+    NAME.folded, collapsed stacks ("f;g;h microseconds") for
+    flamegraph.pl, speedscope or inferno.  NAME is the UTC time, the
+    process id and what was profiled; the server answers a profiled
+    request with NAME in its X-RCube-Profile header.  Only the newest
+    RCUBE_PROFILE_KEEP (default 50) profiles are kept.
+
+    "python -m RCube.profiling FILE.prof" prints the collapsed stacks of
+    a saved profile.
+'''
+
+import argparse
+import cProfile
+import hmac
+import os
+import pstats
+import random
+import re
+import sys
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+
+HEADER = 'X-RCube-Profile'
+
+TOKEN = os.getenv('RCUBE_PROFILE_TOKEN', '')
+RATE = float(os.getenv('RCUBE_PROFILE_RATE', '0'))
+DIRECTORY = os.getenv('RCUBE_PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'rcube-profiles'))
+KEEP = int(os.getenv('RCUBE_PROFILE_KEEP', '50'))
+
+#  stacks deeper than this are cut off, and paths shorter than a
+#  microsecond left out, so the folded file stays small
+MAX_DEPTH = 64
+
+#  the profiler's own disable call, left out of the folded stacks
+_DISABLE = ('~', 0, "<method 'disable' of '_lsprof.Profiler' objects>")
+
+_local = threading.local()
+_rotating = threading.Lock()
+
+
+def authorized(header):
+    '''True if header is the admin profiling token.'''
+    if (not TOKEN or header is None):
+        return False
+    return hmac.compare_digest(header.encode('utf-8'), TOKEN.encode('utf-8'))
+
+
+def call(label, function, *args, force=False):
+    '''(function(*args), name of the profile written or None).
+
+    The call is profiled if force is true or it is sampled at RATE; no
+    call made within it is sampled again.'''
+    if (getattr(_local, 'inside', False)):
+        return function(*args), None
+    _local.inside = True
+    try:
+        if (not force and not (RATE > 0 and random.random() < RATE)):
+            return function(*args), None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            #  another thread is profiling, and this Python allows only
+            #  one profiler at a time
+            return function(*args), None
+        try:
+            result = function(*args)
+        finally:
+            profile.disable()
+            name = write(profile, label)
+        return result, name
+    finally:
+        _local.inside = False
+
+
+def _frame(function):
+    filename, line, name = function
+    if (filename == '~'):
+        frame = name
+    else:
+        frame = '%s:%d:%s' % (os.path.basename(filename), line, name)
+    return frame.replace(';', ',')
+
+
+def folded(stats):
+    '''Collapsed stacks of a pstats.Stats, one "f;g;h microseconds" line
+    per path.  cProfile keeps only caller-callee pairs, so a callee's
+    time is split among its callers' paths in proportion to the time
+    each spent calling it.'''
+    entries = stats.stats
+    callees = {}
+    for function, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            callees.setdefault(caller, []).append((function, cumulative))
+    lines = {}
+
+    def walk(function, path, onPath, share):
+        _, _, selfTime, cumulative, _ = entries[function]
+        micros = int(round(selfTime * share * 1e6))
+        if (micros > 0):
+            lines[path] = lines.get(path, 0) + micros
+        if (len(onPath) >= MAX_DEPTH):
+            return
+        for callee, calleeTime in callees.get(function, ()):
+            total = entries[callee][3]
+            if (callee in onPath or total <= 0 or calleeTime * share < 1e-6):
+                continue
+            walk(callee, path + ';' + _frame(callee), onPath | {callee}, calleeTime * share / total)
+
+    for function, (_, _, _, _, callers) in sorted(entries.items()):
+        if (not callers and function != _DISABLE):
+            walk(function, _frame(function), frozenset([function]), 1.0)
+    return ''.join('%s %d\n' % (path, micros) for path, micros in sorted(lines.items()))
+
+
+def write(profile, label):
+    '''Save profile as NAME.prof and NAME.folded in DIRECTORY, drop the
+    oldest beyond KEEP, and return NAME, or None if it could not be
+    written.'''
+    name = '%s-%d-%s' % (datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S.%fZ'), os.getpid(),
+                         re.sub(r'[^A-Za-z0-9_.-]', '_', label)[:40])
+    path = os.path.join(DIRECTORY, name)
+    try:
+        os.makedirs(DIRECTORY, exist_ok=True)
+        stats = pstats.Stats(profile)
+        stats.dump_stats(path + '.prof')
+        with open(path + '.folded', 'w') as out:
+            out.write(folded(stats))
+        _rotate()
+    except OSError as e:
+        sys.stderr.write('rcube profile %s not written: %s\n' % (name, e))
+        return None
+    return name
+
+
+def _rotate():
+    with _rotating:
+        names = sorted(name[:-5] for name in os.listdir(DIRECTORY) if name.endswith('.prof'))
+        for name in names[:max(len(names) - KEEP, 0)]:
+            for suffix in ('.prof', '.folded'):
+                try:
+                    os.remove(os.path.join(DIRECTORY, name + suffix))
+                except FileNotFoundError:
+                    #  another worker process removed it first
+                    pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m RCube.profiling',
+                                     description='Print the collapsed stacks of a saved profile.')
+    parser.add_argument('profile', help='a .prof file written by the profiling hook')
+    args = parser.parse_args(argv)
+
+    sys.stdout.write(folded(pstats.Stats(args.profile)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
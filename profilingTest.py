@@ -0,0 +1,120 @@
+import cProfile
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+import RCube.dispatch as RCube
+import RCube.microservice as microservice
+import RCube.profiling as profiling
+
+
+def _leaf(n):
+    return sum(range(n))
+
+
+def _middle():
+    return _leaf(20000) + _leaf(40000)
+
+
+class ProfilingTest(unittest.TestCase):
+# Unit Tests
+#
+# 2600 profiling -- call, folded, write; the /rcube profile header
+# Desired level of confidence: boundary value analysis
+# Analysis
+#    inputs:  admin header, sample rate, profiled function
+#    outputs: NAME.prof and NAME.folded in the profile directory
+#
+# Happy path
+#    a forced call is profiled and both files are written
+#    folded paths run from the root and their times add up
+#    sampling at rate 1 profiles dispatch
+#    the header with the token profiles a request and names the profile
+#    only the newest KEEP profiles are kept
+#
+# Sad path
+#    a call within a profiled call is not profiled again
+#    a wrong or unset token does not profile
+#    rate 0 without the header profiles nothing
+
+    def setUp(self):
+        self.saved = (profiling.TOKEN, profiling.RATE, profiling.DIRECTORY, profiling.KEEP)
+        profiling.DIRECTORY = tempfile.mkdtemp()
+        profiling.RATE = 0.0
+        profiling.TOKEN = ''
+
+    def tearDown(self):
+        shutil.rmtree(profiling.DIRECTORY)
+        profiling.TOKEN, profiling.RATE, profiling.DIRECTORY, profiling.KEEP = self.saved
+
+    def profiles(self):
+        return sorted(name for name in os.listdir(profiling.DIRECTORY) if name.endswith('.prof'))
+
+    def test2600_010_ShouldWriteBothFormats(self):
+        result, name = profiling.call('unit', _middle, force=True)
+        self.assertEqual(_middle(), result)
+        self.assertTrue(name.endswith('-%d-unit' % os.getpid()))
+        path = os.path.join(profiling.DIRECTORY, name)
+        functions = [function[2] for function in pstats.Stats(path + '.prof').stats]
+        self.assertIn('_middle', functions)
+        with open(path + '.folded') as folded:
+            self.assertIn('profilingTest.py', folded.read())
+
+    def test2600_020_ShouldFoldFromRoot(self):
+        profile = cProfile.Profile()
+        profile.runcall(_middle)
+        stats = pstats.Stats(profile)
+        lines = profiling.folded(stats).splitlines()
+        for line in lines:
+            self.assertTrue(line.split(';')[0].split(' ')[0].endswith(':_middle'))
+        leaves = [line for line in lines if ':_middle;' in line and ':_leaf' in line]
+        self.assertTrue(leaves)
+        for line in lines:
+            path, micros = line.rsplit(' ', 1)
+            self.assertGreater(int(micros), 0)
+        total = sum(int(line.rsplit(' ', 1)[1]) for line in lines)
+        self.assertLessEqual(total, int(stats.total_tt * 1e6) + len(lines))
+
+    def test2600_030_ShouldSampleDispatch(self):
+        profiling.RATE = 1.0
+        self.assertEqual('created', RCube.dispatch({'op': 'create'})['status'])
+        profiles = self.profiles()
+        self.assertEqual(1, len(profiles))
+        self.assertTrue(profiles[0].endswith('-dispatch-create.prof'))
+
+    def test2600_040_ShouldProfileOnHeader(self):
+        profiling.TOKEN = 'secret'
+        client = microservice.app.test_client()
+        response = client.get('/rcube?op=create', headers={profiling.HEADER: 'secret'})
+        self.assertEqual('created', response.get_json()['status'])
+        name = response.headers[profiling.HEADER]
+        self.assertEqual([name + '.prof'], self.profiles())
+        self.assertTrue(os.path.exists(os.path.join(profiling.DIRECTORY, name + '.folded')))
+
+    def test2600_050_ShouldKeepNewest(self):
+        profiling.KEEP = 3
+        names = [profiling.call('unit', _leaf, 10, force=True)[1] for _ in range(5)]
+        self.assertEqual([name + '.prof' for name in names[2:]], self.profiles())
+        self.assertEqual(6, len(os.listdir(profiling.DIRECTORY)))
+
+    def test2600_900_ShouldNotNest(self):
+        profiling.RATE = 1.0
+        result, name = profiling.call('outer', RCube.dispatch, {'op': 'create'})
+        self.assertEqual('created', result['status'])
+        self.assertEqual([name + '.prof'], self.profiles())
+
+    def test2600_910_ShouldRequireToken(self):
+        client = microservice.app.test_client()
+        response = client.get('/rcube?op=create', headers={profiling.HEADER: ''})
+        self.assertNotIn(profiling.HEADER, response.headers)
+        profiling.TOKEN = 'secret'
+        response = client.get('/rcube?op=create', headers={profiling.HEADER: 'guess'})
+        self.assertNotIn(profiling.HEADER, response.headers)
+        self.assertFalse(profiling.authorized(None))
+        self.assertEqual([], self.profiles())
+
+    def test2600_920_ShouldNotProfileAtRateZero(self):
+        RCube.dispatch({'op': 'create'})
+        microservice.app.test_client().get('/rcube?op=check')
+        self.assertEqual([], self.profiles())
@@ -0,0 +1,121 @@
+'''
+    Bounded LRU cache of serialized dispatch responses
+
+    create, check, rotate and solve are pure functions of their
+    parameters, so their encoded responses are cached, keyed by the
+    sorted parameter set, and so is scramble when given a seed.  Other
+    ops (scramble without a seed draws random numbers) always go to
+    dispatch.  An optimal solve that ran out of its node budget
+    ("optimal": false) is not stored either: whether the budget runs
+    out depends on the load, not on the parameters.  The cache is
+    bounded by the total size of the stored keys and responses so it
+    can be fitted to the instance memory.
+'''
+
+import os
+import threading
+from collections import OrderedDict
+from time import perf_counter
+
+import RCube.dispatch as RCube
+import RCube.encoder as encoder
+import RCube.metrics as metrics
+
+
+CACHEABLE_OPS = frozenset(['create', 'check', 'rotate', 'solve'])
+
+
+def cacheKey(parm):
+    '''Normalized key for a parameter dict, or None if it must not be cached.'''
+    if (parm.get('op') not in CACHEABLE_OPS and
+            not (parm.get('op') == 'scramble' and 'seed' in parm)):
+        return None
+    return tuple(sorted(parm.items()))
+
+
+def storable(result):
+    '''True if a dispatch result may be cached under its parameters.'''
+    return result.get('optimal', True) is not False
+
+
+def _keySize(key):
+    return sum(len(name) + len(value) for name, value in key)
+
+
+class ResponseCache(object):
+    '''Thread-safe LRU mapping of cache keys to encoded responses.'''
+
+    def __init__(self, maxBytes):
+        self.maxBytes = maxBytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry is None):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, body):
+        entrySize = _keySize(key) + len(body)
+        if (entrySize > self.maxBytes):
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if (old is not None):
+                self.size -= old[1]
+            self._entries[key] = (body, entrySize)
+            self.size += entrySize
+            while (self.size > self.maxBytes):
+                _, (_, evictedSize) = self._entries.popitem(last=False)
+                self.size -= evictedSize
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions, 'entries': len(self._entries),
+                    'bytes': self.size, 'maxBytes': self.maxBytes}
+
+
+#  shared by every request thread of the process; RCUBE_CACHE_BYTES=0
+#  turns caching off
+cache = ResponseCache(int(os.getenv('RCUBE_CACHE_BYTES', str(8 * 1024 * 1024))))
+
+
+def cached(parm, key):
+    '''The cached response for parm under key, or None.  A hit never
+    reaches dispatch, so it is counted for /metrics here, as status
+    cached.'''
+    started = perf_counter()
+    body = cache.get(key)
+    if (body is not None):
+        metrics.observe(parm.get('op'), 'cached', perf_counter() - started)
+    return body
+
+
+def respond(parm):
+    '''Encoded dispatch response for parm, served from the cache when possible.'''
+    key = cacheKey(parm)
+    if (key is None or cache.maxBytes <= 0):
+        return encoder.encode(RCube.dispatch(parm))
+    body = cached(parm, key)
+    if (body is None):
+        result = RCube.dispatch(parm)
+        body = encoder.encode(result)
+        if (storable(result)):
+            cache.put(key, body)
+    return body
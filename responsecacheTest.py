@@ -0,0 +1,83 @@
+import json
+import unittest
+import RCube.optimal as optimal
+import RCube.responsecache as responsecache
+import RCube.solutioncache as solutioncache
+from RCube.cubestate import DEFAULT_COLORS, SOLVED_FACES, getPalette, rotateState
+
+
+class ResponseCacheTest(unittest.TestCase):
+# Unit Tests
+#
+# 1200 responsecache -- ResponseCache, respond
+# Analysis
+#    inputs:  parm     dispatch parameter dict
+#             maxBytes size limit of the cache
+#    outputs: encoded dispatch response; hit, miss and eviction counts
+#
+# Happy path
+#    repeating a deterministic query is a hit
+#    parameter order does not change the key
+#    a seeded scramble is cached
+#    least recently used entry is evicted first when the cache is full
+#
+# Sad path
+#    unseeded scramble and unknown ops are never cached
+#    entry larger than the whole cache is not stored
+#    an optimal solve that ran out of budget is not stored
+
+    def setUp(self):
+        self.saved = responsecache.cache
+        responsecache.cache = responsecache.ResponseCache(1 << 20)
+
+    def tearDown(self):
+        responsecache.cache = self.saved
+
+    def test1200_010_ShouldHitOnRepeatedQuery(self):
+        first = responsecache.respond({'op': 'create', 'f': 'x'})
+        second = responsecache.respond({'f': 'x', 'op': 'create'})
+        self.assertEqual(first, second)
+        self.assertEqual('created', json.loads(second)['status'])
+        stats = responsecache.cache.stats()
+        self.assertEqual((1, 1, 1), (stats['hits'], stats['misses'], stats['entries']))
+
+    def test1200_020_ShouldEvictLeastRecentlyUsed(self):
+        cache = responsecache.ResponseCache(30)
+        cache.put((('op', 'a'),), 'x' * 10)
+        cache.put((('op', 'b'),), 'x' * 10)
+        cache.get((('op', 'a'),))
+        cache.put((('op', 'c'),), 'x' * 10)
+        self.assertEqual(None, cache.get((('op', 'b'),)))
+        self.assertEqual('x' * 10, cache.get((('op', 'a'),)))
+        self.assertEqual(1, cache.stats()['evictions'])
+        self.assertTrue(cache.stats()['bytes'] <= 30)
+
+    def test1200_030_ShouldCacheSeededScramble(self):
+        parm = {'op': 'scramble', 'n': '12', 'method': 'transition', 'seed': '9'}
+        self.assertEqual(responsecache.respond(parm), responsecache.respond(parm))
+        self.assertEqual(1, responsecache.cache.stats()['hits'])
+
+    def test1200_900_ShouldNotCacheNondeterministicOps(self):
+        self.assertEqual(None, responsecache.cacheKey({'op': 'scramble'}))
+        self.assertEqual(None, responsecache.cacheKey({'op': 'nonsense'}))
+        self.assertEqual(None, responsecache.cacheKey({}))
+        responsecache.respond({'op': 'scramble'})
+        self.assertEqual(0, responsecache.cache.stats()['entries'])
+
+    def test1200_910_ShouldNotStoreOversizedEntry(self):
+        cache = responsecache.ResponseCache(10)
+        cache.put((('op', 'a'),), 'x' * 20)
+        self.assertEqual(0, cache.stats()['entries'])
+
+    def test1200_920_ShouldNotStoreUnprovenOptimal(self):
+        cube = ','.join(getPalette(DEFAULT_COLORS).decode(rotateState(SOLVED_FACES, 'fRbUltFrrBuL')))
+        saved = (optimal.NODE_BUDGET, solutioncache.MAX_ENTRIES, solutioncache._cache)
+        optimal.NODE_BUDGET, solutioncache.MAX_ENTRIES, solutioncache._cache = 1, 0, None
+        try:
+            body = responsecache.respond({'op': 'solve', 'mode': 'optimal', 'cube': cube})
+        finally:
+            optimal.NODE_BUDGET, solutioncache.MAX_ENTRIES, solutioncache._cache = saved
+        self.assertFalse(json.loads(body)['optimal'])
+        self.assertEqual(0, responsecache.cache.stats()['entries'])
+        self.assertTrue(responsecache.storable({'status': 'solved', 'optimal': True}))
+        self.assertTrue(responsecache.storable({'status': 'created'}))
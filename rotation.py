@@ -0,0 +1,94 @@
+'''
+    Table-driven rotation engine for the rcube service
+
+    The cube is a list of 54 facelets, nine per face in the order
+    f (front), r (right), b (back), l (left), t (top), u (under).
+    Every quarter turn is a permutation of those 54 positions;
+    a lowercase face letter turns clockwise, an uppercase letter
+    turns counter-clockwise.
+'''
+
+from functools import lru_cache
+from operator import itemgetter
+
+
+FACES = 'frbltu'
+
+#  Clockwise quarter turns written as facelet cycles: the facelet at
+#  cycle[k] moves to cycle[k+1].  The first two cycles turn the face
+#  itself, the remaining three carry the adjacent rows around it.
+CLOCKWISE_CYCLES = {
+    'f': [(0, 2, 8, 6), (1, 5, 7, 3), (9, 47, 35, 42), (12, 46, 32, 43), (15, 45, 29, 44)],
+    'r': [(9, 11, 17, 15), (10, 14, 16, 12), (2, 38, 24, 47), (5, 41, 21, 50), (8, 44, 18, 53)],
+    'b': [(18, 20, 26, 24), (19, 23, 25, 21), (11, 36, 33, 53), (14, 37, 30, 52), (17, 38, 27, 51)],
+    'l': [(27, 29, 35, 33), (28, 32, 34, 30), (0, 45, 26, 36), (3, 48, 23, 39), (6, 51, 20, 42)],
+    't': [(36, 38, 44, 42), (37, 41, 43, 39), (0, 27, 18, 9), (1, 28, 19, 10), (2, 29, 20, 11)],
+    'u': [(45, 47, 53, 51), (46, 50, 52, 48), (6, 15, 24, 33), (7, 16, 25, 34), (8, 17, 26, 35)],
+}
+
+IDENTITY = tuple(range(54))
+
+
+def cyclesToPermutation(cycles):
+    '''Build the gather permutation for a set of facelet cycles.
+
+    The result p satisfies newCube[i] = cube[p[i]].
+    '''
+    perm = list(IDENTITY)
+    for cycle in cycles:
+        for k in range(len(cycle)):
+            perm[cycle[(k + 1) % len(cycle)]] = cycle[k]
+    return tuple(perm)
+
+
+def invert(perm):
+    '''Return the permutation that undoes perm.'''
+    inverse = [0] * len(perm)
+    for i, source in enumerate(perm):
+        inverse[source] = i
+    return tuple(inverse)
+
+
+def _buildMoves():
+    moves = {}
+    for face in FACES:
+        clockwise = cyclesToPermutation(CLOCKWISE_CYCLES[face])
+        moves[face] = clockwise
+        moves[face.upper()] = invert(clockwise)
+    return moves
+
+
+#  move letter -> 54-entry gather permutation
+MOVES = _buildMoves()
+
+
+def compose(first, second):
+    '''Return the permutation equal to applying first and then second.'''
+    return tuple(first[i] for i in second)
+
+
+def sequencePermutation(moves):
+    '''Compose a string of moves such as 'fRbUUl' into one permutation.
+
+    Raises KeyError if any character is not one of fFrRbBlLtTuU.
+    '''
+    perm = IDENTITY
+    for move in moves:
+        perm = compose(perm, MOVES[move])
+    return perm
+
+
+def isMoveSequence(moves):
+    '''True if moves is a non-empty string made only of fFrRbBlLtTuU.'''
+    return bool(moves) and all(move in MOVES for move in moves)
+
+
+@lru_cache(maxsize=1024)
+def sequenceGather(moves):
+    '''Cached itemgetter performing a whole move sequence in one call.
+
+    The sequence is composed into a single permutation, cached by the
+    sequence string, so repeating an algorithm costs one gather.
+    Raises KeyError if any character is not one of fFrRbBlLtTuU.
+    '''
+    return itemgetter(*sequencePermutation(moves))
@@ -0,0 +1,89 @@
+import unittest
+import RCube.rotation as rotation
+
+
+def turn(cube, moves):
+    #  the list of 54 facelets after moves, as cubestate.rotateState
+    #  turns a byte state
+    return list(rotation.sequenceGather(moves)(cube))
+
+
+class RotationTest(unittest.TestCase):
+# Unit Tests
+#
+# 600 rotation -- MOVES, sequenceGather
+# Desired level of confidence: boundary value analysis
+# Analysis
+#    inputs:  cube    list of 54 facelets
+#             move    one of f F r R b B l L t T u U
+#             moves   string of one or more of the above, e.g. fRbUUl
+#    outputs: new list of 54 facelets with the quarter turn(s) applied
+#
+# Happy path
+#    every move is a permutation of the 54 positions
+#    a clockwise turn followed by its counter-clockwise turn is the identity
+#    four quarter turns of the same face are the identity
+#    turning a face never moves its center
+#    a move sequence equals its moves applied one at a time
+#
+# Sad path
+#    unknown move raises KeyError
+#    empty sequence or sequence with an unknown move is rejected
+
+    def setUp(self):
+        self.cube = ['3','1','1','1','1','1','3','1','6','5','4','5','5','2','3','3','2','6',
+                     '1','3','5','6','3','5','1','4','1','3','6','6','2','4','2','6','3','5',
+                     '4','5','2','4','5','3','2','4','4','2','6','4','2','6','6','4','5','2']
+
+    def test600_100_ShouldHaveTwelveMoves(self):
+        self.assertEqual(sorted('fFrRbBlLtTuU'), sorted(rotation.MOVES))
+
+    def test600_110_ShouldBePermutations(self):
+        for move in rotation.MOVES:
+            self.assertEqual(list(range(54)), sorted(rotation.MOVES[move]))
+
+    def test600_120_ShouldUndoClockwiseWithCounterClockwise(self):
+        for face in rotation.FACES:
+            turned = turn(self.cube, face)
+            self.assertEqual(self.cube, turn(turned, face.upper()))
+
+    def test600_130_ShouldReturnToStartAfterFourTurns(self):
+        for move in rotation.MOVES:
+            turned = self.cube
+            for _ in range(4):
+                turned = turn(turned, move)
+            self.assertEqual(self.cube, turned)
+
+    def test600_140_ShouldKeepCenters(self):
+        for move in rotation.MOVES:
+            turned = turn(self.cube, move)
+            for center in (4, 13, 22, 31, 40, 49):
+                self.assertEqual(self.cube[center], turned[center])
+
+    def test600_150_ShouldRotateFrontClockwise(self):
+        expected = ['3','1','3','1','1','1','6','1','1','2','4','5','4','2','3','4','2','6',
+                    '1','3','5','6','3','5','1','4','1','3','6','2','2','4','6','6','3','4',
+                    '4','5','2','4','5','3','5','2','6','3','5','5','2','6','6','4','5','2']
+        self.assertEqual(expected, turn(self.cube, 'f'))
+
+    def test600_200_ShouldApplySequenceLikeSingleMoves(self):
+        expected = self.cube
+        for move in 'fRbUUl':
+            expected = turn(expected, move)
+        self.assertEqual(expected, turn(self.cube, 'fRbUUl'))
+
+    def test600_210_ShouldUndoSequenceWithReversedInverse(self):
+        turned = turn(self.cube, 'fRbUUl')
+        self.assertEqual(self.cube, turn(turned, 'LuuBrF'))
+
+    def test600_220_ShouldAcceptMoveSequences(self):
+        self.assertTrue(rotation.isMoveSequence('f'))
+        self.assertTrue(rotation.isMoveSequence('fFrRbBlLtTuU'))
+
+    def test600_900_ShouldRaiseOnUnknownMove(self):
+        self.assertRaises(KeyError, turn, self.cube, 'x')
+
+    def test600_910_ShouldRejectBadMoveSequences(self):
+        self.assertFalse(rotation.isMoveSequence(''))
+        self.assertFalse(rotation.isMoveSequence('fRx'))
+        self.assertRaises(KeyError, turn, self.cube, 'fRx')
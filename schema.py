@@ -0,0 +1,174 @@
+'''
+    Parameter schemas for dispatch ops
+
+    Every op registered with dispatch declares the parameters it takes
+    as a Schema.  The schema is compiled once, when it is declared, into
+    a validator that dispatch runs before the op's handler.  The
+    validator checks, stopping at the first failure:
+
+        required   the parameters that must be present
+        palette    the optional f/r/b/l/t/u colors, none of them blank
+        cube       a cube of 54 facelets in those colors, centers in
+                   place, that turning a solved cube can reach (when
+                   the six colors differ)
+        fields     each field given passes its test: a predicate, or
+                   the collection of values allowed
+
+    A failure is answered with its error status.  Otherwise the
+    validator hands the handler the palette and the cube's 54-byte
+    state.  Each value the schema reads is limited to RCUBE_VALUE_LIMIT
+    characters (default 4096), and the cube to CUBE_LIMIT, enough for 54
+    facelets of that length and their commas, so a validator's cost is
+    bounded by its schema, not by the query.
+
+    "python -m RCube.schema" times the validators of the registered ops.
+'''
+
+import argparse
+import os
+import sys
+import timeit
+
+from RCube.cubestate import DEFAULT_COLORS, FACE_KEYS, getPalette
+from RCube.cubies import CENTERS, unreachable
+
+
+VALUE_LIMIT = int(os.getenv('RCUBE_VALUE_LIMIT', '4096'))
+CUBE_LIMIT = 54 * VALUE_LIMIT + 53
+
+ERROR = 'error:'
+
+DEFAULT_PALETTE = getPalette(DEFAULT_COLORS)
+
+
+def cubeList(parm):
+    '''parm['cube'] split at commas; a fastpath.Parameters splits it
+    once and keeps the list.'''
+    split = getattr(parm, 'cubeList', None)
+    if (split is None):
+        return parm['cube'].split(',')
+    return split()
+
+
+def paletteOf(parm):
+    '''Palette of the f/r/b/l/t/u parameters, or None if one is blank
+    or longer than VALUE_LIMIT.'''
+    if (parm.keys().isdisjoint(FACE_KEYS)):
+        return DEFAULT_PALETTE
+    colors = tuple(parm.get(key, default) for key, default in zip(FACE_KEYS, DEFAULT_COLORS))
+    for color in colors:
+        if (not color or (type(color) is str and len(color) > VALUE_LIMIT)):
+            return None
+    return getPalette(colors)
+
+
+def cubeState(parm, palette):
+    '''(error status, None) or (None, 54-byte state) for parm['cube'].
+    Reachability is only checked when the six colors differ: with a
+    repeated color the cubies cannot be told apart.'''
+    cubelist = cubeList(parm)
+    if (len(cubelist) != 54):
+        return ERROR, None
+    state = palette.encode(cubelist)
+    if (state is None or not palette.hasCenters(state)):
+        return ERROR, None
+    reason = unreachable(state) if palette.codes == CENTERS else None
+    if (reason):
+        return 'error: ' + reason, None
+    return None, state
+
+
+class Schema(object):
+    '''The parameters of one op, compiled into validate(parm), which
+    returns (error status or None, palette, state).
+
+    required names parameters that must be present; palette and cube
+    ask for the colors and the cube to be checked and passed on; each
+    other keyword names an optional field and its test.
+    '''
+
+    def __init__(self, required=(), palette=False, cube=False, **fields):
+        self.required = tuple(required)
+        self.palette = palette or cube
+        self.cube = cube
+        self.fields = fields
+        self.validate = self._compile()
+
+    def _compile(self):
+        required = self.required
+        tests = tuple((name, test if callable(test) else frozenset(test).__contains__)
+                      for name, test in sorted(self.fields.items()))
+        #  paletteOf limits the colors
+        limited = dict.fromkeys(set(required) | set(self.fields), VALUE_LIMIT)
+        if (self.cube):
+            limited['cube'] = CUBE_LIMIT
+        limited = tuple(sorted(limited.items()))
+        usePalette = self.palette
+        useCube = self.cube
+
+        def validate(parm):
+            for name in required:
+                if (name not in parm):
+                    return ERROR, None, None
+            for name, limit in limited:
+                value = parm.get(name)
+                if (type(value) is str and len(value) > limit):
+                    return ERROR, None, None
+            palette = state = None
+            if (usePalette):
+                palette = paletteOf(parm)
+                if (palette is None):
+                    return ERROR, None, None
+            if (useCube):
+                status, state = cubeState(parm, palette)
+                if (status is not None):
+                    return status, None, None
+            for name, test in tests:
+                value = parm.get(name)
+                if (value is not None and not test(value)):
+                    return ERROR, None, None
+            return None, palette, state
+        return validate
+
+
+#  ----------------------------------------------------------------------
+#  benchmark
+
+_CUBE = ','.join(color for color in DEFAULT_COLORS for _ in range(9))
+
+BENCH_QUERIES = {
+    'create': 'op=create&f=1&r=2&b=3&l=4&t=5&u=6',
+    'check': 'op=check&cube=' + _CUBE,
+    'rotate': 'op=rotate&face=FrB&cube=' + _CUBE,
+    'solve': 'op=solve&mode=optimal&cube=' + _CUBE,
+    'scramble': 'op=scramble&n=20&method=transition&seed=1&index=2',
+    'long cube': 'op=check&cube=' + ','.join(['x' * VALUE_LIMIT] * 54),
+}
+
+
+def benchmark(number=20000, queries=BENCH_QUERIES):
+    '''Microseconds per call of each query's validator.'''
+    import RCube.dispatch as RCube
+    import RCube.fastpath as fastpath
+
+    results = {}
+    for name, query in queries.items():
+        parm = dict(fastpath.parse(query))
+        validate = RCube.SCHEMAS[parm['op']].validate
+        results[name] = min(timeit.repeat(lambda: validate(parm), number=number, repeat=3)) * 1e6 / number
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m RCube.schema',
+                                     description='Time the parameter validators of the dispatch ops.')
+    parser.add_argument('--number', type=int, default=20000, help='calls per query (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    for name, micros in benchmark(args.number).items():
+        print('%-10s %7.2f us' % (name, micros))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
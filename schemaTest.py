@@ -0,0 +1,108 @@
+import timeit
+import unittest
+import RCube.dispatch as RCube
+import RCube.metrics as metrics
+import RCube.schema as schema
+from RCube.cubestate import DEFAULT_COLORS
+
+
+SOLVED = ','.join(color for color in DEFAULT_COLORS for _ in range(9))
+
+
+class SchemaTest(unittest.TestCase):
+# Unit Tests
+#
+# 2500 schema -- Schema, paletteOf, cubeState; dispatch.register
+# Desired level of confidence: boundary value analysis
+# Analysis
+#    inputs:  parameter dicts; schemas of required names, palette,
+#             cube and field tests
+#    outputs: (error status or None, palette, state); op handlers
+#
+# Happy path
+#    absent colors give the shared default palette
+#    a valid cube is passed on as its 54-byte state
+#    field tests are predicates or collections of allowed values
+#    a registered op is dispatched without changing dispatch
+#    validating a cube stays in the tens of microseconds
+#    a cube of 54 colors each VALUE_LIMIT long is accepted
+#
+# Sad path
+#    a missing required name, a blank color, a failed field test or a
+#    value longer than VALUE_LIMIT (the cube: CUBE_LIMIT) is 'error:'
+#    an unreachable cube is 'error: ' and the reason
+#    a blank color is an error for check, rotate and solve as for create
+
+    def test2500_010_ShouldDefaultPalette(self):
+        self.assertIs(schema.DEFAULT_PALETTE, schema.paletteOf({'op': 'check'}))
+        self.assertIs(schema.DEFAULT_PALETTE, schema.paletteOf({'f': 'green'}))
+        self.assertEqual(('1', 'yellow', 'blue', 'white', 'red', '6'),
+                         schema.paletteOf({'f': '1', 'u': '6'}).colors)
+
+    def test2500_020_ShouldPassStateOn(self):
+        status, palette, state = schema.Schema(required=('cube',), cube=True).validate({'cube': SOLVED})
+        self.assertIsNone(status)
+        self.assertIs(schema.DEFAULT_PALETTE, palette)
+        self.assertEqual(palette.solved, state)
+
+    def test2500_030_ShouldTestFields(self):
+        validate = schema.Schema(mode=('optimal',), n=str.isdigit).validate
+        self.assertEqual((None, None, None), validate({'mode': 'optimal', 'n': '12'}))
+        self.assertEqual((None, None, None), validate({}))
+        self.assertEqual('error:', validate({'mode': 'fast'})[0])
+        self.assertEqual('error:', validate({'n': 'x'})[0])
+
+    def test2500_040_ShouldPlugInOp(self):
+        def echo(parm, palette, state):
+            return {'status': 'echoed', 'colors': list(palette.colors)}
+        RCube.register('echo', schema.Schema(required=('word',), palette=True), echo)
+        try:
+            self.assertEqual({'status': 'echoed', 'colors': ['x'] + list(DEFAULT_COLORS[1:])},
+                             RCube.dispatch({'op': 'echo', 'word': 'hi', 'f': 'x'}))
+            self.assertEqual({'status': 'error:'}, RCube.dispatch({'op': 'echo'}))
+            self.assertIn('echo', metrics.OPS)
+        finally:
+            del RCube._ops['echo'], RCube.SCHEMAS['echo']
+            metrics.OPS.discard('echo')
+        self.assertEqual({'status': 'error:'}, RCube.dispatch({'op': 'echo', 'word': 'hi'}))
+
+    def test2500_050_ShouldValidateQuickly(self):
+        validate = RCube.SCHEMAS['check'].validate
+        parm = {'op': 'check', 'cube': ','.join(['x'] * (schema.VALUE_LIMIT // 2))}
+        seconds = min(timeit.repeat(lambda: validate(parm), number=200, repeat=3)) / 200
+        #  far above the tens of microseconds it usually takes, so a
+        #  slow or busy machine still passes
+        self.assertLess(seconds, 2e-2)
+
+    def test2500_060_ShouldAcceptLongColors(self):
+        colors = [letter * schema.VALUE_LIMIT for letter in 'abcdef']
+        parm = dict(zip('frbltu', colors))
+        parm['cube'] = ','.join(color for color in colors for _ in range(9))
+        self.assertEqual(schema.CUBE_LIMIT, len(parm['cube']))
+        status, palette, state = RCube.SCHEMAS['check'].validate(parm)
+        self.assertIsNone(status)
+        self.assertEqual(palette.solved, state)
+
+    def test2500_900_ShouldRejectMissingRequired(self):
+        self.assertEqual(('error:', None, None),
+                         schema.Schema(required=('cube', 'face')).validate({'cube': SOLVED}))
+
+    def test2500_910_ShouldRejectBlankColor(self):
+        self.assertIsNone(schema.paletteOf({'f': 'green', 'r': ''}))
+        for op in ('create', 'check', 'rotate', 'solve'):
+            self.assertEqual({'status': 'error:'},
+                             RCube.dispatch({'op': op, 'cube': SOLVED, 'face': 'F', 'l': ''}))
+
+    def test2500_920_ShouldRejectLongValues(self):
+        validate = schema.Schema(cube=True, word=str.isalpha).validate
+        self.assertEqual('error:', validate({'cube': 'x' * (schema.VALUE_LIMIT + 1)})[0])
+        self.assertEqual('error:', validate({'cube': SOLVED, 'word': 'x' * (schema.VALUE_LIMIT + 1)})[0])
+        self.assertEqual('error:', validate({'cube': SOLVED, 't': 'x' * (schema.VALUE_LIMIT + 1)})[0])
+        self.assertEqual('error:', validate({'cube': 'x' * (schema.CUBE_LIMIT + 1)})[0])
+
+    def test2500_930_ShouldGiveUnreachableReason(self):
+        cube = SOLVED.split(',')
+        cube[0], cube[9] = cube[9], cube[0]
+        status, _ = schema.cubeState({'cube': ','.join(cube)}, schema.DEFAULT_PALETTE)
+        self.assertTrue(status.startswith('error: '))
+        self.assertEqual(('error:', None), schema.cubeState({'cube': 'green'}, schema.DEFAULT_PALETTE))
@@ -0,0 +1,189 @@
+'''
+    Monte Carlo benchmark of scramble quality
+
+    For every scramble length n in a range (by default 0 .. 99, the
+    lengths op=scramble accepts) a large number of transition
+    scrambles is generated across a process pool, and the same number
+    of cubes is drawn uniformly from all reachable cubes as the
+    reference.  For each n the report gives the randomness scores
+    (mean, variance, histogram), the color counts of each face, and two
+    chi-square tests against the reference:
+
+        scores   the score histogram against the reference histogram
+        colors   the color seen at each of the 48 moving facelets
+                 against the uniform sixth each color has in a random
+                 cube
+
+    n counts as random when neither test rejects at the chosen level.
+    Each pool task draws from its own scrambler.CounterRandom stream,
+    so the report depends on the seed but not on the pool.
+    The report is written as JSON; "python -m RCube.scramblebench"
+    runs it.  Needs numpy.
+'''
+
+import argparse
+import json
+import math
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy
+
+import RCube.cubearray as cubearray
+import RCube.scrambler as scrambler
+
+
+#  facelets that are not centers
+_MOVING = numpy.array([facelet for facelet in range(54) if facelet % 9 != 4])
+
+#  chi-square bins are merged until each holds at least this many
+#  scrambles from both samples together
+_MIN_BIN = 10
+
+
+def _sample(job):
+    #  (n, histogram of scores, counts[facelet, color]) for one chunk;
+    #  n is None for the uniformly drawn reference
+    n, seed, chunk, count = job
+    rng = scrambler.CounterRandom(seed, (0 if n is None else n + 1) << 32 | chunk)
+    if (n is None):
+        states = cubearray.scrambleBatch(0, count, 'random', rng)
+    else:
+        states = cubearray.scrambleBatch(n, count, 'transition', rng)
+    scores = numpy.bincount(cubearray.randomnessBatch(states), minlength=101)
+    colors = (states[:, :, None] == numpy.arange(6, dtype=numpy.uint8)).sum(axis=0)
+    return n, scores, colors
+
+
+def chiSquareSurvival(statistic, freedom):
+    '''P(X >= statistic) for X chi-square with freedom degrees of
+    freedom, by the Wilson-Hilferty normal approximation.'''
+    if (freedom <= 0):
+        return 1.0
+    scale = 2.0 / (9 * freedom)
+    z = ((statistic / freedom) ** (1.0 / 3) - (1 - scale)) / math.sqrt(scale)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compareHistograms(sample, reference):
+    '''Chi-square test that two histograms come from one distribution.
+    Returns (statistic, degrees of freedom, p-value).'''
+    bins = []
+    pending = numpy.zeros(2)
+    for pair in zip(sample, reference):
+        pending += pair
+        if (pending.sum() >= _MIN_BIN):
+            bins.append(pending)
+            pending = numpy.zeros(2)
+    if (bins):
+        bins[-1] = bins[-1] + pending
+    if (len(bins) < 2):
+        return 0.0, 0, 1.0
+    observed = numpy.array(bins)
+    expected = numpy.outer(observed.sum(axis=1), observed.sum(axis=0)) / observed.sum()
+    statistic = float(((observed - expected) ** 2 / expected).sum())
+    freedom = len(bins) - 1
+    return statistic, freedom, chiSquareSurvival(statistic, freedom)
+
+
+def testColors(colors):
+    '''Chi-square test that every moving facelet shows each color a
+    sixth of the time.  Returns (statistic, degrees of freedom, p-value).'''
+    observed = colors[_MOVING].astype(float)
+    expected = observed.sum(axis=1, keepdims=True) / 6
+    statistic = float(((observed - expected) ** 2 / expected).sum())
+    freedom = len(_MOVING) * 5
+    return statistic, freedom, chiSquareSurvival(statistic, freedom)
+
+
+def run(lengths, count, chunk=2000, processes=None, seed=0, alpha=0.01):
+    '''Benchmark each scramble length in lengths with count scrambles;
+    returns the report as a dict.'''
+    jobs = []
+    for n in [None] + list(lengths):
+        for start in range(0, count, chunk):
+            jobs.append((n, seed, start // chunk, min(chunk, count - start)))
+    scores = {}
+    colors = {}
+    started = time.time()
+    if (processes == 1):
+        results = map(_sample, jobs)
+    else:
+        pool = Pool(processes)
+        results = pool.imap_unordered(_sample, jobs)
+    try:
+        for n, histogram, counts in results:
+            scores[n] = scores.get(n, 0) + histogram
+            colors[n] = colors.get(n, 0) + counts
+    finally:
+        if (processes != 1):
+            pool.close()
+            pool.join()
+    elapsed = time.time() - started
+
+    def summary(n):
+        histogram = scores[n]
+        values = numpy.arange(len(histogram))
+        mean = float((values * histogram).sum() / count)
+        return {'mean': mean,
+                'variance': float(((values - mean) ** 2 * histogram).sum() / count),
+                'histogram': histogram.tolist(),
+                'faceColors': [colors[n][face * 9:face * 9 + 9].sum(axis=0).tolist()
+                               for face in range(6)]}
+
+    reference = summary(None)
+    report = {'count': count, 'seed': seed, 'alpha': alpha, 'seconds': elapsed,
+              'scramblesPerSecond': count * (len(lengths) + 1) / elapsed if elapsed else None,
+              'reference': reference, 'lengths': []}
+    for n in lengths:
+        entry = summary(n)
+        entry['n'] = n
+        statistic, freedom, p = compareHistograms(scores[n], scores[None])
+        entry['scores'] = {'chiSquare': statistic, 'freedom': freedom, 'p': p}
+        statistic, freedom, colorP = testColors(colors[n])
+        entry['colors'] = {'chiSquare': statistic, 'freedom': freedom, 'p': colorP}
+        entry['random'] = p >= alpha and colorP >= alpha
+        report['lengths'].append(entry)
+    #  the shortest length from which every longer one tested random
+    report['randomFrom'] = None
+    for entry in reversed(report['lengths']):
+        if (not entry['random']):
+            break
+        report['randomFrom'] = entry['n']
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m RCube.scramblebench',
+                                     description='Measure how random transition scrambles of each length are.')
+    parser.add_argument('path', nargs='?', default='scramble-quality.json',
+                        help='report to write, - for standard output (default: %(default)s)')
+    parser.add_argument('--low', type=int, default=0, help='shortest length (default: %(default)s)')
+    parser.add_argument('--high', type=int, default=99, help='longest length (default: %(default)s)')
+    parser.add_argument('--count', type=int, default=10000,
+                        help='scrambles per length (default: %(default)s)')
+    parser.add_argument('--chunk', type=int, default=2000,
+                        help='scrambles per pool task (default: %(default)s)')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: %(default)s)')
+    parser.add_argument('--alpha', type=float, default=0.01,
+                        help='significance level (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    report = run(range(args.low, args.high + 1), args.count, args.chunk, args.processes,
+                 args.seed, args.alpha)
+    text = json.dumps(report, indent=1)
+    if (args.path == '-'):
+        sys.stdout.write(text + '\n')
+    else:
+        with open(args.path, 'w') as stream:
+            stream.write(text + '\n')
+    sys.stderr.write('random from n = %s; %.0f scrambles/s\n' % (report['randomFrom'],
+                                                                report['scramblesPerSecond'] or 0))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import unittest
+import numpy
+import RCube.scramblebench as scramblebench
+
+
+class ScrambleBenchTest(unittest.TestCase):
+# Unit Tests
+#
+# 2000 scramblebench -- chi-square tests, run
+# Desired level of confidence: boundary value analysis
+# Analysis
+#    inputs:  lengths    scramble lengths to measure
+#             count      scrambles per length
+#             processes  pool size
+#    outputs: report dict, one entry per length
+#
+# Happy path
+#    identical histograms do not differ
+#    long scrambles test random, unscrambled cubes do not
+#    every scramble lands in the histogram and the face color counts
+#    a pool gives the same report as a single process
+#
+# Sad path
+#    histograms with fewer than two usable bins give p = 1
+
+    def test2000_010_ShouldNotRejectIdenticalHistograms(self):
+        histogram = numpy.array([0, 40, 80, 40, 0])
+        statistic, freedom, p = scramblebench.compareHistograms(histogram, histogram)
+        self.assertEqual(0.0, statistic)
+        self.assertEqual(2, freedom)
+        self.assertGreater(p, 0.99)
+
+    def test2000_020_ShouldMatchChiSquareTail(self):
+        #  95th percentile of chi-square with 10 degrees of freedom
+        self.assertAlmostEqual(0.05, scramblebench.chiSquareSurvival(18.307, 10), places=3)
+
+    def test2000_100_ShouldTellRandomFromSolved(self):
+        report = scramblebench.run([0, 60], 3000, chunk=1000, processes=1)
+        solved, long = report['lengths']
+        self.assertEqual(100.0, solved['mean'])
+        self.assertFalse(solved['random'])
+        self.assertTrue(long['random'])
+        self.assertEqual(60, report['randomFrom'])
+        self.assertEqual(3000, sum(long['histogram']))
+        self.assertEqual(3000 * 54, sum(map(sum, long['faceColors'])))
+
+    def test2000_110_ShouldReportSameInPool(self):
+        single = scramblebench.run([3], 400, chunk=100, processes=1)
+        pooled = scramblebench.run([3], 400, chunk=100, processes=2)
+        self.assertEqual(single['lengths'], pooled['lengths'])
+
+    def test2000_900_ShouldAcceptTooFewBins(self):
+        self.assertEqual((0.0, 0, 1.0), scramblebench.compareHistograms([3, 0], [2, 0]))
@@ -0,0 +1,189 @@
+'''
+    Scramble generation for op=scramble
+
+    transition: a sequence of n quarter turns drawn at random, never
+    turning the same face twice in a row and never turning two opposite
+    faces in both orders (f b is allowed, b f is not, so f b f cannot
+    occur either).  Every sequence is therefore free of moves that
+    cancel or merge, and each choice is one lookup in a table of the
+    turns allowed after the last one.
+
+    random: a cube drawn uniformly from every reachable cube, returned
+    as the moves that turn a solved cube into it (the two-phase
+    solver's solution, inverted).  This costs one solve per scramble:
+    the first solution found is taken, and phase 2 is cut off at
+    RANDOM_PHASE2 moves, which shortens the slowest searches, but in
+    pure Python that is still on the order of ten scrambles a second
+    per core, not thousands; op=scramble therefore defaults to
+    transition.
+
+    Both take an rng with the interface of the random module, which is
+    the default.  For reproducible scrambles, CounterRandom(seed, index)
+    is the stream of scramble number index under seed: it is computed
+    from the pair alone, so any scramble can be regenerated without
+    the ones before it and workers can each take a disjoint slice of
+    the indexes (see shard).
+
+    randomness scores how far a cube is from solved by the share of
+    facelet pairs on one face that show the same color: 100 for a
+    solved cube, around 16 for a well mixed one.
+'''
+
+import hashlib
+import random
+
+import RCube.solver as solver
+from RCube.cubies import parity
+
+
+METHODS = ('transition', 'random')
+
+#  quarter turn number (face * 2 + direction) -> notation
+QUARTER_TURNS = tuple(name for face in solver.FACES for name in (face, face.upper()))
+
+#  _NEXT[last face] -> quarter turns allowed next, as (turn, face)
+_NEXT = tuple(tuple((turn, turn // 2) for turn in range(12) if not solver.SKIP[last][turn // 2])
+              for last in range(solver.NO_FACE + 1))
+
+
+#  pairs among the nine facelets of each of the six faces
+PAIRS = 6 * 36
+
+#  phase 2 depth the random method searches each phase 1 solution to;
+#  a lower cap moves on sooner to the next phase 1 solution
+RANDOM_PHASE2 = 14
+
+
+class CounterRandom(random.Random):
+    '''Random numbers for scramble index under seed (both integers 0 ..
+    2**64 - 1).  Block j of the stream is the BLAKE2b hash, keyed by the
+    seed, of (index, j); nothing is carried from one index to the next.'''
+
+    def __init__(self, seed, index=0):
+        self._key = seed.to_bytes(8, 'little')
+        self._index = index.to_bytes(8, 'little')
+        self._block = 0
+        self._bits = 0
+        self._available = 0
+        super(CounterRandom, self).__init__()
+
+    def seed(self, *args, **kwargs):
+        #  the stream is fixed by (seed, index); random.Random.__init__
+        #  calls this once and nothing else may reseed it
+        self.gauss_next = None
+
+    def _next(self):
+        digest = hashlib.blake2b(self._index + self._block.to_bytes(8, 'little'),
+                                 key=self._key).digest()
+        self._block += 1
+        return int.from_bytes(digest, 'little')
+
+    def getrandbits(self, k):
+        if (k > self._available):
+            self._bits |= self._next() << self._available
+            self._available += 512
+            if (k > self._available):
+                return self.getrandbits(k)
+        value = self._bits & ((1 << k) - 1)
+        self._bits >>= k
+        self._available -= k
+        return value
+
+    def random(self):
+        return self.getrandbits(53) * (2.0 ** -53)
+
+    def getstate(self):
+        return (self._key, self._index, self._block, self._bits, self._available)
+
+    def setstate(self, state):
+        self._key, self._index, self._block, self._bits, self._available = state
+
+
+def isSeed(text):
+    '''True if text is a valid seed or index: decimal digits for a
+    number below 2**64.'''
+    return text.isdecimal() and int(text) < 1 << 64
+
+
+def shard(count, shards, number):
+    '''Indexes of shard number (0 .. shards - 1) when count scrambles are
+    split into shards contiguous, disjoint slices of nearly equal size.'''
+    return range(count * number // shards, count * (number + 1) // shards)
+
+
+def seededScramble(seed, index, n, method='transition'):
+    '''Scramble number index under seed; the same arguments always give
+    the same scramble.'''
+    return scramble(n, method, CounterRandom(seed, index))
+
+
+def transitionTurns(n, rng=random):
+    '''A transition scramble as quarter turn numbers (QUARTER_TURNS).'''
+    choice = rng.choice
+    turns = []
+    last = solver.NO_FACE
+    for _ in range(n):
+        turn, last = choice(_NEXT[last])
+        turns.append(turn)
+    return turns
+
+
+def transitionScramble(n, rng=random):
+    '''n quarter turns without cancelling or redundant neighbours, as a
+    list such as ['f', 'T', 'r'].'''
+    names = QUARTER_TURNS
+    return [names[turn] for turn in transitionTurns(n, rng)]
+
+
+def randomCubies(rng=random):
+    '''A reachable cube in cubie form, drawn uniformly.'''
+    cornerPerm = list(range(8))
+    edgePerm = list(range(12))
+    rng.shuffle(cornerPerm)
+    rng.shuffle(edgePerm)
+    if (parity(cornerPerm) != parity(edgePerm)):
+        #  a fixed swap pairs each odd arrangement with one even one,
+        #  so every reachable arrangement stays equally likely
+        edgePerm[10], edgePerm[11] = edgePerm[11], edgePerm[10]
+    cornerTwist = [rng.randrange(3) for _ in range(7)]
+    cornerTwist.append(-sum(cornerTwist) % 3)
+    edgeFlip = [rng.randrange(2) for _ in range(11)]
+    edgeFlip.append(sum(edgeFlip) % 2)
+    return cornerPerm, cornerTwist, edgePerm, edgeFlip
+
+
+def inverse(moves):
+    '''The moves that undo a list of quarter turns.'''
+    return [move.swapcase() for move in reversed(moves)]
+
+
+def randomStateScramble(rng=random):
+    '''Quarter turns that take a solved cube to a uniformly drawn
+    reachable cube, as a list.'''
+    cubies = randomCubies(rng)
+    moves = solver.solveMoves(cubies, RANDOM_PHASE2)
+    if (moves is None):
+        moves = solver.solveMoves(cubies)
+    return inverse(solver.notation(moves))
+
+
+def scramble(n, method='transition', rng=random):
+    '''A scramble by the named method; random ignores n.'''
+    if (method == 'transition'):
+        return transitionScramble(n, rng)
+    if (method == 'random'):
+        return randomStateScramble(rng)
+    raise ValueError('unknown scramble method: ' + str(method))
+
+
+def randomness(state):
+    '''Percentage, rounded, of same-colored facelet pairs within faces
+    of a 54-byte state.  Each face contributes c * (c - 1) / 2 pairs for
+    every color it shows c times.'''
+    pairs = 0
+    for start in range(0, 54, 9):
+        face = state[start:start + 9]
+        for color in state[4::9]:
+            count = face.count(color)
+            pairs += count * (count - 1) // 2
+    return round(pairs * 100 / PAIRS)
@@ -0,0 +1,135 @@
+import random
+import unittest
+import RCube.dispatch as RCube
+import RCube.scrambler as scrambler
+from RCube.cubestate import SOLVED_FACES, rotateState
+from RCube.cubies import fromCubies, isReachable
+
+
+OPPOSITE = {'f': 'b', 'b': 'f', 'r': 'l', 'l': 'r', 't': 'u', 'u': 't'}
+
+
+class ScramblerTest(unittest.TestCase):
+# Unit Tests
+#
+# 1900 scrambler -- transition and random-state scrambles, randomness, op=scramble
+# Desired level of confidence: boundary value analysis
+# Analysis
+#    inputs:  n       number of quarter turns, 0 .. 99
+#             method  transition or random
+#             rng     source of randomness
+#    outputs: list of quarter turns
+#
+# Happy path
+#    a transition scramble has n turns, never the same face twice in a
+#    row and never an opposite pair in both orders
+#    the same seed gives the same scramble
+#    a random cube is reachable
+#    a random-state scramble turns a solved cube into the drawn cube
+#    op=scramble answers the rotations for both methods
+#    a solved cube scores 100, one quarter turn less
+#    (seed, index) always gives the same scramble, through dispatch too,
+#    and scramble #k does not depend on the ones before it
+#    shards of an index range are disjoint and cover it
+#
+# Sad path
+#    a zero-length transition scramble is empty
+#    an unknown method is an error
+#    a seed or index that is not a number below 2**64 is an error
+
+    def test1900_010_ShouldAvoidRedundantNeighbours(self):
+        rng = random.Random(7)
+        for n in (1, 2, 25, 99):
+            moves = scrambler.transitionScramble(n, rng)
+            self.assertEqual(n, len(moves))
+            faces = [move.lower() for move in moves]
+            for first, second, third in zip(faces, faces[1:], faces[2:] + [None]):
+                self.assertNotEqual(first, second)
+                if (second == OPPOSITE[first]):
+                    self.assertLess('frbltu'.index(first), 'frbltu'.index(second))
+                    self.assertNotEqual(first, third)
+
+    def test1900_020_ShouldRepeatWithSameSeed(self):
+        self.assertEqual(scrambler.transitionScramble(30, random.Random(3)),
+                         scrambler.transitionScramble(30, random.Random(3)))
+
+    def test1900_030_ShouldDrawReachableCubes(self):
+        rng = random.Random(11)
+        for _ in range(200):
+            self.assertTrue(isReachable(fromCubies(*scrambler.randomCubies(rng))))
+
+    def test1900_040_ShouldGenerateDrawnCube(self):
+        rng = random.Random(5)
+        target = fromCubies(*scrambler.randomCubies(random.Random(5)))
+        moves = scrambler.randomStateScramble(rng)
+        self.assertEqual(target, rotateState(SOLVED_FACES, ''.join(moves)))
+
+    def test1900_045_ShouldSearchPastPhase2Cap(self):
+        #  with no phase 2 allowed the capped search fails and the full
+        #  one is used
+        saved = scrambler.RANDOM_PHASE2
+        scrambler.RANDOM_PHASE2 = 0
+        try:
+            target = fromCubies(*scrambler.randomCubies(random.Random(9)))
+            moves = scrambler.randomStateScramble(random.Random(9))
+        finally:
+            scrambler.RANDOM_PHASE2 = saved
+        self.assertEqual(target, rotateState(SOLVED_FACES, ''.join(moves)))
+
+    def test1900_050_ShouldScoreRandomness(self):
+        self.assertEqual(100, scrambler.randomness(SOLVED_FACES))
+        #  a quarter turn leaves f and b whole and splits each of the
+        #  other four 6 + 3: 36 * 2 + 4 * (15 + 3) = 144 of 216 pairs
+        self.assertEqual(67, scrambler.randomness(rotateState(SOLVED_FACES, 'f')))
+
+    def test1900_060_ShouldRepeatSeededScramble(self):
+        first = [scrambler.seededScramble(42, index, 25) for index in range(20)]
+        self.assertEqual(first[13], scrambler.seededScramble(42, 13, 25))
+        self.assertEqual(first, [scrambler.seededScramble(42, index, 25) for index in range(20)])
+        self.assertEqual(20, len(set(map(tuple, first))))
+        self.assertNotEqual(first[0], scrambler.seededScramble(43, 0, 25))
+        self.assertEqual(scrambler.seededScramble(7, 3, 0, 'random'),
+                         scrambler.seededScramble(7, 3, 0, 'random'))
+
+    def test1900_070_ShouldSplitIntoDisjointShards(self):
+        shards = [scrambler.shard(1003, 4, number) for number in range(4)]
+        self.assertEqual(list(range(1003)), [index for part in shards for index in part])
+        self.assertTrue(max(map(len, shards)) - min(map(len, shards)) <= 1)
+
+    def test1900_080_ShouldDrawUniformBits(self):
+        rng = scrambler.CounterRandom(1, 2)
+        counts = [0] * 6
+        for _ in range(6000):
+            counts[rng.randrange(6)] += 1
+        self.assertTrue(all(800 < count < 1200 for count in counts))
+        self.assertTrue(0 <= rng.random() < 1)
+
+    def test1900_100_ShouldScrambleThroughDispatch(self):
+        for method in scrambler.METHODS:
+            result = RCube.dispatch({'op': 'scramble', 'n': '20', 'method': method})
+            score = int(result['status'].split()[1])
+            self.assertEqual(scrambler.randomness(rotateState(SOLVED_FACES, ''.join(result['rotations']))),
+                             score)
+            self.assertTrue(result['rotations'])
+        for parm in ({'op': 'scramble', 'n': '20', 'method': 'transition'}, {'op': 'scramble', 'n': '20'}):
+            self.assertEqual(20, len(RCube.dispatch(parm)['rotations']))
+
+    def test1900_110_ShouldRepeatSeededScrambleThroughDispatch(self):
+        parm = {'op': 'scramble', 'n': '30', 'method': 'transition', 'seed': '5', 'index': '8'}
+        result = RCube.dispatch(parm)
+        self.assertEqual(result, RCube.dispatch(dict(parm)))
+        self.assertEqual(scrambler.seededScramble(5, 8, 30), result['rotations'])
+
+    def test1900_900_ShouldGiveEmptyScrambleForZero(self):
+        self.assertEqual([], scrambler.transitionScramble(0))
+
+    def test1900_910_ShouldRejectUnknownMethod(self):
+        self.assertRaises(ValueError, scrambler.scramble, 5, 'init')
+        result = RCube.dispatch({'op': 'scramble', 'n': '5', 'method': 'init'})
+        self.assertEqual('error:', result['status'])
+
+    def test1900_920_ShouldRejectBadSeed(self):
+        for seed, index in (('x', '0'), ('-1', '0'), (str(1 << 64), '0'), ('1', 'two'),
+                            ('\u00b2', '0'), ('1', '\u00b9')):
+            result = RCube.dispatch({'op': 'scramble', 'n': '5', 'seed': seed, 'index': index})
+            self.assertEqual('error:', result['status'])
@@ -0,0 +1,209 @@
+'''
+    Persistent cache of solutions, shared by symmetric cubes
+
+    A cube and its 47 rotated and mirrored copies need the same number
+    of moves, and a solution of one maps onto each of the others move
+    by move.  Solutions are therefore stored once per symmetry class,
+    keyed by the class's canonical representative, and mapped back
+    through the symmetry on a hit.
+
+    The cache is an SQLite file (RCUBE_SOLUTION_CACHE, by default
+    rcube-solutions.db next to this module) holding at most
+    RCUBE_SOLUTION_ENTRIES solutions (0 disables the cache); the least
+    recently used solutions are evicted first.  Several processes may
+    share one file: the use stamps are drawn from the file, not from a
+    clock of each process, so every process evicts in the same order.
+    The entry count and the hit, miss and eviction counters are kept in
+    the file too, so stats covers every process using it, whichever
+    process asks.
+
+    A lookup only reads the file.  Its bookkeeping (the hit's use stamp
+    and the hit and miss counts) is held in the process and written in
+    one transaction with the next put or stats call, or after
+    FLUSH_LOOKUPS lookups, so processes sharing the file seldom wait
+    for its write lock.  A process that exits loses at most that many
+    lookups' bookkeeping.
+'''
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import RCube.optimal as optimal
+import RCube.solver as solver
+import RCube.symmetry as symmetry
+
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS solutions (
+        kind TEXT NOT NULL,
+        state BLOB NOT NULL,
+        moves TEXT NOT NULL,
+        used INTEGER NOT NULL,
+        PRIMARY KEY (kind, state));
+    CREATE INDEX IF NOT EXISTS solutionsUsed ON solutions (used);
+    CREATE TABLE IF NOT EXISTS counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL);
+    INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+    INSERT OR IGNORE INTO counters SELECT 'entries', COUNT(*) FROM solutions;
+    CREATE TRIGGER IF NOT EXISTS solutionsInserted AFTER INSERT ON solutions BEGIN
+        UPDATE counters SET value = value + 1 WHERE name = 'entries';
+    END;
+    CREATE TRIGGER IF NOT EXISTS solutionsDeleted AFTER DELETE ON solutions BEGIN
+        UPDATE counters SET value = value - 1 WHERE name = 'entries';
+    END;
+'''
+
+#  the next use stamp, one above the newest in the file
+_NEXT_USED = '(SELECT COALESCE(MAX(used), 0) + 1 FROM solutions)'
+
+FLUSH_LOOKUPS = 64
+
+
+class SolutionCache(object):
+    '''Thread-safe LRU store of move strings keyed by (kind, canonical state).'''
+
+    def __init__(self, path, maxEntries):
+        self.path = path
+        self.maxEntries = maxEntries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=10, isolation_level=None,
+                                   check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript('BEGIN IMMEDIATE;' + _SCHEMA + 'COMMIT;')
+        #  lookups not yet written: (kind, state) of each hit, oldest
+        #  use first, and the hit and miss counts
+        self._used = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def _flush(self):
+        #  write the pending lookups; called holding the lock, inside a
+        #  transaction
+        if (self._used):
+            self._db.executemany('UPDATE solutions SET used = ' + _NEXT_USED +
+                                 ' WHERE kind = ? AND state = ?', self._used)
+            self._used.clear()
+        for name, amount in (('hits', self._hits), ('misses', self._misses)):
+            if (amount):
+                self._db.execute('UPDATE counters SET value = value + ? WHERE name = ?', (amount, name))
+        self._hits = self._misses = 0
+
+    def _write(self, statements):
+        #  statements(db) and the pending lookups in one transaction
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            self._flush()
+            result = statements(self._db)
+        except BaseException:
+            self._db.execute('ROLLBACK')
+            raise
+        self._db.execute('COMMIT')
+        return result
+
+    def get(self, kind, state):
+        '''Stored moves for a canonical state, or None.'''
+        with self._lock:
+            row = self._db.execute('SELECT moves FROM solutions WHERE kind = ? AND state = ?',
+                                   (kind, state)).fetchone()
+            if (row is None):
+                self._misses += 1
+            else:
+                self._used.pop((kind, state), None)
+                self._used[(kind, state)] = True
+                self._hits += 1
+            if (len(self._used) + self._misses >= FLUSH_LOOKUPS):
+                self._write(lambda db: None)
+            return None if row is None else row[0]
+
+    def put(self, kind, state, moves):
+        def insert(db):
+            db.execute('INSERT INTO solutions VALUES (?, ?, ?, ' + _NEXT_USED + ') '
+                       'ON CONFLICT (kind, state) DO UPDATE SET moves = excluded.moves, used = excluded.used',
+                       (kind, state, moves))
+            excess = db.execute("SELECT value FROM counters WHERE name = 'entries'").fetchone()[0] - self.maxEntries
+            if (excess > 0):
+                db.execute('DELETE FROM solutions WHERE rowid IN '
+                           '(SELECT rowid FROM solutions ORDER BY used LIMIT ?)', (excess,))
+                db.execute("UPDATE counters SET value = value + ? WHERE name = 'evictions'", (excess,))
+
+        with self._lock:
+            self._used.pop((kind, state), None)
+            self._write(insert)
+
+    def clear(self):
+        with self._lock:
+            self._used.clear()
+            self._write(lambda db: db.execute('DELETE FROM solutions'))
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._write(lambda db: db.execute('SELECT name, value FROM counters').fetchall()))
+        stats['maxEntries'] = self.maxEntries
+        return stats
+
+
+def lookup(cache, kind, state):
+    '''Cached moves for a face-index state as a list, or None.'''
+    representative, which = symmetry.canonicalSymmetry(state)
+    moves = cache.get(kind, representative)
+    if (moves is None):
+        return None
+    return symmetry.unmapMoves(moves, which)
+
+
+def store(cache, kind, state, moves):
+    '''Remember moves (a list) that solve a face-index state.'''
+    representative, which = symmetry.canonicalSymmetry(state)
+    cache.put(kind, representative, ''.join(symmetry.mapMoves(moves, which)))
+
+
+CACHE_FILE = os.environ.get('RCUBE_SOLUTION_CACHE',
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                         'rcube-solutions.db'))
+MAX_ENTRIES = int(os.environ.get('RCUBE_SOLUTION_ENTRIES', '100000'))
+
+_cache = None
+_cacheLock = threading.Lock()
+
+
+def getCache():
+    '''The process's solution cache, opened on first use; None if disabled.'''
+    global _cache
+    if (MAX_ENTRIES <= 0):
+        return None
+    if (_cache is None):
+        with _cacheLock:
+            if (_cache is None):
+                _cache = SolutionCache(CACHE_FILE, MAX_ENTRIES)
+    return _cache
+
+
+def solve(state):
+    '''solver.solve through the cache.'''
+    cache = getCache()
+    if (cache is not None):
+        moves = lookup(cache, 'two-phase', state)
+        if (moves is not None):
+            return moves
+    moves = solver.solve(state)
+    if (cache is not None and moves is not None):
+        store(cache, 'two-phase', state, moves)
+    return moves
+
+
+def solveOptimal(state):
+    '''optimal.solve through the cache.  Only solutions known to be
+    optimal are stored.'''
+    cache = getCache()
+    if (cache is not None):
+        moves = lookup(cache, 'optimal', state)
+        if (moves is not None):
+            return moves, True
+    moves, isOptimal = optimal.solve(state)
+    if (cache is not None and isOptimal):
+        store(cache, 'optimal', state, moves)
+    return moves, isOptimal
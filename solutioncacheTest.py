@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import unittest
+import RCube.solutioncache as solutioncache
+import RCube.symmetry as symmetry
+from RCube.cubestate import SOLVED_FACES, rotateState
+
+
+class SolutionCacheTest(unittest.TestCase):
+# Unit Tests
+#
+# 1800 solutioncache -- SolutionCache, solve, solveOptimal
+# Analysis
+#    inputs:  state       54-byte face-index state
+#             maxEntries  size limit of the cache
+#    outputs: moves that solve the state; hit, miss and eviction counts
+#
+# Happy path
+#    solving a cube twice is a hit the second time
+#    a rotated or mirrored copy of a solved-before cube is a hit, and the
+#    mapped-back moves solve the copy
+#    solutions survive closing and reopening the cache file
+#    least recently used solution is evicted first when the cache is full
+#    processes sharing a file evict in one order, whichever opened it
+#    first
+#    a lookup's bookkeeping is written with the next put or stats
+#
+# Sad path
+#    optimal answers that ran out of budget are not stored
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'solutions.db')
+        self.saved = solutioncache._cache
+        solutioncache._cache = solutioncache.SolutionCache(self.path, 100)
+        self.state = rotateState(SOLVED_FACES, 'fRbbLtUrF')
+
+    def tearDown(self):
+        solutioncache._cache = self.saved
+        shutil.rmtree(self.directory)
+
+    def test1800_010_ShouldHitOnRepeatedSolve(self):
+        first = solutioncache.solve(self.state)
+        second = solutioncache.solve(self.state)
+        self.assertEqual(first, second)
+        stats = solutioncache.getCache().stats()
+        self.assertEqual((1, 1, 1), (stats['hits'], stats['misses'], stats['entries']))
+
+    def test1800_020_ShouldHitOnSymmetricCopy(self):
+        solutioncache.solve(self.state)
+        for which in (5, 24, 47):
+            copy = symmetry.transform(self.state, which)
+            moves = solutioncache.solve(copy)
+            self.assertEqual(SOLVED_FACES, rotateState(copy, ''.join(moves)))
+        self.assertEqual(3, solutioncache.getCache().stats()['hits'])
+
+    def test1800_030_ShouldPersist(self):
+        moves = solutioncache.solve(self.state)
+        reopened = solutioncache.SolutionCache(self.path, 100)
+        self.assertEqual(moves, solutioncache.lookup(reopened, 'two-phase', self.state))
+
+    def test1800_040_ShouldEvictLeastRecentlyUsed(self):
+        cache = solutioncache.SolutionCache(os.path.join(self.directory, 'small.db'), 2)
+        states = [rotateState(SOLVED_FACES, moves) for moves in ('f', 'fr', 'frb')]
+        solutioncache.store(cache, 'two-phase', states[0], ['F'])
+        solutioncache.store(cache, 'two-phase', states[1], ['R', 'F'])
+        solutioncache.lookup(cache, 'two-phase', states[0])
+        solutioncache.store(cache, 'two-phase', states[2], ['B', 'R', 'F'])
+        self.assertEqual(['F'], solutioncache.lookup(cache, 'two-phase', states[0]))
+        self.assertEqual(None, solutioncache.lookup(cache, 'two-phase', states[1]))
+        self.assertEqual(1, cache.stats()['evictions'])
+
+    def test1800_050_ShouldShareUseOrder(self):
+        path = os.path.join(self.directory, 'shared.db')
+        first = solutioncache.SolutionCache(path, 2)
+        second = solutioncache.SolutionCache(path, 2)
+        states = [rotateState(SOLVED_FACES, moves) for moves in ('f', 'fr', 'frb', 'frbl')]
+        for state in states[:3]:
+            solutioncache.store(second, 'two-phase', state, ['F'])
+        solutioncache.lookup(first, 'two-phase', states[2])
+        first.stats()
+        solutioncache.store(second, 'two-phase', states[3], ['F'])
+        self.assertEqual(['F'], solutioncache.lookup(second, 'two-phase', states[2]))
+        self.assertEqual(None, solutioncache.lookup(second, 'two-phase', states[1]))
+
+    def test1800_060_ShouldBatchLookupBookkeeping(self):
+        path = os.path.join(self.directory, 'shared.db')
+        first = solutioncache.SolutionCache(path, 10)
+        second = solutioncache.SolutionCache(path, 10)
+        solutioncache.store(first, 'two-phase', self.state, ['F'])
+        solutioncache.lookup(first, 'two-phase', self.state)
+        self.assertEqual((0, 1), (second.stats()['hits'], second.stats()['entries']))
+        self.assertEqual(1, first.stats()['hits'])
+        self.assertEqual(1, second.stats()['hits'])
+
+    def test1800_900_ShouldNotStoreUnprovenOptimal(self):
+        saved = solutioncache.optimal.NODE_BUDGET
+        solutioncache.optimal.NODE_BUDGET = 1
+        try:
+            moves, isOptimal = solutioncache.solveOptimal(rotateState(SOLVED_FACES, 'fRbUltFrrBuL'))
+        finally:
+            solutioncache.optimal.NODE_BUDGET = saved
+        self.assertFalse(isOptimal)
+        self.assertEqual(0, solutioncache.getCache().stats()['entries'])
@@ -0,0 +1,468 @@
+'''
+    Two-phase solver
+
+    Phase 1 turns the cube into the subgroup generated by t, u, ff, rr,
+    bb and ll: every corner twist and edge flip is zero and the four
+    middle-layer edges sit in the middle layer.  Phase 2 solves the
+    cube using only those moves.  Each phase is an iterative-deepening
+    search over small integer coordinates, driven by precomputed move
+    tables and pruned by tables of exact distances over pairs of
+    coordinates.
+
+    Moves are numbered face * 3 + power for the faces f r b l t u and
+    powers clockwise, half turn, counterclockwise.  Solutions are
+    returned in the service's quarter-turn notation: a half turn is
+    the quarter turn written twice.
+
+    The tables are kept in a table file (RCUBE_TABLES, by default
+    rcube.tables next to this module) and mapped with mmap on first
+    use.  If the file is missing it is built, across a process pool,
+    and written; "python -m RCube.solver" builds it ahead of time, and
+    with --if-missing keeps a file that is already up to date.
+'''
+
+import argparse
+import os
+import sys
+import threading
+from array import array
+from itertools import combinations, permutations
+
+from RCube.cubies import toCubies
+from RCube.cubestate import SOLVED_FACES, rotateState
+import RCube.tablefile as tablefile
+
+
+FACES = 'frbltu'
+
+#  move index -> quarter-turn notation
+MOVE_NAMES = tuple(name for face in FACES
+                   for name in (face, face + face, face.upper()))
+
+#  moves that keep a cube inside the phase 2 subgroup
+PHASE2_MOVES = tuple(move for move in range(18)
+                     if FACES[move // 3] in 'tu' or move % 3 == 1)
+
+#  SKIP[last][face] is True when a turn of face must not follow a turn
+#  of last: the same face again, or the opposite face when that comes
+#  first in FACES (so f b is searched, b f is not).  last is NO_FACE at
+#  the start of a search.
+NO_FACE = 6
+_OPPOSITE = (2, 3, 0, 1, 5, 4, None)
+SKIP = tuple(tuple(face == last or (face == _OPPOSITE[last] and face < last)
+                   for face in range(6))
+             for last in range(7))
+
+N_TWIST = 2187          # 3^7 corner twists
+N_FLIP = 2048           # 2^11 edge flips
+N_SLICE = 495           # C(12, 4) places for the middle-layer edges
+N_CORNER = 40320        # 8! corner permutations
+N_EDGE8 = 40320         # 8! top and under layer edge permutations
+N_SLICE_PERM = 24       # 4! middle-layer edge permutations
+
+#  edge positions of the middle layer, and of the top and under layers
+SLICE_EDGES = (4, 5, 6, 7)
+LAYER_EDGES = (0, 1, 2, 3, 8, 9, 10, 11)
+
+#  no cube needs more than 12 moves in phase 1, or 18 in phase 2
+MAX_PHASE1 = 12
+MAX_PHASE2 = 18
+
+
+def _baseMoves():
+    #  cubie form of the six clockwise quarter turns, read off the
+    #  facelet engine
+    return [toCubies(rotateState(SOLVED_FACES, face)) for face in FACES]
+
+
+#  ----------------------------------------------------------------------
+#  coordinates: each names one aspect of the cubie form with a small
+#  integer, and the *From functions build a cubie vector with that value
+
+#  permutations of 8 and of 4 things in lexicographic order, so that a
+#  permutation's position in the list is its rank
+_PERMS8 = list(permutations(range(8)))
+_RANK8 = dict((perm, rank) for rank, perm in enumerate(_PERMS8))
+_PERMS4 = list(permutations(range(4)))
+_RANK4 = dict((perm, rank) for rank, perm in enumerate(_PERMS4))
+
+
+def twistCoord(twist):
+    coord = 0
+    for value in twist[:7]:
+        coord = coord * 3 + value
+    return coord
+
+
+def _twistFrom(coord):
+    twist = [0] * 8
+    for i in range(6, -1, -1):
+        coord, twist[i] = divmod(coord, 3)
+    twist[7] = -sum(twist) % 3
+    return twist
+
+
+def flipCoord(flip):
+    coord = 0
+    for value in flip[:11]:
+        coord = coord * 2 + value
+    return coord
+
+
+def _flipFrom(coord):
+    flip = [0] * 12
+    for i in range(10, -1, -1):
+        coord, flip[i] = divmod(coord, 2)
+    flip[11] = sum(flip) % 2
+    return flip
+
+
+_SLICE_PLACES = list(combinations(range(12), 4))
+_SLICE_INDEX = dict((places, coord) for coord, places in enumerate(_SLICE_PLACES))
+
+
+def sliceCoord(edgePerm):
+    return _SLICE_INDEX[tuple(position for position in range(12)
+                              if edgePerm[position] in SLICE_EDGES)]
+
+
+def _sliceFrom(coord):
+    #  an edge permutation with the middle-layer edges in the given places
+    places = _SLICE_PLACES[coord]
+    layer = iter(LAYER_EDGES)
+    middle = iter(SLICE_EDGES)
+    return [next(middle) if position in places else next(layer) for position in range(12)]
+
+
+def cornerCoord(cornerPerm):
+    return _RANK8[tuple(cornerPerm)]
+
+
+def edge8Coord(edgePerm):
+    return _RANK8[tuple(LAYER_EDGES.index(edgePerm[position]) for position in LAYER_EDGES)]
+
+
+def _edge8From(coord):
+    edgePerm = list(range(12))
+    for position, edge in zip(LAYER_EDGES, _PERMS8[coord]):
+        edgePerm[position] = LAYER_EDGES[edge]
+    return edgePerm
+
+
+def slicePermCoord(edgePerm):
+    return _RANK4[tuple(edgePerm[position] - 4 for position in SLICE_EDGES)]
+
+
+def _slicePermFrom(coord):
+    edgePerm = list(range(12))
+    for position, edge in zip(SLICE_EDGES, _PERMS4[coord]):
+        edgePerm[position] = edge + 4
+    return edgePerm
+
+
+#  goal coordinates of phase 1
+SOLVED_SLICE = sliceCoord(list(range(12)))
+
+
+#  ----------------------------------------------------------------------
+#  tables
+
+def _moveTable(size, decode, turn, encode, moves):
+    #  table[coord * len(moves) + k] is the coordinate after moves[k]
+    width = len(moves)
+    column = dict((move, k) for k, move in enumerate(moves))
+    table = array('H', bytes(2 * size * width))
+    for coord in range(size):
+        base = coord * width
+        for face in range(6):
+            vector = decode(coord)
+            for move in range(face * 3, face * 3 + 3):
+                vector = turn(vector, face)
+                if (move in column):
+                    table[base + column[move]] = encode(vector)
+    return table
+
+
+def _pruneTable(sizeA, moveA, sizeB, moveB, width, start):
+    #  exact distance to start for every pair of coordinates, by a
+    #  breadth-first search over the pair's move tables.  Once most
+    #  pairs are reached it is cheaper to look back from the pairs
+    #  still unreached (the move set holds every move's inverse).
+    table = bytearray(b'\xff') * (sizeA * sizeB)
+    table[start] = 0
+    frontier = [start]
+    unreached = len(table) - 1
+    depth = 0
+    while frontier:
+        depth += 1
+        reached = []
+        if (len(frontier) < unreached):
+            for index in frontier:
+                a, b = divmod(index, sizeB)
+                a *= width
+                b *= width
+                for newA, newB in zip(moveA[a:a + width], moveB[b:b + width]):
+                    other = newA * sizeB + newB
+                    if (table[other] == 255):
+                        table[other] = depth
+                        reached.append(other)
+        else:
+            previous = depth - 1
+            for index in [index for index, distance in enumerate(table) if distance == 255]:
+                a, b = divmod(index, sizeB)
+                a *= width
+                b *= width
+                for newA, newB in zip(moveA[a:a + width], moveB[b:b + width]):
+                    if (table[newA * sizeB + newB] == previous):
+                        table[index] = depth
+                        reached.append(index)
+                        break
+        unreached -= len(reached)
+        frontier = reached
+    return table
+
+
+def _twistTurn(twist, face):
+    cornerPerm, cornerTwist = BASE_MOVES[face][0], BASE_MOVES[face][1]
+    return [(twist[cornerPerm[i]] + cornerTwist[i]) % 3 for i in range(8)]
+
+
+def _flipTurn(flip, face):
+    edgePerm, edgeFlip = BASE_MOVES[face][2], BASE_MOVES[face][3]
+    return [(flip[edgePerm[i]] + edgeFlip[i]) % 2 for i in range(12)]
+
+
+def _cornerTurn(perm, face):
+    cornerPerm = BASE_MOVES[face][0]
+    return [perm[cornerPerm[i]] for i in range(8)]
+
+
+def _edgeTurn(perm, face):
+    edgePerm = BASE_MOVES[face][2]
+    return [perm[edgePerm[i]] for i in range(12)]
+
+
+BASE_MOVES = _baseMoves()
+
+#  move tables: name -> (size, decode, turn, encode, moves)
+MOVE_TABLES = {
+    'twist': (N_TWIST, _twistFrom, _twistTurn, twistCoord, range(18)),
+    'flip': (N_FLIP, _flipFrom, _flipTurn, flipCoord, range(18)),
+    'slice': (N_SLICE, _sliceFrom, _edgeTurn, sliceCoord, range(18)),
+    'corner': (N_CORNER, _PERMS8.__getitem__, _cornerTurn, cornerCoord, PHASE2_MOVES),
+    'edge8': (N_EDGE8, _edge8From, _edgeTurn, edge8Coord, PHASE2_MOVES),
+    'slicePerm': (N_SLICE_PERM, _slicePermFrom, _edgeTurn, slicePermCoord, PHASE2_MOVES),
+}
+
+#  pruning tables: name -> (first move table, second move table, goal)
+PRUNE_TABLES = {
+    'twistSlice': ('twist', 'slice', SOLVED_SLICE),
+    'flipSlice': ('flip', 'slice', SOLVED_SLICE),
+    'cornerSlice': ('corner', 'slicePerm', 0),
+    'edgeSlice': ('edge8', 'slicePerm', 0),
+}
+
+#  bump whenever a coordinate or table above changes meaning
+TABLE_VERSION = 1
+
+TABLE_FILE = os.environ.get('RCUBE_TABLES',
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rcube.tables'))
+
+
+def _buildMoveTable(name):
+    return _moveTable(*MOVE_TABLES[name])
+
+
+def _buildPruneTable(name, moveA, moveB):
+    first, second, goal = PRUNE_TABLES[name]
+    width = len(MOVE_TABLES[first][4])
+    return _pruneTable(MOVE_TABLES[first][0], moveA, MOVE_TABLES[second][0], moveB, width, goal)
+
+
+def buildTables(processes=None):
+    '''Compute every table across a process pool: the move tables,
+    then the pruning tables searched over them.  Returns a dict of
+    name -> array.'''
+    tables = tablefile.buildAll([(name, _buildMoveTable, (name,)) for name in MOVE_TABLES],
+                                processes)
+    tables.update(tablefile.buildAll([(name, _buildPruneTable, (name, tables[first], tables[second]))
+                                      for name, (first, second, goal) in PRUNE_TABLES.items()],
+                                     processes))
+    return tables
+
+
+class Tables(object):
+    '''Move and pruning tables of both phases, as attributes named as
+    in MOVE_TABLES and PRUNE_TABLES.'''
+
+    def __init__(self, tables):
+        self.__dict__.update(tables)
+
+
+def loadTables(path=TABLE_FILE, processes=None):
+    '''Map the table file at path, first building and writing it if it
+    is missing or was written by another TABLE_VERSION.'''
+    return Tables(tablefile.loadOrBuild(path, TABLE_VERSION, lambda: buildTables(processes)))
+
+
+_tables = None
+_tablesLock = threading.Lock()
+
+
+def getTables():
+    '''The solver tables, loaded (or built) on first use.'''
+    global _tables
+    if (_tables is None):
+        with _tablesLock:
+            if (_tables is None):
+                _tables = loadTables()
+    return _tables
+
+
+#  ----------------------------------------------------------------------
+#  search
+
+#  (move, face) for each move a search may make after a turn of face
+#  last, and (column, move, face) for phase 2, where column is the
+#  move's column in the phase 2 move tables
+NEXT_MOVES = tuple(tuple((move, move // 3) for move in range(18)
+                           if not SKIP[last][move // 3])
+                     for last in range(7))
+_PHASE2_NEXT = tuple(tuple((column, move, move // 3) for column, move in enumerate(PHASE2_MOVES)
+                           if not SKIP[last][move // 3])
+                     for last in range(7))
+
+
+def _search(tables, cubies, maxPhase2=MAX_PHASE2):
+    #  returns the solution as a list of move numbers, or None if none
+    #  has at most MAX_PHASE1 + maxPhase2 moves
+    twistMove, flipMove, sliceMove = tables.twist, tables.flip, tables.slice
+    cornerMove, edgeMove, slicePermMove = tables.corner, tables.edge8, tables.slicePerm
+    twistSlice, flipSlice = tables.twistSlice, tables.flipSlice
+    cornerSlice, edgeSlice = tables.cornerSlice, tables.edgeSlice
+    width = len(PHASE2_MOVES)
+    base = BASE_MOVES
+    phase1 = []
+    phase2 = []
+
+    def searchPhase2(corner, edge8, slicePerm, depth, last):
+        #  phase2 collects the moves in reverse as the search unwinds
+        depth -= 1
+        cornerBase = corner * width
+        edgeBase = edge8 * width
+        sliceBase = slicePerm * width
+        for column, move, face in _PHASE2_NEXT[last]:
+            newSlice = slicePermMove[sliceBase + column]
+            newCorner = cornerMove[cornerBase + column]
+            if (cornerSlice[newCorner * N_SLICE_PERM + newSlice] > depth):
+                continue
+            newEdge = edgeMove[edgeBase + column]
+            if (edgeSlice[newEdge * N_SLICE_PERM + newSlice] > depth):
+                continue
+            if (depth == 0 or searchPhase2(newCorner, newEdge, newSlice, depth, face)):
+                phase2.append(move)
+                return True
+        return False
+
+    def startPhase2():
+        cornerPerm, edgePerm = cubies[0], cubies[2]
+        for move in phase1:
+            face = move // 3
+            turnCorners, turnEdges = base[face][0], base[face][2]
+            for _ in range(move % 3 + 1):
+                cornerPerm = [cornerPerm[i] for i in turnCorners]
+                edgePerm = [edgePerm[i] for i in turnEdges]
+        corner = cornerCoord(cornerPerm)
+        edge8 = edge8Coord(edgePerm)
+        slicePerm = slicePermCoord(edgePerm)
+        start = max(cornerSlice[corner * N_SLICE_PERM + slicePerm],
+                    edgeSlice[edge8 * N_SLICE_PERM + slicePerm])
+        if (start == 0):
+            return True
+        last = phase1[-1] // 3 if phase1 else NO_FACE
+        for depth in range(start, maxPhase2 + 1):
+            if (searchPhase2(corner, edge8, slicePerm, depth, last)):
+                phase2.reverse()
+                return True
+        return False
+
+    def searchPhase1(twist, flip, slice_, depth, last):
+        depth -= 1
+        twistBase = twist * 18
+        flipBase = flip * 18
+        sliceBase = slice_ * 18
+        for move, face in NEXT_MOVES[last]:
+            newSlice = sliceMove[sliceBase + move]
+            newTwist = twistMove[twistBase + move]
+            if (twistSlice[newTwist * N_SLICE + newSlice] > depth):
+                continue
+            newFlip = flipMove[flipBase + move]
+            if (flipSlice[newFlip * N_SLICE + newSlice] > depth):
+                continue
+            phase1.append(move)
+            if (depth == 0):
+                #  a phase 1 solution ending in a phase 2 move is a
+                #  longer copy of one already tried
+                if (move not in PHASE2_MOVES and startPhase2()):
+                    return True
+            elif (searchPhase1(newTwist, newFlip, newSlice, depth, face)):
+                return True
+            phase1.pop()
+        return False
+
+    twist = twistCoord(cubies[1])
+    flip = flipCoord(cubies[3])
+    slice_ = sliceCoord(cubies[2])
+    start = max(twistSlice[twist * N_SLICE + slice_], flipSlice[flip * N_SLICE + slice_])
+    if (start == 0):
+        #  already in phase 2; beyond maxPhase2 moves there is no answer
+        return phase2 if startPhase2() else None
+    for depth in range(start, MAX_PHASE1 + 1):
+        if (searchPhase1(twist, flip, slice_, depth, NO_FACE)):
+            return phase1 + phase2
+    return None
+
+
+def solveMoves(cubies, maxPhase2=MAX_PHASE2):
+    '''Move numbers that solve a cube given in cubie form, or None.  A
+    lower maxPhase2 gives up sooner on each phase 1 solution.'''
+    return _search(getTables(), cubies, maxPhase2)
+
+
+def notation(moves):
+    '''Quarter-turn notation of a list of move numbers, as a list.'''
+    return list(''.join(MOVE_NAMES[move] for move in moves))
+
+
+def solve(state):
+    '''Moves that solve a reachable face-index state, as a list such as
+    ['f', 'r', 'r', 'T'].  Returns None if no solution was found.'''
+    cubies = toCubies(state)
+    if (cubies is None):
+        return None
+    moves = solveMoves(cubies)
+    if (moves is None):
+        return None
+    return notation(moves)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m RCube.solver',
+                                     description='Build the rcube solver table file.')
+    parser.add_argument('path', nargs='?', default=TABLE_FILE,
+                        help='table file to write (default: %(default)s)')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--if-missing', action='store_true',
+                        help='keep the file if it is already there and up to date')
+    args = parser.parse_args(argv)
+
+    if (args.if_missing):
+        loadTables(args.path, args.processes)
+    else:
+        tablefile.write(args.path, TABLE_VERSION, buildTables(args.processes))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import RCube.dispatch as RCube
+import RCube.solver as solver
+import RCube.tablefile as tablefile
+from RCube.cubestate import SOLVED_FACES, getPalette, rotateState
+
+
+class SolverTest(unittest.TestCase):
+# Unit Tests
+#
+# 1500 solver -- coordinates, table file, solve, op=solve
+# Desired level of confidence: boundary value analysis
+# Analysis
+#    inputs:  state   54-byte face-index state of a reachable cube
+#             parm    op=solve with cube and optional f/r/b/l/t/u colors
+#    outputs: list of fFrRbBlLtTuU moves that solves the cube
+#
+# Happy path
+#    the solved cube has coordinates 0 (slice: SOLVED_SLICE)
+#    tables written to a table file map back read-only and unchanged
+#    python -m RCube.solver --if-missing keeps an up-to-date file
+#    every scrambled cube is solved by the returned moves
+#    a solved cube needs no moves
+#    op=solve answers status solved and the moves in rotations, in a
+#    custom palette too
+#
+# Sad path
+#    op=solve rejects a cube of the wrong length
+#    op=solve rejects an unreachable cube with the reason
+#    a search capped below the phase 2 moves a cube needs finds nothing
+
+    def setUp(self):
+        self.random = random.Random(3)
+        self.palette = getPalette()
+
+    def scramble(self, length=30):
+        return rotateState(SOLVED_FACES, ''.join(self.random.choice('fFrRbBlLtTuU')
+                                                 for _ in range(length)))
+
+    def test1500_010_ShouldHaveSolvedCoordinates(self):
+        cornerPerm, cornerTwist, edgePerm, edgeFlip = list(range(8)), [0] * 8, list(range(12)), [0] * 12
+        self.assertEqual(0, solver.twistCoord(cornerTwist))
+        self.assertEqual(0, solver.flipCoord(edgeFlip))
+        self.assertEqual(0, solver.cornerCoord(cornerPerm))
+        self.assertEqual(0, solver.edge8Coord(edgePerm))
+        self.assertEqual(0, solver.slicePermCoord(edgePerm))
+        self.assertEqual(solver.SOLVED_SLICE, solver.sliceCoord(edgePerm))
+
+    def test1500_020_ShouldMapTableFile(self):
+        tables = vars(solver.getTables())
+        path = os.path.join(tempfile.mkdtemp(), 'solver.tables')
+        try:
+            tablefile.write(path, solver.TABLE_VERSION, tables)
+            loaded = solver.loadTables(path)
+            for name in list(solver.MOVE_TABLES) + list(solver.PRUNE_TABLES):
+                self.assertEqual(bytes(tables[name]), bytes(getattr(loaded, name)))
+                self.assertTrue(getattr(loaded, name).readonly)
+        finally:
+            shutil.rmtree(os.path.dirname(path))
+
+    def test1500_030_ShouldKeepUpToDateTableFile(self):
+        path = os.path.join(tempfile.mkdtemp(), 'solver.tables')
+        try:
+            tablefile.write(path, solver.TABLE_VERSION, vars(solver.getTables()))
+            os.utime(path, (0, 0))
+            self.assertEqual(0, solver.main([path, '--if-missing']))
+            self.assertEqual(0, os.stat(path).st_mtime)
+        finally:
+            shutil.rmtree(os.path.dirname(path))
+
+    def test1500_100_ShouldSolveScrambledCubes(self):
+        for length in (1, 2, 5, 30, 30, 30):
+            state = self.scramble(length)
+            moves = solver.solve(state)
+            self.assertEqual(SOLVED_FACES, rotateState(state, ''.join(moves)))
+
+    def test1500_110_ShouldNeedNoMovesWhenSolved(self):
+        self.assertEqual([], solver.solve(SOLVED_FACES))
+
+    def test1500_120_ShouldSolveThroughDispatch(self):
+        state = self.scramble()
+        result = RCube.dispatch({'op': 'solve', 'cube': ','.join(self.palette.decode(state))})
+        self.assertEqual('solved', result['status'])
+        self.assertEqual(SOLVED_FACES, rotateState(state, ''.join(result['rotations'])))
+
+    def test1500_130_ShouldSolveInCustomPalette(self):
+        palette = getPalette(('1', '2', '3', '4', '5', '6'))
+        state = self.scramble()
+        parm = {'op': 'solve', 'cube': ','.join(palette.decode(state)),
+                'f': '1', 'r': '2', 'b': '3', 'l': '4', 't': '5', 'u': '6'}
+        result = RCube.dispatch(parm)
+        self.assertEqual(SOLVED_FACES, rotateState(state, ''.join(result['rotations'])))
+
+    def test1500_900_ShouldRejectWrongLength(self):
+        cubelist = self.palette.decode(self.scramble())[:53]
+        result = RCube.dispatch({'op': 'solve', 'cube': ','.join(cubelist)})
+        self.assertEqual('error:', result['status'])
+
+    def test1500_910_ShouldRejectTwistedCorner(self):
+        cubelist = self.palette.decode(SOLVED_FACES)
+        cubelist[44], cubelist[2], cubelist[9] = cubelist[9], cubelist[44], cubelist[2]
+        result = RCube.dispatch({'op': 'solve', 'cube': ','.join(cubelist)})
+        self.assertEqual('error: twisted corner', result['status'])
+
+    def test1500_920_ShouldFailBeyondPhase2Cap(self):
+        #  two half turns leave the cube in phase 2, two moves from solved
+        cubies = solver.toCubies(rotateState(SOLVED_FACES, 'ffrr'))
+        self.assertIsNone(solver.solveMoves(cubies, 1))
+        self.assertEqual(2, len(solver.solveMoves(cubies, 2)))
@@ -0,0 +1,154 @@
+'''
+    Whole-cube orientations of the 54-facelet layout
+
+    Each facelet is given a position in space (doubled so that every
+    coordinate is an integer: the face plane sits at +-3, the rows and
+    columns at -2, 0, 2).  A whole-cube rotation moves facelets to other
+    facelet positions, so each of the 24 orientations is a 54-entry
+    gather permutation just like a move in rotation.MOVES.  With the
+    reflection between the left and right faces they make up the 48
+    symmetries of the cube.
+'''
+
+from operator import itemgetter
+
+from RCube.rotation import MOVES, compose, invert
+
+
+def _position(facelet):
+    face, cell = divmod(facelet, 9)
+    row, column = divmod(cell, 3)
+    across, up = 2 * (column - 1), 2 * (1 - row)
+    if (face == 0):                                  # front, z = +3
+        return (across, up, 3)
+    if (face == 1):                                  # right, x = +3
+        return (3, up, -across)
+    if (face == 2):                                  # back, z = -3
+        return (-across, up, -3)
+    if (face == 3):                                  # left, x = -3
+        return (-3, up, across)
+    if (face == 4):                                  # top, y = +3
+        return (across, 3, 2 * (row - 1))
+    return (across, -3, 2 * (1 - row))               # under, y = -3
+
+
+#  facelet index -> (x, y, z); x right, y up, z towards the viewer
+POSITIONS = tuple(_position(facelet) for facelet in range(54))
+
+_FACELET_AT = dict((position, facelet) for facelet, position in enumerate(POSITIONS))
+
+
+def _gather(transform):
+    #  gather permutation moving the facelet at p to transform(p)
+    perm = [0] * 54
+    for facelet, position in enumerate(POSITIONS):
+        perm[_FACELET_AT[transform(position)]] = facelet
+    return tuple(perm)
+
+
+def _closure(generators):
+    identity = tuple(range(54))
+    group = set([identity])
+    frontier = [identity]
+    while frontier:
+        perm = frontier.pop()
+        for generator in generators:
+            image = tuple(perm[i] for i in generator)
+            if (image not in group):
+                group.add(image)
+                frontier.append(image)
+    return sorted(group)
+
+
+#  quarter turns of the whole cube, clockwise seen from the right and
+#  from the top
+TURN_X = _gather(lambda p: (p[0], p[2], -p[1]))
+TURN_Y = _gather(lambda p: (-p[2], p[1], p[0]))
+
+#  the 24 whole-cube orientations, identity first
+ORIENTATIONS = _closure([TURN_X, TURN_Y])
+
+_ORIENT = [itemgetter(*perm) for perm in ORIENTATIONS]
+
+
+def faceMap(orientation):
+    '''Face permutation of an orientation: face k is carried to result[k].'''
+    perm = ORIENTATIONS[orientation]
+    result = [0] * 6
+    for face in range(6):
+        result[perm[face * 9 + 4] // 9] = face
+    return tuple(result)
+
+
+def orient(state, orientation):
+    '''Return the 54-byte state seen in one of the 24 orientations.'''
+    return bytes(_ORIENT[orientation](state))
+
+
+def alignCenters(state):
+    '''Recolor a face-index state so that face k's center shows color k.
+
+    The six centers must show six different colors.
+    '''
+    table = bytearray(range(256))
+    for face, color in enumerate(state[4::9]):
+        table[color] = face
+    return state.translate(table)
+
+
+def variants(state):
+    '''Every orientation of a face-index state, recolored to standard centers.'''
+    return set(alignCenters(orient(state, orientation)) for orientation in range(24))
+
+
+def canonical(state):
+    '''Smallest of the variants: equal for states that differ only by
+    orientation and a consistent recoloring.'''
+    return min(variants(state))
+
+
+#  reflection in the plane between the left and right faces
+MIRROR = _gather(lambda p: (-p[0], p[1], p[2]))
+
+#  the 48 symmetries: the 24 orientations, then each followed by MIRROR
+SYMMETRIES = ORIENTATIONS + [compose(perm, MIRROR) for perm in ORIENTATIONS]
+
+_SYMMETRIC = [itemgetter(*perm) for perm in SYMMETRIES]
+
+
+def transform(state, symmetry):
+    '''The face-index state seen through one of the 48 symmetries,
+    recolored to standard centers.'''
+    return alignCenters(bytes(_SYMMETRIC[symmetry](state)))
+
+
+def canonicalSymmetry(state):
+    '''(representative, symmetry): the smallest of the 48 transforms of a
+    face-index state and the symmetry that produces it.'''
+    return min((transform(state, symmetry), symmetry) for symmetry in range(48))
+
+
+def _moveMap(perm):
+    names = dict((move, name) for name, move in MOVES.items())
+    inverse = invert(perm)
+    return dict((name, names[compose(compose(inverse, move), perm)]) for name, move in MOVES.items())
+
+
+#  MOVE_MAPS[symmetry][move] is the move that does to transform(state,
+#  symmetry) what move does to state; a reflection turns clockwise moves
+#  into counterclockwise ones
+MOVE_MAPS = [_moveMap(perm) for perm in SYMMETRIES]
+
+_UNMAPS = [dict((mapped, move) for move, mapped in moveMap.items()) for moveMap in MOVE_MAPS]
+
+
+def mapMoves(moves, symmetry):
+    '''Moves for transform(state, symmetry) that match moves for state.'''
+    moveMap = MOVE_MAPS[symmetry]
+    return [moveMap[move] for move in moves]
+
+
+def unmapMoves(moves, symmetry):
+    '''Moves for state that match moves for transform(state, symmetry).'''
+    unmap = _UNMAPS[symmetry]
+    return [unmap[move] for move in moves]
@@ -0,0 +1,68 @@
+import unittest
+import RCube.symmetry as symmetry
+from RCube.cubestate import SOLVED_FACES, rotateState
+from RCube.rotation import MOVES, compose, invert
+
+
+class SymmetryTest(unittest.TestCase):
+# Unit Tests
+#
+# 1300 symmetry -- whole-cube orientations
+# Analysis
+#    inputs:  state        54-byte face-index state
+#             orientation  0 .. 23
+#    outputs: reoriented state, center-aligned variants, canonical form
+#
+# Happy path
+#    there are 24 distinct orientations and the first is the identity
+#    every orientation keeps centers on centers
+#    reorienting turns each face move into another face move
+#    canonical form is the same for every orientation and recoloring
+#    there are 48 symmetries, and each maps a move sequence and its
+#    result alike; the reflection reverses the direction of turns
+
+    def test1300_010_ShouldHaveTwentyFourOrientations(self):
+        self.assertEqual(24, len(set(symmetry.ORIENTATIONS)))
+        self.assertEqual(tuple(range(54)), symmetry.ORIENTATIONS[0])
+        self.assertEqual(24, len(set(symmetry.faceMap(k) for k in range(24))))
+
+    def test1300_020_ShouldKeepCentersOnCenters(self):
+        for perm in symmetry.ORIENTATIONS:
+            self.assertEqual(set(range(4, 54, 9)), set(perm[4::9]))
+
+    def test1300_030_ShouldMapMovesToMoves(self):
+        moves = set(MOVES.values())
+        for perm in symmetry.ORIENTATIONS:
+            for move in moves:
+                self.assertIn(compose(compose(invert(perm), move), perm), moves)
+
+    def test1300_040_ShouldHaveInvariantCanonicalForm(self):
+        state = rotateState(SOLVED_FACES, 'fRbbl')
+        expected = symmetry.canonical(state)
+        for orientation in range(24):
+            oriented = symmetry.orient(state, orientation)
+            recolored = oriented.translate(bytes([3, 5, 0, 1, 4, 2]) + bytes(250))
+            self.assertEqual(expected, symmetry.canonical(recolored))
+
+    def test1300_050_ShouldAlignCenters(self):
+        state = symmetry.orient(SOLVED_FACES, 7)
+        self.assertNotEqual(SOLVED_FACES, state)
+        self.assertEqual(SOLVED_FACES, symmetry.alignCenters(state))
+
+    def test1300_060_ShouldHaveFortyEightSymmetries(self):
+        self.assertEqual(48, len(set(symmetry.SYMMETRIES)))
+        self.assertEqual('F', symmetry.MOVE_MAPS[24]['f'])
+
+    def test1300_070_ShouldMapMovesThroughSymmetry(self):
+        state = rotateState(SOLVED_FACES, 'fRbbl')
+        for which in range(48):
+            moved = symmetry.transform(rotateState(state, 'tLu'), which)
+            mapped = ''.join(symmetry.mapMoves('tLu', which))
+            self.assertEqual(moved, rotateState(symmetry.transform(state, which), mapped))
+            self.assertEqual(list('tLu'), symmetry.unmapMoves(mapped, which))
+
+    def test1300_080_ShouldHaveInvariantCanonicalSymmetry(self):
+        state = rotateState(SOLVED_FACES, 'fRbbl')
+        expected = symmetry.canonicalSymmetry(state)[0]
+        for which in range(48):
+            self.assertEqual(expected, symmetry.canonicalSymmetry(symmetry.transform(state, which))[0])
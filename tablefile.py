@@ -0,0 +1,114 @@
+'''
+    Versioned binary files of lookup tables, loaded with mmap
+
+    A table file holds named flat arrays: a header (magic, version,
+    number of tables), one directory entry per table (name, array
+    typecode, offset, length in bytes) and the arrays themselves,
+    each starting on an 8-byte boundary.  load maps the file read-only
+    and hands out memoryviews into the mapping, so processes forked
+    after loading share the same physical pages instead of each
+    holding a private copy.
+
+    buildAll computes tables in a process pool.  Files are written to
+    a temporary name and renamed into place, so a reader never sees a
+    half-written file.
+'''
+
+import mmap
+import os
+import struct
+import tempfile
+from multiprocessing import Pool
+
+
+MAGIC = b'RCUBETAB'
+
+_HEADER = struct.Struct('<8sII')            # magic, version, table count
+_ENTRY = struct.Struct('<24s1s7xQQ')        # name, typecode, offset, length
+_ALIGN = 8
+
+
+def write(path, version, tables):
+    '''Write a dict of name -> array, bytearray or memoryview to path.'''
+    names = sorted(tables)
+    offset = _HEADER.size + _ENTRY.size * len(names)
+    entries = []
+    for name in names:
+        offset += -offset % _ALIGN
+        length = memoryview(tables[name]).nbytes
+        entries.append(_ENTRY.pack(name.encode('ascii'), memoryview(tables[name]).format.encode('ascii'),
+                                   offset, length))
+        offset += length
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temporary = tempfile.mkstemp(dir=directory, prefix='.tables-')
+    try:
+        with os.fdopen(handle, 'wb') as stream:
+            stream.write(_HEADER.pack(MAGIC, version, len(names)))
+            stream.write(b''.join(entries))
+            for name in names:
+                stream.write(b'\0' * (-stream.tell() % _ALIGN))
+                stream.write(memoryview(tables[name]).cast('B'))
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def load(path, version):
+    '''Map a table file and return a dict of name -> read-only memoryview.
+
+    Returns None if the file is missing, is not a table file, or was
+    written for another version.
+    '''
+    try:
+        with open(path, 'rb') as stream:
+            mapping = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if (len(mapping) < _HEADER.size):
+        return None
+    magic, fileVersion, count = _HEADER.unpack_from(mapping, 0)
+    if (magic != MAGIC or fileVersion != version):
+        return None
+    view = memoryview(mapping)
+    tables = {}
+    for index in range(count):
+        name, typecode, offset, length = _ENTRY.unpack_from(mapping, _HEADER.size + _ENTRY.size * index)
+        if (offset + length > len(mapping)):
+            return None
+        tables[name.rstrip(b'\0').decode('ascii')] = view[offset:offset + length].cast(typecode.decode('ascii'))
+    return tables
+
+
+def loadOrBuild(path, version, build):
+    '''Map the table file at path; if it is missing or was written for
+    another version, call build() for a dict of tables, write them to
+    path and map that.  If the file cannot be written the built tables
+    are returned as they are.'''
+    tables = load(path, version)
+    if (tables is None):
+        tables = build()
+        try:
+            write(path, version, tables)
+        except OSError:
+            return tables
+        tables = load(path, version)
+    return tables
+
+
+def _run(job):
+    name, function, args = job
+    return name, function(*args)
+
+
+def buildAll(jobs, processes=None):
+    '''Run (name, function, args) jobs in a process pool.
+
+    function must be a module-level function.  Returns a dict of
+    name -> result.  processes=1 runs the jobs in this process.
+    '''
+    if (processes == 1 or len(jobs) < 2):
+        return dict(map(_run, jobs))
+    with Pool(processes) as pool:
+        return dict(pool.imap_unordered(_run, jobs))
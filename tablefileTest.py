@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import unittest
+from array import array
+import RCube.tablefile as tablefile
+
+
+def _square(n):
+    return array('I', [i * i for i in range(n)])
+
+
+class TableFileTest(unittest.TestCase):
+# Unit Tests
+#
+# 1600 tablefile -- write, load, buildAll
+# Desired level of confidence: boundary value analysis
+# Analysis
+#    inputs:  path     table file name
+#             version  integer the file must have been written for
+#             tables   dict of name -> array or bytearray
+#             jobs     list of (name, function, args)
+#    outputs: dict of name -> read-only memoryview over the mapped file
+#
+# Happy path
+#    tables load back with their contents and typecodes
+#    every table starts on an 8-byte boundary
+#    jobs run in a process pool give the same results as in-process
+#
+# Sad path
+#    a missing file loads as None
+#    a file written for another version loads as None
+#    a file that is not a table file loads as None
+#    loaded tables cannot be written to
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'test.tables')
+        self.tables = {'squares': _square(1000), 'bytes': bytearray(range(7)),
+                       'words': array('L', [1, 2, 3])}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test1600_010_ShouldLoadWhatWasWritten(self):
+        tablefile.write(self.path, 3, self.tables)
+        loaded = tablefile.load(self.path, 3)
+        self.assertEqual(sorted(self.tables), sorted(loaded))
+        for name in self.tables:
+            self.assertEqual(list(self.tables[name]), loaded[name].tolist())
+        self.assertEqual('I', loaded['squares'].format)
+
+    def test1600_020_ShouldAlignTables(self):
+        tablefile.write(self.path, 3, self.tables)
+        with open(self.path, 'rb') as stream:
+            data = stream.read()
+        for name in self.tables:
+            offset = data.index(memoryview(self.tables[name]).cast('B').tobytes())
+            self.assertEqual(0, offset % 8)
+
+    def test1600_030_ShouldBuildInPool(self):
+        jobs = [('a', _square, (10,)), ('b', _square, (20,)), ('c', _square, (30,))]
+        self.assertEqual(tablefile.buildAll(jobs, 1), tablefile.buildAll(jobs, 2))
+        self.assertEqual(_square(20), tablefile.buildAll(jobs, 2)['b'])
+
+    def test1600_900_ShouldNotLoadMissingFile(self):
+        self.assertEqual(None, tablefile.load(self.path, 3))
+
+    def test1600_910_ShouldNotLoadOtherVersion(self):
+        tablefile.write(self.path, 3, self.tables)
+        self.assertEqual(None, tablefile.load(self.path, 4))
+
+    def test1600_920_ShouldNotLoadOtherFile(self):
+        with open(self.path, 'wb') as stream:
+            stream.write(b'not a table file at all')
+        self.assertEqual(None, tablefile.load(self.path, 3))
+
+    def test1600_930_ShouldLoadReadOnly(self):
+        tablefile.write(self.path, 3, self.tables)
+        loaded = tablefile.load(self.path, 3)
+        self.assertTrue(loaded['squares'].readonly)